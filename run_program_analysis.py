@@ -5,10 +5,15 @@ from pathlib import Path
 from datetime import datetime
 from src.managers import ProgramManager, BordereauManager, RunManager
 from src.serialization.run_serializer import RunMeta
-from src.engine import apply_program_to_bordereau, apply_program_to_bordereau_simple
+from src.engine import (
+    apply_program_to_bordereau,
+    apply_program_to_bordereau_batches,
+    apply_program_to_bordereau_simple,
+)
 from src.presentation import generate_detailed_report
 from snowflake_utils import SnowflakeConfig, get_snowpark_session, close_snowpark_session
 from src.managers.program_snowpark_manager import SnowparkProgramManager
+from src.managers.program_cache import ProgramCache
 
 def main():
     parser = argparse.ArgumentParser(
@@ -20,11 +25,14 @@ Examples:
   
   # Load program from Snowflake by ID via Snowpark with simplified export
   python run_program_analysis.py --program-id 1 -b bordereau.csv --simple
+
+  # Stream a large bordereau by batches of 100k policies (bounded memory)
+  python run_program_analysis.py --program-id 1 -b bordereau.csv --batch-size 100000
         """,
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
     parser.add_argument(
-        "--bordereau", "-b", required=True, help="Path to the bordereau CSV file"
+        "--bordereau", "-b", required=True, help="Path to the bordereau file (CSV or .parquet)"
     )
     parser.add_argument(
         "--output-dir",
@@ -45,6 +53,23 @@ Examples:
         help="Load program by ID from Snowflake via Snowpark",
     )
 
+    parser.add_argument(
+        "--run-json",
+        action="store_true",
+        help="Also serialize the *_json diagnostic columns of the run tables (slower)",
+    )
+    parser.add_argument(
+        "--program-cache",
+        default=None,
+        help="Directory of the local compiled-program cache (skips reloading unchanged programs)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help="Stream the bordereau by batches of N policies (CSV, Parquet or Snowflake table; no detailed report)",
+    )
+
     args = parser.parse_args()
 
 
@@ -85,8 +110,12 @@ Examples:
         
         try:
             p_manager = SnowparkProgramManager(session)
-            program = p_manager.load(args.program_id)
+            cache = ProgramCache(args.program_cache) if args.program_cache else None
+            program = p_manager.load(args.program_id, cache=cache)
+            plan = p_manager.get_loaded_plan()
             print(f"   ✓ Program loaded via Snowpark: {program.name}")
+            if cache is not None:
+                print(f"   ✓ Program cache: {'hit' if cache.hits else 'miss'}")
             
         finally:
             # Fermer la session Snowpark
@@ -97,6 +126,14 @@ Examples:
         sys.exit(1)
     
     print(f"   ✓ Number of structures: {len(program.structures)}\n")
+    program_fingerprint = program.fingerprint()
+
+    if args.batch_size:
+        run_streaming_analysis(
+            args, program, analysis_subdir, program_name, bordereau_name, timestamp, started_at,
+            plan=plan,
+        )
+        return
 
     # 2. Charger + valider le bordereau via le manager (backend auto)
     print("2. Loading and validating bordereau...")
@@ -118,13 +155,13 @@ Examples:
     if args.simple:
         print("   📊 Using simplified export (exposure per policy only)")
         results = apply_program_to_bordereau_simple(
-            bordereau, program, calculation_date
+            bordereau, program, calculation_date, plan=plan
         )
         print(f"   ✓ Program applied to {len(results)} policies (simplified)")
     else:
         print("   📊 Using detailed export (full structure details)")
         bordereau_with_net, results = apply_program_to_bordereau(
-            bordereau, program, calculation_date
+            bordereau, program, calculation_date, plan=plan
         )
         print(f"   ✓ Program applied to {len(results)} policies (detailed)")
     print()
@@ -163,7 +200,7 @@ Examples:
             calculation_date=calculation_date,
             source_program=source_program,
             source_bordereau=args.bordereau,
-            program_fingerprint=None,  # tu peux injecter un hash du programme si tu veux
+            program_fingerprint=program_fingerprint,
             started_at=started_at,
             ended_at=ended_at,
             notes=None,
@@ -177,6 +214,7 @@ Examples:
             results_df=results,
             dest=str(analysis_subdir),
             source_policy_df=bordereau.to_engine_dataframe(),
+            include_json=args.run_json,
         )
 
         print(f"   ✓ Runs CSV: {analysis_subdir / 'runs.csv'}")
@@ -193,5 +231,70 @@ Examples:
     print(f"\nAll results saved in: {analysis_subdir}")
 
 
+def run_streaming_analysis(
+    args, program, analysis_subdir, program_name, bordereau_name, timestamp, started_at,
+    plan=None,
+):
+    """Traitement par lots : chaque lot est calculé puis écrit avant de lire le suivant."""
+    calculation_date = "2024-06-01"  # Date de calcul par défaut
+    print(f"2. Streaming bordereau by batches of {args.batch_size} policies...")
+    b_manager = BordereauManager(backend=BordereauManager.detect_backend(args.bordereau))
+    batches = b_manager.iter_batches(
+        args.bordereau, batch_size=args.batch_size, program=program, validate=True
+    )
+
+    if args.simple:
+        simple_results_file = analysis_subdir / "simple_results.csv"
+        count = 0
+        for i, bordereau in enumerate(batches):
+            results = apply_program_to_bordereau_simple(
+                bordereau, program, calculation_date, plan=plan
+            )
+            results.to_csv(simple_results_file, mode="a", header=i == 0, index=False)
+            count += len(results)
+        print(f"   ✓ Program applied to {count} policies (simplified)")
+        print(f"   ✓ Simple results: {simple_results_file}")
+    else:
+        output_bordereau_file = analysis_subdir / "bordereau_with_cession.csv"
+
+        def results_by_batch():
+            for i, (bordereau_with_net, results) in enumerate(
+                apply_program_to_bordereau_batches(
+                    batches, program, calculation_date, plan=plan
+                )
+            ):
+                bordereau_with_net.to_csv(
+                    output_bordereau_file, mode="a", header=i == 0, index=False
+                )
+                yield results, bordereau_with_net
+
+        run_meta = RunMeta(
+            run_id=f"{program_name}_{bordereau_name}_{timestamp}",
+            program_name=program.name,
+            uw_dept=program.underwriting_department,
+            calculation_date=calculation_date,
+            source_program=f"snowflake://program_id={args.program_id}",
+            source_bordereau=args.bordereau,
+            program_fingerprint=program.fingerprint(),
+            started_at=started_at,
+            notes=f"streamed by batches of {args.batch_size}",
+        )
+        r_manager = RunManager(backend=RunManager.detect_backend(str(analysis_subdir)))
+        count = r_manager.save_stream(
+            run_meta, results_by_batch(), str(analysis_subdir), include_json=args.run_json
+        )
+        print(f"   ✓ Program applied to {count} policies (detailed)")
+        print(f"   ✓ Bordereau with cessions: {output_bordereau_file}")
+        print(f"   ✓ Runs CSV: {analysis_subdir / 'runs.csv'}")
+        print(f"   ✓ Policies CSV: {analysis_subdir / 'run_policies.csv'}")
+        print(f"   ✓ Structures CSV: {analysis_subdir / 'run_policy_structures.csv'}")
+
+    print()
+    print("=" * 80)
+    print("✅ ANALYSIS COMPLETE")
+    print("=" * 80)
+    print(f"\nAll results saved in: {analysis_subdir}")
+
+
 if __name__ == "__main__":
     main()
@@ -1,5 +1,6 @@
 # src/domain/bordereau.py
 from __future__ import annotations
+import time
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Union
 
@@ -10,6 +11,12 @@ from src.schema.bordereau_mapping import present_mapping
 from src.domain import Program
 from src.domain.policy import Policy  # ⬅️ nouveau
 
+# Copy-on-write (opt-in en pandas 2.x, comportement par défaut en pandas 3) :
+# les copies superficielles partagent les données et une écriture en place ne
+# recopie que le bloc modifié, sans jamais atteindre les autres copies.
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
 
 class BordereauValidationError(Exception):
     pass
@@ -31,9 +38,14 @@ class Bordereau:
         uw_dept: Optional[str] = None,
         source: Optional[str] = None,
         program: Optional[Program] = None,
+        keep_raw: bool = False,
     ):
-        self._raw_df = df.copy()
-        self._df = self._normalize_columns(self._raw_df)
+        # Copies superficielles (copy-on-write) : le bordereau partage les données
+        # de l'entrée sans les recopier, et modifier l'un ne touche pas l'autre.
+        self._raw_df = df.copy(deep=False) if keep_raw else None
+        # Durée (s) de la coercion de chaque colonne, renseignée par _normalize_columns
+        self.coercion_timings: Dict[str, float] = {}
+        self._df = self._normalize_columns(df)
         self.uw_dept = uw_dept or self._infer_uw_dept(self._df)
         self.source = source
         self.program = program  # Référence vers le programme associé
@@ -134,12 +146,14 @@ class Bordereau:
             )
 
     def _normalize_columns(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Applique les coercions déclarées dans schema."""
-        df2 = df.copy()
+        """Applique les coercions déclarées dans schema (une opération par colonne)."""
+        df2 = df.copy(deep=False)
         # coercions par colonne
         for name, spec in COLUMNS.items():
             if spec.coerce and name in df2.columns:
-                df2[name] = df2[name].map(spec.coerce)
+                start = time.perf_counter()
+                df2[name] = spec.coerce_series(df2[name])
+                self.coercion_timings[name] = time.perf_counter() - start
         return df2
 
     def _infer_uw_dept(self, df: pd.DataFrame) -> Optional[str]:
@@ -257,11 +271,20 @@ class Bordereau:
     # ──────────────────────────────────────────────────────────────────────
     @property
     def df(self) -> pd.DataFrame:
-        return self._df
+        """
+        Vue copy-on-write sur le DataFrame normalisé : aucune modification
+        (colonnes ajoutées, valeurs écrites en place) n'atteint le bordereau.
+        """
+        return self._df.copy(deep=False)
+
+    @property
+    def raw_df(self) -> Optional[pd.DataFrame]:
+        """DataFrame d'origine avant coercions (seulement si keep_raw=True)."""
+        return self._raw_df
 
     def to_engine_dataframe(self) -> pd.DataFrame:
-        """DF **canonique** (noms & types) prêt pour l'engine."""
-        return self._df.copy()
+        """DF **canonique** (noms & types) prêt pour l'engine (vue copy-on-write)."""
+        return self._df.copy(deep=False)
 
     @property
     def columns(self) -> List[str]:
@@ -280,7 +303,7 @@ class Bordereau:
 
     def head(self, n: int = 5) -> "Bordereau":
         return Bordereau(
-            self._df.head(n).copy(),
+            self._df.head(n),
             uw_dept=self.uw_dept,
             source=self.source,
         )
@@ -288,14 +311,14 @@ class Bordereau:
     def filter(self, expr: str) -> "Bordereau":
         """Filtre via DataFrame.query et retourne un nouveau Bordereau."""
         return Bordereau(
-            self._df.query(expr).copy(),
+            self._df.query(expr),
             uw_dept=self.uw_dept,
             source=self.source,
         )
 
     def with_uw_dept(self, uw_dept: str) -> "Bordereau":
         """Clone avec underwriting department fixé/écrasé (utile si non inférable)."""
-        return Bordereau(self._df.copy(), uw_dept=uw_dept, source=self.source)
+        return Bordereau(self._df, uw_dept=uw_dept, source=self.source)
 
     def __repr__(self) -> str:
         src = f"source='{self.source}', " if self.source else ""
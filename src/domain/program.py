@@ -1,5 +1,9 @@
 from typing import Dict, Any, List, Optional, Literal
+import hashlib
+import json
+import math
 import sys
+import pandas as pd
 from .structure import Structure
 from .condition import Condition
 from .exclusion import ExclusionRule
@@ -67,7 +71,7 @@ class Program:
             "exclusions": [
                 {
                     "values_by_dimension": e.values_by_dimension,
-                    "reason": e.reason,
+                    "name": e.name,
                     "effective_date": (
                         str(e.effective_date) if e.effective_date is not None else None
                     ),
@@ -79,6 +83,30 @@ class Program:
             ],
         }
 
+    def fingerprint(self) -> str:
+        """
+        Empreinte stable du contenu du programme (sha256 hex) : structures avec
+        leurs termes par défaut, conditions résolues et exclusions. Indépendante
+        des types numériques (int/float/numpy) et des identifiants techniques
+        (RP_CONDITION_ID) ; l'ordre des structures et conditions compte.
+        """
+        payload = self.to_dict()
+        for structure, s_dict in zip(self.structures, payload["structures"]):
+            s_dict["conditions"] = [
+                {k: v for k, v in c.items() if k != "RP_CONDITION_ID"}
+                for c in s_dict["conditions"]
+            ]
+            s_dict["terms"] = {
+                "cession_pct": structure.cession_pct,
+                "limit": structure.limit,
+                "attachment": structure.attachment,
+                "signed_share": structure.signed_share,
+            }
+        text = json.dumps(
+            _canonical(payload), sort_keys=True, ensure_ascii=False, separators=(",", ":")
+        )
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
     def describe(self, file=None) -> str:
         """Generate a complete text description of the program"""
         if file is None:
@@ -128,3 +156,23 @@ class Program:
         description = "\n".join(lines)
         file.write(description + "\n")
         return description
+
+
+def _canonical(value: Any) -> Any:
+    """Valeur JSON canonique : nombres en float, dates ISO, clés à None omises."""
+    if isinstance(value, dict):
+        items = ((str(k), _canonical(v)) for k, v in value.items())
+        return {k: v for k, v in items if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if value is None or value is pd.NaT or value is pd.NA:
+        return None
+    if hasattr(value, "item") and not isinstance(value, (str, bytes)):
+        value = value.item()  # scalaires numpy
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return None if math.isnan(value) else float(value)
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    return str(value)
@@ -16,8 +16,15 @@ class ColumnSpec:
     required: bool = False
     required_by_lob: Dict[str, bool] = field(default_factory=dict)
     coerce: Optional[Callable] = None
+    # Version colonne de `coerce` (même résultat que Series.map(coerce))
+    coerce_column: Optional[Callable[[pd.Series], pd.Series]] = None
     notes: str = ""
 
+    def coerce_series(self, values: pd.Series) -> pd.Series:
+        if self.coerce_column is not None:
+            return self.coerce_column(values)
+        return values.map(self.coerce)
+
 
 def _to_upper(x):
     if x is None:
@@ -42,18 +49,65 @@ def _to_float(x):
         return None
 
 
+# ——— Coercions vectorisées (une opération par colonne) ———
+# Mêmes valeurs et mêmes nuls que Series.map(_to_xxx), y compris le dtype
+# du résultat ; les cas que pandas ne traite pas à l'identique retombent sur
+# la version cellule par cellule.
+def _to_upper_column(values: pd.Series) -> pd.Series:
+    # None reste None ; NaN devient "NAN" comme str(nan).upper()
+    is_none = values.to_numpy(dtype=object) == None  # noqa: E711
+    return values.astype(str).str.upper().where(~is_none, None)
+
+
+def _to_date_column(values: pd.Series) -> pd.Series:
+    if pd.api.types.is_datetime64_any_dtype(values):
+        # Déjà des dates : _to_date laisse chaque valeur inchangée
+        return pd.to_datetime(values)
+    # Chaque valeur distincte parsée une seule fois, avec son propre format
+    # (pd.to_datetime sur la colonne imposerait le format de la première valeur)
+    uniques = pd.unique(values)
+    return values.map(dict(zip(uniques, map(_to_date, uniques))))
+
+
+def _to_float_column(values: pd.Series) -> pd.Series:
+    if pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+        return values.astype(float)
+    parsed = pd.to_numeric(values, errors="coerce").astype(float)
+    # float() accepte des écritures que to_numeric refuse (" 2 ", "1_000", True...)
+    retry = parsed.isna() & values.notna()
+    if retry.any():
+        parsed[retry] = values[retry].map(_to_float).astype(float)
+    if parsed.isna().all():
+        # Aucune valeur numérique : map peut conserver des None (dtype objet)
+        return values.map(_to_float)
+    return parsed
+
+
 # ——— Colonnes canoniques alignées avec l'engine ———
 COLUMNS: Dict[str, ColumnSpec] = {
     # META / BASE
     "policy_id": ColumnSpec("policy_id", "meta"),
-    "INSURED_NAME": ColumnSpec("INSURED_NAME", "meta", required=True, coerce=_to_upper),
+    "INSURED_NAME": ColumnSpec(
+        "INSURED_NAME",
+        "meta",
+        required=True,
+        coerce=_to_upper,
+        coerce_column=_to_upper_column,
+    ),
     "INCEPTION_DT": ColumnSpec(
         "INCEPTION_DT",
         "meta",
         required=True,
         coerce=_to_date,
+        coerce_column=_to_date_column,
+    ),
+    "EXPIRE_DT": ColumnSpec(
+        "EXPIRE_DT",
+        "meta",
+        required=True,
+        coerce=_to_date,
+        coerce_column=_to_date_column,
     ),
-    "EXPIRE_DT": ColumnSpec("EXPIRE_DT", "meta", required=True, coerce=_to_date),
     "line_of_business": ColumnSpec("line_of_business", "meta"),
     # Dimension mappings
     "COUNTRY": ColumnSpec("COUNTRIES", "dimension"),
@@ -67,33 +121,55 @@ COLUMNS: Dict[str, ColumnSpec] = {
     "LIAB_CURRENCY": ColumnSpec("LIAB_CURRENCY", "dimension"),
     # EXPOSURE — Casualty
     "OCCURRENCE_LIMIT_100_ORIG": ColumnSpec(
-        "OCCURRENCE_LIMIT_100_ORIG", "exposure", required_by_lob={"casualty": True}, coerce=_to_float
+        "OCCURRENCE_LIMIT_100_ORIG",
+        "exposure",
+        required_by_lob={"casualty": True},
+        coerce=_to_float,
+        coerce_column=_to_float_column,
     ),
     "CEDENT_SHARE": ColumnSpec(
-        "CEDENT_SHARE", "exposure", required_by_lob={"casualty": True}, coerce=_to_float
+        "CEDENT_SHARE",
+        "exposure",
+        required_by_lob={"casualty": True},
+        coerce=_to_float,
+        coerce_column=_to_float_column,
     ),
     # EXPOSURE — Aviation
     "HULL_LIMIT": ColumnSpec(
-        "HULL_LIMIT", "exposure", required_by_lob={"aviation": False}, coerce=_to_float
+        "HULL_LIMIT",
+        "exposure",
+        required_by_lob={"aviation": False},
+        coerce=_to_float,
+        coerce_column=_to_float_column,
     ),
     "HULL_SHARE": ColumnSpec(
-        "HULL_SHARE", "exposure", required_by_lob={"aviation": False}, coerce=_to_float
+        "HULL_SHARE",
+        "exposure",
+        required_by_lob={"aviation": False},
+        coerce=_to_float,
+        coerce_column=_to_float_column,
     ),
     "LIAB_LIMIT": ColumnSpec(
         "LIAB_LIMIT",
         "exposure",
         required_by_lob={"aviation": False},
         coerce=_to_float,
+        coerce_column=_to_float_column,
     ),
     "LIAB_SHARE": ColumnSpec(
         "LIAB_SHARE",
         "exposure",
         required_by_lob={"aviation": False},
         coerce=_to_float,
+        coerce_column=_to_float_column,
     ),
     # EXPOSURE — Test
     "exposure": ColumnSpec(
-        "exposure", "exposure", required_by_lob={"test": True}, coerce=_to_float
+        "exposure",
+        "exposure",
+        required_by_lob={"test": True},
+        coerce=_to_float,
+        coerce_column=_to_float_column,
     ),
 }
 
@@ -2,11 +2,32 @@
 from .calculation_engine import apply_program
 from .bordereau_processor import (
     apply_program_to_bordereau,
+    apply_program_to_bordereau_batches,
+    apply_program_to_bordereau_dates,
     apply_program_to_bordereau_simple,
+    apply_programs_to_bordereau,
 )
+from .batch_udf import BATCH_OUTPUT_SCHEMA, ProgramBatchHandler, apply_program_to_batch
+from .program_plan import ProgramPlan, compile_program
+from .result_store import ResultStore
+from .sql_compiler import SIMPLE_COLUMNS, compile_program_sql
+from .vectorized_engine import apply_program_vectorized, apply_program_vectorized_dates
 
 __all__ = [
     "apply_program",
     "apply_program_to_bordereau",
+    "apply_program_to_bordereau_batches",
     "apply_program_to_bordereau_simple",
+    "apply_programs_to_bordereau",
+    "apply_program_to_bordereau_dates",
+    "apply_program_vectorized",
+    "apply_program_vectorized_dates",
+    "apply_program_to_batch",
+    "ProgramBatchHandler",
+    "BATCH_OUTPUT_SCHEMA",
+    "ProgramPlan",
+    "compile_program",
+    "ResultStore",
+    "compile_program_sql",
+    "SIMPLE_COLUMNS",
 ]
@@ -0,0 +1,138 @@
+"""
+Point d'entrée par lot pour l'exécution dans l'entrepôt (UDF / UDTF vectorisée).
+
+apply_program_to_batch transforme un lot pandas de lignes de bordereau en un
+DataFrame au schéma fixe, indépendant du programme (BATCH_OUTPUT_SCHEMA), avec
+le moteur colonne : pas de Policy / ProgramRunResult / dict par ligne.
+
+ProgramBatchHandler est l'objet enregistré auprès de Snowpark (UDTF
+vectorisée : end_partition(df) -> DataFrame). Il porte le Program ; le
+ProgramPlan est compilé une fois par processus worker et partagé par tous les
+lots et toutes les instances du même programme (cache par empreinte).
+"""
+
+from __future__ import annotations
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.domain import Program
+from src.domain.bordereau import Bordereau
+from .program_plan import ProgramPlan, compile_program
+from .results import DETAIL_LEVEL
+from .vectorized_engine import apply_program_vectorized
+
+# Colonnes de sortie -> type Snowflake (ordre fixe, identique pour tous les programmes)
+BATCH_OUTPUT_SCHEMA: Dict[str, str] = {
+    "policy_id": "VARCHAR",
+    "insured_name": "VARCHAR",
+    "exposure": "FLOAT",
+    "effective_exposure": "FLOAT",
+    "ceded_to_layer_100pct": "FLOAT",
+    "ceded_to_reinsurer": "FLOAT",
+    "retained_by_cedant": "FLOAT",
+    "policy_inception_date": "TIMESTAMP_NTZ",
+    "policy_expiry_date": "TIMESTAMP_NTZ",
+    "exclusion_status": "VARCHAR",
+    "exclusion_reason": "VARCHAR",
+}
+
+# Plans compilés du processus courant (un worker UDTF = un processus Python)
+_WORKER_PLANS: Dict[str, ProgramPlan] = {}
+
+
+def batch_output_ddl() -> str:
+    """Clause RETURNS TABLE (...) pour un CREATE FUNCTION sur BATCH_OUTPUT_SCHEMA."""
+    columns = ", ".join(
+        f"{name} {sql_type}" for name, sql_type in BATCH_OUTPUT_SCHEMA.items()
+    )
+    return f"TABLE ({columns})"
+
+
+def worker_plan(program: Program) -> ProgramPlan:
+    """Plan compilé une seule fois par processus pour un contenu de programme donné."""
+    key = program.fingerprint()
+    plan = _WORKER_PLANS.get(key)
+    if plan is None:
+        plan = _WORKER_PLANS[key] = compile_program(program)
+    return plan
+
+
+def _conform(df: pd.DataFrame) -> pd.DataFrame:
+    """Impose colonnes et dtypes de BATCH_OUTPUT_SCHEMA (même si le lot est vide)."""
+    out = {}
+    for name, sql_type in BATCH_OUTPUT_SCHEMA.items():
+        values = df[name] if name in df.columns else pd.Series(None, index=df.index)
+        if sql_type == "FLOAT":
+            out[name] = pd.to_numeric(values, errors="coerce").astype("float64")
+        elif sql_type == "TIMESTAMP_NTZ":
+            out[name] = pd.to_datetime(values, errors="coerce")
+        else:
+            out[name] = values.astype(object).where(values.notna(), None)
+    return pd.DataFrame(out, index=df.index)
+
+
+def apply_program_to_batch(
+    pdf: pd.DataFrame, plan: ProgramPlan, calculation_date: str
+) -> pd.DataFrame:
+    """
+    Applique le programme compilé à un lot de lignes brutes de bordereau.
+
+    Une ligne de sortie par ligne d'entrée (même index, même ordre), avec
+    exactement les colonnes de BATCH_OUTPUT_SCHEMA, quel que soit le programme.
+    """
+    bordereau = Bordereau(pdf, uw_dept=plan.uw_dept, program=plan.program)
+    df = bordereau.to_engine_dataframe()
+    result = apply_program_vectorized(
+        df, plan.program, calculation_date, plan=plan, detail_level=DETAIL_LEVEL.TOTALS
+    ).to_simple_dataframe()
+    policy_id = (
+        df["policy_id"].astype(str).where(df["policy_id"].notna(), None)
+        if "policy_id" in df.columns
+        else np.full(len(df), None, dtype=object)
+    )
+    return _conform(result.assign(policy_id=policy_id))
+
+
+class ProgramBatchHandler:
+    """
+    Handler de UDTF vectorisée : end_partition(df) -> DataFrame (BATCH_OUTPUT_SCHEMA).
+
+    Le Program est sérialisé avec le handler lors de l'enregistrement ; le plan
+    est compilé au premier lot de chaque worker (cf worker_plan).
+    input_columns : noms des colonnes du bordereau, dans l'ordre des arguments
+    de la fonction (Snowpark passe des colonnes positionnelles).
+    """
+
+    def __init__(
+        self,
+        program: Program,
+        calculation_date: str,
+        input_columns: Optional[Sequence[str]] = None,
+    ):
+        self.program = program
+        self.calculation_date = calculation_date
+        self.input_columns: Optional[List[str]] = (
+            list(input_columns) if input_columns is not None else None
+        )
+        self._plan: Optional[ProgramPlan] = None
+
+    @property
+    def plan(self) -> ProgramPlan:
+        if self._plan is None:
+            self._plan = worker_plan(self.program)
+        return self._plan
+
+    def __getstate__(self):
+        # Le plan n'est jamais envoyé aux workers : il y est recompilé une fois
+        state = self.__dict__.copy()
+        state["_plan"] = None
+        return state
+
+    def end_partition(self, df: pd.DataFrame) -> pd.DataFrame:
+        if self.input_columns is not None:
+            df = df.set_axis(self.input_columns, axis=1)
+        return apply_program_to_batch(df, self.plan, self.calculation_date)
+
+    __call__ = end_partition
@@ -1,19 +1,50 @@
 import pandas as pd
-from typing import Dict
+from typing import (
+    Any,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    Literal,
+    Mapping,
+    Optional,
+    Sequence,
+    Union,
+)
 from .calculation_engine import apply_program
+from .memoization import broadcast_results, signature_groups
+from .parallel import check_parallelism, map_chunks, map_tasks
+from .program_plan import ProgramPlan, compile_program
+from .results import DETAIL_LEVEL, check_detail_level
+from .vectorized_engine import (
+    BordereauColumns,
+    apply_program_vectorized,
+    apply_program_vectorized_dates,
+)
 from ..domain.bordereau import Bordereau
 from ..domain.policy import Policy
 from ..domain.program import Program
 
+Engine = Literal["row", "vectorized"]
+ENGINES = ("row", "vectorized")
+
+
+def _check_engine(engine: str) -> None:
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}'. Expected one of {ENGINES}")
+
 
 def apply_program_to_row(
     row_data: Dict[str, any],
     program: Program,
     calculation_date: str,
+    plan: Optional[ProgramPlan] = None,
+    detail_level: str = DETAIL_LEVEL.FULL,
 ) -> Dict[str, any]:
     """
     Applique un programme à une ligne de bordereau (dict).
     Compatible avec l'approche DataFrame.apply() pour Snowpark.
+    Pour une UDF/UDTF vectorisée (un lot par appel), voir apply_program_to_batch.
     """
     # Créer une Policy temporaire pour cette ligne
     # Utilise l'underwriting_department du programme (pas le line of business de la police)
@@ -21,7 +52,9 @@ def apply_program_to_row(
     policy = Policy(raw=row_data, uw_dept=uw_dept)
 
     # Appliquer le programme
-    result = apply_program(policy, program, calculation_date)
+    result = apply_program(
+        policy, program, calculation_date, plan=plan, detail_level=detail_level
+    )
 
     # Convertir ProgramRunResult en dictionnaire pour compatibilité
     return result.to_dict()
@@ -31,6 +64,7 @@ def apply_program_to_row_simple(
     row_data: Dict[str, any],
     program: Program,
     calculation_date: str,
+    plan: Optional[ProgramPlan] = None,
 ) -> Dict[str, any]:
     """
     Applique un programme à une ligne de bordereau (dict) et retourne un résultat simplifié.
@@ -41,18 +75,106 @@ def apply_program_to_row_simple(
     policy = Policy(raw=row_data, uw_dept=uw_dept)
 
     # Appliquer le programme
-    result = apply_program(policy, program, calculation_date)
+    # La vue simplifiée n'utilise que les totaux : pas de détail par structure
+    result = apply_program(
+        policy, program, calculation_date, plan=plan, detail_level=DETAIL_LEVEL.TOTALS
+    )
 
     # Retourner la vue simplifiée (une seule ligne par police)
     simple_rows = result.to_simple_rows()
     return simple_rows[0] if simple_rows else {}
 
 
+def _results_chunk(df: pd.DataFrame, context: Dict[str, Any]) -> pd.DataFrame:
+    """Résultats détaillés d'une tranche du DataFrame moteur."""
+    program, plan = context["program"], context["plan"]
+    calculation_date = context["calculation_date"]
+    detail_level = context["detail_level"]
+
+    if context["engine"] == "vectorized":
+        return apply_program_vectorized(
+            df, program, calculation_date, plan=plan, detail_level=detail_level
+        ).to_dataframe()
+
+    # Calcul via apply pour compatibilité Snowpark
+    return df.apply(
+        lambda row: pd.Series(
+            apply_program_to_row(
+                row.to_dict(), program, calculation_date, plan, detail_level
+            )
+        ),
+        axis=1,
+    )
+
+
+def _simple_results_chunk(df: pd.DataFrame, context: Dict[str, Any]) -> pd.DataFrame:
+    """Résultats simplifiés d'une tranche du DataFrame moteur."""
+    program, plan = context["program"], context["plan"]
+    calculation_date = context["calculation_date"]
+
+    if context["engine"] == "vectorized":
+        return apply_program_vectorized(
+            df, program, calculation_date, plan=plan, detail_level=DETAIL_LEVEL.TOTALS
+        ).to_simple_dataframe()
+
+    # Calcul via apply pour compatibilité Snowpark
+    return df.apply(
+        lambda row: pd.Series(
+            apply_program_to_row_simple(row.to_dict(), program, calculation_date, plan)
+        ),
+        axis=1,
+    )
+
+
+def _run_chunks(
+    df: pd.DataFrame,
+    func,
+    context: Dict[str, Any],
+    *,
+    workers: int,
+    chunk_size: Optional[int],
+    memoize: bool,
+    per_row_columns: Dict[str, str],
+) -> pd.DataFrame:
+    """Exécute `func` par tranches, une seule fois par signature de police si memoize."""
+    if not memoize or df.empty:
+        return map_chunks(df, func, context, workers=workers, chunk_size=chunk_size)
+
+    group_of_row, first, stats = signature_groups(df, context["plan"])
+    unique_results = map_chunks(
+        df.iloc[first], func, context, workers=workers, chunk_size=chunk_size
+    )
+    return broadcast_results(unique_results, group_of_row, df, per_row_columns, stats)
+
+
 def apply_program_to_bordereau(
     bordereau: Bordereau,
     program: Program,
     calculation_date: str,
+    *,
+    engine: Engine = "row",
+    plan: Optional[ProgramPlan] = None,
+    detail_level: str = DETAIL_LEVEL.FULL,
+    workers: int = 1,
+    chunk_size: Optional[int] = None,
+    memoize: bool = False,
 ) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Applique un programme à un bordereau.
+
+    engine="row" traite police par police (compatible Snowpark) ;
+    engine="vectorized" calcule tout le bordereau en colonnes NumPy (mêmes résultats).
+    Le ProgramPlan est compilé une fois (ou fourni par l'appelant).
+    detail_level: "totals" (structures_detail vide), "matched_id" (sans
+    matching_details) ou "full" (diagnostics complets).
+    workers / chunk_size: découpe le bordereau en tranches de chunk_size lignes,
+    réparties sur `workers` processus ; l'ordre des lignes est conservé.
+    memoize: calcule une seule fois les polices de même signature (dimensions,
+    dates, exposition) ; statistiques dans results_df.attrs["memoization"].
+    """
+    _check_engine(engine)
+    check_detail_level(detail_level)
+    check_parallelism(workers, chunk_size)
 
     # Associe le programme au bordereau si pas déjà fait
     if not bordereau.program:
@@ -61,31 +183,84 @@ def apply_program_to_bordereau(
     # Validation complète du bordereau (inclut la validation des colonnes d'exposition)
     bordereau.validate()
 
-    df = bordereau.to_engine_dataframe().copy()
+    df = bordereau.to_engine_dataframe()
+    plan = plan or compile_program(program)
 
-    # Calcul via apply pour compatibilité Snowpark
-    results_df = df.apply(
-        lambda row: pd.Series(
-            apply_program_to_row(row.to_dict(), program, calculation_date)
-        ),
-        axis=1,
+    context = {
+        "program": program,
+        "plan": plan,
+        "calculation_date": calculation_date,
+        "engine": engine,
+        "detail_level": detail_level,
+    }
+    results_df = _run_chunks(
+        df,
+        _results_chunk,
+        context,
+        workers=workers,
+        chunk_size=chunk_size,
+        memoize=memoize,
+        per_row_columns={"INSURED_NAME": "INSURED_NAME"},
     )
 
-    bordereau_with_net = df.copy()
+    # df est une vue copy-on-write propre à ce run : la colonne ajoutée ne touche
+    # pas le bordereau
+    bordereau_with_net = df
     bordereau_with_net["cession_to_reinsurer"] = results_df["cession_to_reinsurer"]
 
     return bordereau_with_net, results_df
 
 
+def apply_program_to_bordereau_batches(
+    bordereaux: Iterable[Bordereau],
+    program: Program,
+    calculation_date: str,
+    *,
+    engine: Engine = "row",
+    plan: Optional[ProgramPlan] = None,
+    detail_level: str = DETAIL_LEVEL.FULL,
+    workers: int = 1,
+    chunk_size: Optional[int] = None,
+    memoize: bool = False,
+) -> Iterator[tuple[pd.DataFrame, pd.DataFrame]]:
+    """
+    Version streaming de apply_program_to_bordereau : traite les lots un par un
+    (ex: BordereauManager.iter_batches) et produit (bordereau_with_net, results_df)
+    pour chacun. Le programme est compilé une seule fois pour tous les lots.
+    """
+    plan = plan or compile_program(program)
+    for bordereau in bordereaux:
+        yield apply_program_to_bordereau(
+            bordereau,
+            program,
+            calculation_date,
+            engine=engine,
+            plan=plan,
+            detail_level=detail_level,
+            workers=workers,
+            chunk_size=chunk_size,
+            memoize=memoize,
+        )
+
+
 def apply_program_to_bordereau_simple(
     bordereau: Bordereau,
     program: Program,
     calculation_date: str,
+    *,
+    engine: Engine = "row",
+    plan: Optional[ProgramPlan] = None,
+    workers: int = 1,
+    chunk_size: Optional[int] = None,
+    memoize: bool = False,
 ) -> pd.DataFrame:
     """
     Applique un programme à un bordereau et retourne un DataFrame simplifié.
     Une ligne par police avec juste l'exposition et les totaux de cession.
     """
+    _check_engine(engine)
+    check_parallelism(workers, chunk_size)
+
     # Associe le programme au bordereau si pas déjà fait
     if not bordereau.program:
         bordereau.program = program
@@ -93,14 +268,149 @@ def apply_program_to_bordereau_simple(
     # Validation complète du bordereau
     bordereau.validate()
 
-    df = bordereau.to_engine_dataframe().copy()
+    df = bordereau.to_engine_dataframe()
+    plan = plan or compile_program(program)
 
-    # Calcul via apply pour compatibilité Snowpark
-    results_df = df.apply(
-        lambda row: pd.Series(
-            apply_program_to_row_simple(row.to_dict(), program, calculation_date)
-        ),
-        axis=1,
+    context = {
+        "program": program,
+        "plan": plan,
+        "calculation_date": calculation_date,
+        "engine": engine,
+    }
+    return _run_chunks(
+        df,
+        _simple_results_chunk,
+        context,
+        workers=workers,
+        chunk_size=chunk_size,
+        memoize=memoize,
+        per_row_columns={"insured_name": "INSURED_NAME"},
     )
 
-    return results_df
+
+def _program_results(task, context: Dict[str, Any]) -> pd.DataFrame:
+    """Résultats d'un programme sur les colonnes partagées du bordereau."""
+    program, plan = task
+    columns = context["columns"]
+    if context["simple"]:
+        return apply_program_vectorized(
+            columns.df,
+            program,
+            context["calculation_date"],
+            plan=plan,
+            detail_level=DETAIL_LEVEL.TOTALS,
+            columns=columns,
+        ).to_simple_dataframe()
+    return apply_program_vectorized(
+        columns.df,
+        program,
+        context["calculation_date"],
+        plan=plan,
+        detail_level=context["detail_level"],
+        columns=columns,
+    ).to_dataframe()
+
+
+def apply_programs_to_bordereau(
+    bordereau: Bordereau,
+    programs: Union[Mapping[Hashable, Program], Sequence[Program]],
+    calculation_date: str,
+    *,
+    plans: Optional[Mapping[Hashable, ProgramPlan]] = None,
+    simple: bool = True,
+    detail_level: str = DETAIL_LEVEL.FULL,
+    workers: int = 1,
+) -> Dict[Hashable, pd.DataFrame]:
+    """
+    Applique plusieurs programmes au même bordereau (moteur colonnes).
+
+    Le bordereau est validé et normalisé une seule fois ; dates, expositions
+    (par underwriting_department) et codes des colonnes de dimensions sont
+    calculés une fois et partagés par tous les programmes. Les programmes sont
+    répartis sur `workers` processus (colonnes envoyées une fois par worker).
+
+    programs: {clé: Program}, ou liste de Program (clé = program.name, unique)
+    plans: plans déjà compilés, par clé (compilés ici sinon)
+    simple: True → même DataFrame que apply_program_to_bordereau_simple,
+    False → results_df de apply_program_to_bordereau au niveau detail_level.
+
+    Returns:
+        {clé: DataFrame}, dans l'ordre des programmes
+    """
+    check_detail_level(detail_level)
+    check_parallelism(workers, None)
+
+    if isinstance(programs, Mapping):
+        by_key = dict(programs)
+    else:
+        by_key = {}
+        for program in programs:
+            if program.name in by_key:
+                raise ValueError(
+                    f"Duplicate program name '{program.name}': pass a mapping of programs"
+                )
+            by_key[program.name] = program
+
+    bordereau.validate()
+    df = bordereau.to_engine_dataframe()
+    columns = BordereauColumns.from_dataframe(df)
+
+    plans = plans or {}
+    tasks = []
+    for key, program in by_key.items():
+        plan = plans.get(key) or compile_program(program)
+        columns.prepare(plan)
+        tasks.append((program, plan))
+
+    context = {
+        "columns": columns,
+        "calculation_date": calculation_date,
+        "simple": simple,
+        "detail_level": detail_level,
+    }
+    results = map_tasks(_program_results, tasks, context, workers=workers)
+    return dict(zip(by_key, results))
+
+
+def apply_program_to_bordereau_dates(
+    bordereau: Bordereau,
+    program: Program,
+    calculation_dates: Sequence[str],
+    *,
+    plan: Optional[ProgramPlan] = None,
+) -> pd.DataFrame:
+    """
+    Applique un programme à un bordereau pour plusieurs dates de calcul (ex: vues
+    run-off mensuelles), en une passe du moteur colonnes.
+
+    Exposition, devise, matching des conditions et fenêtres RA sont calculés une
+    fois ; seuls l'activité des polices, les fenêtres LO et les exclusions datées
+    sont évalués par date.
+
+    Returns:
+        DataFrame long : colonnes de apply_program_to_bordereau_simple, index
+        (calculation_date, index du bordereau), dates dans l'ordre fourni.
+    """
+    dates = list(calculation_dates)
+    if not dates:
+        raise ValueError("At least one calculation date is required")
+    timestamps = pd.to_datetime(dates)
+    if timestamps.has_duplicates:
+        raise ValueError(f"Duplicate calculation dates: {dates}")
+
+    # Associe le programme au bordereau si pas déjà fait
+    if not bordereau.program:
+        bordereau.program = program
+
+    # Validation complète du bordereau
+    bordereau.validate()
+
+    df = bordereau.to_engine_dataframe()
+    runs = apply_program_vectorized_dates(
+        df, program, dates, plan=plan, detail_level=DETAIL_LEVEL.TOTALS
+    )
+    return pd.concat(
+        [run.to_simple_dataframe() for run in runs],
+        keys=timestamps,
+        names=["calculation_date", df.index.name],
+    )
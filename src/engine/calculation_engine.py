@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, Optional
 from src.domain import Program
 
 # FIELDS supprimé - utilisation directe des clés canoniques
@@ -10,15 +10,25 @@ from .policy_lifecycle import (
     create_currency_mismatch_result,
 )
 from .structure_orchestrator import StructureProcessor
-from .results import ProgramRunResult
+from .results import DETAIL_LEVEL, ProgramRunResult
 from .currency_validator import CurrencyValidator
+from .program_plan import ProgramPlan
 
 
 def apply_program(
     policy: Policy,
     program: Program,
     calculation_date: str,
+    *,
+    plan: Optional[ProgramPlan] = None,
+    detail_level: str = DETAIL_LEVEL.FULL,
 ) -> ProgramRunResult:
+    """
+    Applique un programme à une police.
+
+    detail_level: "totals" (totaux seuls), "matched_id" (détail par structure
+    sans matching_details) ou "full" (diagnostics complets, défaut).
+    """
 
     is_policy_active, inactive_reason = policy.is_active(calculation_date)
     if not is_policy_active:
@@ -26,21 +36,28 @@ def apply_program(
 
     # Validation de devise AVANT les exclusions
     is_currency_valid, currency_error = CurrencyValidator.validate_policy_currency(
-        policy, program
+        policy, program, index=plan.currency_index if plan else None
     )
     if not is_currency_valid:
         return create_currency_mismatch_result(policy, program, currency_error)
 
-    is_excl, reason = check_program_exclusions(
-        policy, program, calculation_date=calculation_date
-    )
+    if plan is not None:
+        is_excl, reason = plan.exclusions_for(calculation_date).check(policy)
+    else:
+        is_excl, reason = check_program_exclusions(
+            policy, program, calculation_date=calculation_date
+        )
     if is_excl:
         res = create_excluded_result(policy, program)
         res.exclusion_reason = reason
         return res
 
     run = StructureProcessor(
-        policy, program, calculation_date=calculation_date
+        policy,
+        program,
+        calculation_date=calculation_date,
+        plan=plan,
+        detail_level=detail_level,
     ).process_structures()
 
     exposure = policy.exposure_bundle(program.underwriting_department).total
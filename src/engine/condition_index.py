@@ -0,0 +1,208 @@
+"""
+Index inversé des conditions d'une structure.
+
+Les conditions sont rangées une fois par spécificité décroissante (ordre
+d'origine en cas d'égalité, comme le tri stable de match_condition) ; le bit i
+d'un masque représente la condition de rang i. Pour chaque dimension, on garde
+le masque des conditions non contraintes et, par valeur, le masque des
+conditions qui l'acceptent. Le meilleur match est le bit le plus bas de
+l'intersection des masques des dimensions.
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from src.domain import Condition
+from src.domain.policy import Policy
+from .condition_matcher import _specificity_increment
+
+
+class ConditionIndex:
+    def __init__(self, conditions: List[Condition], dimension_columns: List[str]):
+        self.dimension_columns = list(dimension_columns)
+
+        # Contraintes et score de chaque condition (même ordre de sommation que match_condition)
+        constraints: List[Dict[str, List[Any]]] = []
+        scores: List[float] = []
+        for condition in conditions:
+            per_dim = {}
+            score = 0.0
+            for dimension in self.dimension_columns:
+                cond_vals = condition.get_values(dimension)
+                if cond_vals is not None and len(cond_vals) > 0:
+                    per_dim[dimension] = cond_vals
+                    score += _specificity_increment(cond_vals)
+            constraints.append(per_dim)
+            scores.append(score)
+
+        order = sorted(range(len(conditions)), key=lambda i: (-scores[i], i))
+        self._ranked: List[Condition] = [conditions[i] for i in order]
+        self._ranked_scores: List[float] = [scores[i] for i in order]
+        self._ranked_constraints = [constraints[i] for i in order]
+        self._rank_of: Dict[int, int] = {i: rank for rank, i in enumerate(order)}
+        self._position_of: List[int] = order
+        self._position_by_id: Dict[int, int] = {
+            id(c): i for i, c in enumerate(conditions)
+        }
+        self._all = (1 << len(conditions)) - 1
+
+        self._unconstrained: Dict[str, int] = {}
+        self._by_value: Dict[str, Dict[str, int]] = {}
+        for dimension in dict.fromkeys(self.dimension_columns):
+            free = 0
+            by_value: Dict[str, int] = {}
+            for rank, per_dim in enumerate(self._ranked_constraints):
+                cond_vals = per_dim.get(dimension)
+                if cond_vals is None:
+                    free |= 1 << rank
+                    continue
+                for value in {str(v).strip() for v in cond_vals}:
+                    by_value[value] = by_value.get(value, 0) | (1 << rank)
+            self._unconstrained[dimension] = free
+            self._by_value[dimension] = by_value
+
+    def __len__(self) -> int:
+        return len(self._ranked)
+
+    # ─── Masques ──────────────────────────────────────────────────────────
+    def _value_bits(self, dimension: str, policy_value: Any) -> int:
+        """Conditions contraintes sur `dimension` qui acceptent la valeur (règles de _values_match)."""
+        if policy_value is None or (
+            isinstance(policy_value, float) and pd.isna(policy_value)
+        ):
+            return 0
+        if isinstance(policy_value, (list, tuple, set)):
+            bits = 0
+            for pv in policy_value:
+                bits |= self._value_bits(dimension, pv)
+            return bits
+        if not isinstance(policy_value, str):
+            return 0
+        return self._by_value[dimension].get(policy_value.strip(), 0)
+
+    def dimension_bits(self, dimension: str, policy_value: Any) -> int:
+        """Masque des conditions compatibles avec la valeur de police sur une dimension."""
+        return self._unconstrained[dimension] | self._value_bits(
+            dimension, policy_value
+        )
+
+    def candidates(self, policy_values: Dict[str, Any]) -> int:
+        bits = self._all
+        for dimension in self.dimension_columns:
+            if not bits:
+                break
+            bits &= self.dimension_bits(dimension, policy_values[dimension])
+        return bits
+
+    def best_rank(self, bits: int) -> Optional[int]:
+        if not bits:
+            return None
+        return (bits & -bits).bit_length() - 1
+
+    def position_of(self, condition: Optional[Condition]) -> int:
+        """Position d'une condition de l'index dans la liste d'origine, -1 si absente."""
+        if condition is None:
+            return -1
+        return self._position_by_id.get(id(condition), -1)
+
+    def rank_of(self, position: int) -> int:
+        """Rang (bit) de la condition située à `position` dans la liste d'origine."""
+        return self._rank_of[position]
+
+    # ─── Drop-in de condition_matcher ─────────────────────────────────────
+    def match(self, policy: Policy) -> Optional[Condition]:
+        """Équivalent de match_condition(policy, conditions, dimension_columns)."""
+        rank = self._match_rank(policy)
+        return self._ranked[rank] if rank is not None else None
+
+    def match_position(self, policy: Policy) -> int:
+        """Position de la condition retenue dans la liste d'origine, -1 si aucune."""
+        rank = self._match_rank(policy)
+        return self._position_of[rank] if rank is not None else -1
+
+    def _match_rank(self, policy: Policy) -> Optional[int]:
+        bits = self._all
+        for dimension in self.dimension_columns:
+            if not bits:
+                return None
+            if self._unconstrained[dimension] & bits == bits:
+                continue  # aucune condition restante n'est contrainte ici
+            bits &= self.dimension_bits(
+                dimension, policy.get_dimension_value(dimension)
+            )
+        return self.best_rank(bits)
+
+    def match_with_details(
+        self, policy: Policy
+    ) -> Tuple[Optional[Condition], Dict[str, Any]]:
+        """Équivalent de match_condition_with_details(policy, conditions, dimension_columns)."""
+        policy_values = {
+            dimension: policy.get_dimension_value(dimension)
+            for dimension in self.dimension_columns
+        }
+        matching_details = {
+            "matched_condition": None,
+            "matching_score": 0.0,
+            "dimension_matches": {},
+            "failed_conditions": [],
+            "policy_values": dict(policy_values),
+        }
+
+        dim_bits = {
+            dimension: self.dimension_bits(dimension, policy_values[dimension])
+            for dimension in dict.fromkeys(self.dimension_columns)
+        }
+        bits = self._all
+        for dimension in self.dimension_columns:
+            bits &= dim_bits[dimension]
+        best = self.best_rank(bits)
+
+        # Détails par condition, dans l'ordre d'origine
+        for position in range(len(self._ranked)):
+            rank = self._rank_of[position]
+            if rank != best and (bits >> rank) & 1:
+                continue  # condition compatible mais non retenue : absente des détails
+            details = self._condition_details(rank, policy_values, dim_bits)
+            if rank == best:
+                matching_details["matched_condition"] = self._ranked[rank]
+                matching_details["matching_score"] = details["score"]
+                matching_details["dimension_matches"] = details["dimension_matches"]
+            else:
+                matching_details["failed_conditions"].append(details)
+
+        if best is None:
+            return None, matching_details
+        return self._ranked[best], matching_details
+
+    def _condition_details(
+        self, rank: int, policy_values: Dict[str, Any], dim_bits: Dict[str, int]
+    ) -> Dict[str, Any]:
+        condition_details = {
+            "condition": self._ranked[rank],
+            "score": 0.0,
+            "dimension_matches": {},
+            "failed_dimensions": [],
+        }
+        constraints = self._ranked_constraints[rank]
+        for dimension in self.dimension_columns:
+            cond_vals = constraints.get(dimension)
+            if cond_vals is None:
+                condition_details["dimension_matches"][dimension] = {
+                    "condition_values": None,
+                    "policy_value": policy_values[dimension],
+                    "matches": True,
+                }
+                continue
+            matches = bool((dim_bits[dimension] >> rank) & 1)
+            condition_details["dimension_matches"][dimension] = {
+                "condition_values": cond_vals,
+                "policy_value": policy_values[dimension],
+                "matches": matches,
+            }
+            if matches:
+                condition_details["score"] += _specificity_increment(cond_vals)
+            else:
+                condition_details["failed_dimensions"].append(dimension)
+        return condition_details
@@ -2,12 +2,102 @@
 Service de validation de cohérence des devises entre polices et programmes.
 """
 
-from typing import Optional, List
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Optional, List, Tuple
 from src.domain.policy import Policy
 from src.domain.program import Program
 from src.domain.condition import Condition
 
 
+def _no_currency_error(program: Program) -> str:
+    return f"Policy has no currency but program requires '{program.main_currency}'"
+
+
+def _mismatch_error(program: Program, policy_currencies: set) -> str:
+    return (
+        f"Policy currencies {list(policy_currencies)} do not match program main currency "
+        f"'{program.main_currency}' and no condition allows any of these currencies"
+    )
+
+
+def _policy_currencies(policy: Policy):
+    """Devises de la police (None si absente) ; liste hull/liab en aviation."""
+    policy_currency = policy.get_dimension_value("CURRENCY")
+    if not policy_currency:
+        return None
+    # Handle list of currencies (aviation case)
+    if isinstance(policy_currency, (list, tuple, set)):
+        return set(policy_currency)
+    return {policy_currency}
+
+
+@dataclass(frozen=True)
+class CurrencyIndex:
+    """
+    Devises autorisées par un programme, calculées une fois.
+    - allowed: devise principale + devises citées par au moins une condition
+    - by_structure: devises citées par les conditions de chaque structure
+    - conditions_by_currency: (structure, position de condition) autorisant chaque devise
+    """
+
+    program: Program
+    allowed: FrozenSet[str]
+    by_structure: Dict[str, FrozenSet[str]]
+    conditions_by_currency: Dict[str, Tuple[Tuple[str, int], ...]]
+    _condition_currencies: Dict[int, FrozenSet[str]]
+
+    @classmethod
+    def build(cls, program: Program) -> "CurrencyIndex":
+        by_structure: Dict[str, FrozenSet[str]] = {}
+        conditions_by_currency: Dict[str, List[Tuple[str, int]]] = {}
+        condition_currencies: Dict[int, FrozenSet[str]] = {}
+        for structure in program.structures:
+            structure_currencies = set()
+            for position, condition in enumerate(structure.conditions):
+                currencies = frozenset(condition.get_values("CURRENCY") or ())
+                condition_currencies[id(condition)] = currencies
+                structure_currencies |= currencies
+                for currency in currencies:
+                    conditions_by_currency.setdefault(currency, []).append(
+                        (structure.structure_name, position)
+                    )
+            by_structure[structure.structure_name] = (
+                by_structure.get(structure.structure_name, frozenset())
+                | frozenset(structure_currencies)
+            )
+        allowed = frozenset({program.main_currency}).union(*by_structure.values())
+        return cls(
+            program=program,
+            allowed=allowed,
+            by_structure=by_structure,
+            conditions_by_currency={
+                currency: tuple(refs) for currency, refs in conditions_by_currency.items()
+            },
+            _condition_currencies=condition_currencies,
+        )
+
+    def condition_currencies(self, condition: Condition) -> FrozenSet[str]:
+        currencies = self._condition_currencies.get(id(condition))
+        if currencies is None:  # condition hors programme (ex: valeurs par défaut)
+            currencies = frozenset(condition.get_values("CURRENCY") or ())
+        return currencies
+
+    def validate(
+        self, policy: Policy, matched_condition: Optional[Condition] = None
+    ) -> tuple[bool, Optional[str]]:
+        """Même résultat que CurrencyValidator.validate_policy_currency, par recherche ensembliste."""
+        policy_currencies = _policy_currencies(policy)
+        if policy_currencies is None:
+            return False, _no_currency_error(self.program)
+        if not self.allowed.isdisjoint(policy_currencies):
+            return True, None
+        if matched_condition and not self.condition_currencies(
+            matched_condition
+        ).isdisjoint(policy_currencies):
+            return True, None
+        return False, _mismatch_error(self.program, policy_currencies)
+
+
 class CurrencyValidator:
     """Service de validation de cohérence des devises"""
     
@@ -15,7 +105,9 @@ class CurrencyValidator:
     def validate_policy_currency(
         policy: Policy, 
         program: Program, 
-        matched_condition: Optional[Condition] = None
+        matched_condition: Optional[Condition] = None,
+        *,
+        index: Optional[CurrencyIndex] = None,
     ) -> tuple[bool, Optional[str]]:
         """
         Valide la cohérence de devise entre une police et un programme.
@@ -24,23 +116,21 @@ class CurrencyValidator:
             policy: Police à valider
             program: Programme avec devise principale
             matched_condition: Condition matchée (optionnelle)
+            index: CurrencyIndex précalculé du programme (optionnel, ex: ProgramPlan.currency_index)
         
         Returns:
             (is_valid, error_reason)
         """
+        if index is not None:
+            return index.validate(policy, matched_condition)
+
         # main_currency est maintenant obligatoire, pas besoin de vérifier
             
-        policy_currency = policy.get_dimension_value("CURRENCY")
+        policy_currencies = _policy_currencies(policy)
         
         # Cas 1: Police sans devise → erreur
-        if not policy_currency:
-            return False, f"Policy has no currency but program requires '{program.main_currency}'"
-        
-        # Handle list of currencies (aviation case)
-        if isinstance(policy_currency, (list, tuple, set)):
-            policy_currencies = set(policy_currency)
-        else:
-            policy_currencies = {policy_currency}
+        if policy_currencies is None:
+            return False, _no_currency_error(program)
         
         # Cas 2: Devise principale du programme dans les devises de police → OK
         if program.main_currency in policy_currencies:
@@ -57,10 +147,7 @@ class CurrencyValidator:
             return True, None
             
         # Cas 5: Mismatch → erreur
-        return False, (
-            f"Policy currencies {list(policy_currencies)} do not match program main currency "
-            f"'{program.main_currency}' and no condition allows any of these currencies"
-        )
+        return False, _mismatch_error(program, policy_currencies)
     
     @staticmethod
     def _condition_allows_currency(condition: Condition, currency: str) -> bool:
@@ -1,6 +1,15 @@
-from typing import Optional
+from dataclasses import dataclass
+from typing import FrozenSet, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.domain.exclusion import ExclusionRule
 from src.domain.program import Program
 from src.domain.policy import Policy
+from .grouping import dimension_source_columns, group_rows, representative_policies
+
+DEFAULT_EXCLUSION_REASON = "Matched exclusion rule"
 
 
 def check_program_exclusions(
@@ -18,5 +27,107 @@ def check_program_exclusions(
 
     for rule in program.exclusions:
         if rule.matches(policy, dim_map, calculation_date=calculation_date):
-            return True, rule.name or "Matched exclusion rule"
+            return True, rule.name or DEFAULT_EXCLUSION_REASON
     return False, None
+
+
+# ─── Règles compilées ───────────────────────────────────────────────────────
+@dataclass(frozen=True)
+class CompiledExclusionRule:
+    reason: str
+    values_by_dimension: Tuple[Tuple[str, FrozenSet[str]], ...]
+
+    def matches(self, policy: Policy) -> bool:
+        for dim, values in self.values_by_dimension:
+            policy_val = policy.get_dimension_value(dim)
+            if policy_val is None or not isinstance(policy_val, str):
+                return False
+            if policy_val.strip() not in values:
+                return False
+        return True
+
+
+def _is_active(rule: ExclusionRule, calc: Optional[pd.Timestamp]) -> bool:
+    """Filtre temporel de ExclusionRule.matches, évalué une fois pour la date de calcul."""
+    if rule.effective_date is not None or rule.expiry_date is not None:
+        if calc is None:
+            return False
+        if rule.effective_date and calc < rule.effective_date:
+            return False
+        if rule.expiry_date and calc >= rule.expiry_date:
+            return False
+    return True
+
+
+@dataclass(frozen=True)
+class CompiledExclusions:
+    """
+    Exclusions d'un programme compilées pour une date de calcul :
+    règles inactives ou sans dimension écartées, valeurs déjà normalisées.
+    Même résultat que check_program_exclusions.
+    """
+
+    rules: Tuple[CompiledExclusionRule, ...]
+    calculation_date: Optional[str] = None
+
+    @classmethod
+    def compile(
+        cls, program: Program, calculation_date: Optional[str] = None
+    ) -> "CompiledExclusions":
+        calc = pd.to_datetime(calculation_date) if calculation_date else None
+        rules = tuple(
+            CompiledExclusionRule(
+                reason=rule.name or DEFAULT_EXCLUSION_REASON,
+                values_by_dimension=tuple(
+                    (dim, frozenset(str(v).strip() for v in values))
+                    for dim, values in rule.values_by_dimension.items()
+                ),
+            )
+            for rule in program.exclusions
+            if rule.values_by_dimension and _is_active(rule, calc)
+        )
+        return cls(rules=rules, calculation_date=calculation_date)
+
+    @property
+    def dimensions(self) -> Tuple[str, ...]:
+        return tuple(
+            dict.fromkeys(
+                dim for rule in self.rules for dim, _ in rule.values_by_dimension
+            )
+        )
+
+    def check(self, policy: Policy) -> tuple[bool, Optional[str]]:
+        for rule in self.rules:
+            if rule.matches(policy):
+                return True, rule.reason
+        return False, None
+
+    @property
+    def reasons(self) -> Tuple[str, ...]:
+        """Raisons distinctes des règles, dans l'ordre : catégories des codes de `mask`."""
+        return tuple(dict.fromkeys(rule.reason for rule in self.rules))
+
+    def mask(
+        self, df: pd.DataFrame, uw_dept: Optional[str]
+    ) -> Tuple[np.ndarray, Tuple[str, ...]]:
+        """
+        Exclusions d'un bordereau entier : (code int32 de la raison par ligne,
+        -1 = non exclue ; catégories code → raison), comme ResultStore.
+        Les règles sont évaluées une fois par combinaison distincte des colonnes concernées.
+        """
+        categories = self.reasons
+        n = len(df)
+        if not self.rules or n == 0:
+            return np.full(n, -1, dtype=np.int32), categories
+
+        code_of = {reason: code for code, reason in enumerate(categories)}
+        columns = dimension_source_columns(df.columns, list(self.dimensions), uw_dept)
+        group_of_row, first = group_rows(df, columns)
+        group_codes = np.array(
+            [
+                code_of.get(self.check(policy)[1], -1)
+                for policy in representative_policies(df, columns, first, uw_dept)
+            ],
+            dtype=np.int32,
+        )
+        return group_codes[group_of_row], categories
@@ -0,0 +1,78 @@
+"""
+Regroupement des lignes d'un bordereau par valeurs de colonnes.
+
+Tout ce qui ne dépend que des valeurs de dimensions (validation de devise,
+exclusions, matching des conditions) est évalué une fois par combinaison
+distincte de ces valeurs puis diffusé aux lignes : moteur vectorisé,
+exclusions compilées et mémoïsation partagent ces fonctions.
+"""
+
+from __future__ import annotations
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.domain.policy import Policy
+from src.schema.bordereau_mapping import columns_for_dimension
+
+# Garde None distinct de NaN à la factorisation (le moteur ligne les distingue)
+_NONE = object()
+
+
+def dimension_source_columns(
+    columns, dimensions: List[str], uw_dept: Optional[str]
+) -> List[str]:
+    """Colonnes du bordereau lues par Policy.get_dimension_value pour ces dimensions."""
+    sources: List[str] = []
+    for dimension in dimensions:
+        if dimension in columns:
+            candidates = [dimension]
+        else:
+            candidates = [
+                c for c in columns_for_dimension(dimension, uw_dept) if c in columns
+            ]
+        for col in candidates:
+            if col not in sources:
+                sources.append(col)
+    return sources
+
+
+def group_rows(df: pd.DataFrame, columns: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Regroupe les lignes ayant les mêmes valeurs sur `columns`.
+
+    Retourne (groupe de chaque ligne, position d'une ligne représentative par groupe).
+    """
+    return group_codes(len(df), [column_codes(df, col) for col in columns])
+
+
+def column_codes(df: pd.DataFrame, col: str) -> np.ndarray:
+    """Code entier de la valeur de chaque ligne dans `col` (None et NaN distincts)."""
+    values = df[col].to_numpy(dtype=object)
+    values = np.where(values == None, _NONE, values)  # noqa: E711
+    codes, _ = pd.factorize(values)
+    return codes.astype(np.int64, copy=False)
+
+
+def group_codes(n: int, codes: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """group_rows à partir des codes de chaque colonne (cf column_codes)."""
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    if not codes:
+        return np.zeros(n, dtype=np.int64), np.zeros(1, dtype=np.int64)
+
+    _, first, inverse = np.unique(
+        np.column_stack(codes), axis=0, return_index=True, return_inverse=True
+    )
+    return inverse.reshape(-1), first
+
+
+def representative_policies(
+    df: pd.DataFrame, columns: List[str], first: np.ndarray, uw_dept: Optional[str]
+) -> List[Policy]:
+    """Une Policy par groupe, construite sur les seules colonnes de regroupement."""
+    records = (
+        df[columns].iloc[first].to_dict("records") if columns else [{}] * len(first)
+    )
+    return [Policy(raw=record, uw_dept=uw_dept) for record in records]
@@ -0,0 +1,93 @@
+"""
+Mémoïsation par signature de police.
+
+Deux lignes de bordereau qui ne diffèrent que par leur identité (policy_id,
+INSURED_NAME) produisent le même résultat : on calcule une fois par signature
+(valeurs de dimensions, dates de cycle de vie / référence RA-LO, entrées
+d'exposition) et on diffuse le résultat à toutes les lignes concernées.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .program_plan import ProgramPlan
+from .grouping import dimension_source_columns, group_rows
+
+# Colonnes lues par les calculateurs d'exposition (src.domain.exposure)
+EXPOSURE_INPUT_COLUMNS: Dict[str, List[str]] = {
+    "aviation": ["HULL_LIMIT", "HULL_SHARE", "LIAB_LIMIT", "LIAB_SHARE"],
+    "casualty": ["OCCURRENCE_LIMIT_100_ORIG", "CEDENT_SHARE"],
+    "test": ["exposure"],
+}
+
+# Expiration (statut inactive) et date de référence RA (inception)
+LIFECYCLE_COLUMNS = ["INCEPTION_DT", "EXPIRE_DT"]
+
+
+@dataclass
+class MemoizationStats:
+    rows: int
+    unique_signatures: int
+
+    @property
+    def hits(self) -> int:
+        """Lignes servies depuis le cache (non recalculées)."""
+        return self.rows - self.unique_signatures
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.rows if self.rows else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "unique_signatures": self.unique_signatures,
+            "hits": self.hits,
+            "hit_rate": self.hit_rate,
+        }
+
+
+def signature_columns(columns, plan: ProgramPlan) -> List[str]:
+    """Colonnes du DataFrame moteur dont dépend le résultat d'une police."""
+    dimensions = list(plan.dimension_columns) + ["CURRENCY"]
+    for rule in plan.program.exclusions:
+        dimensions.extend(rule.values_by_dimension.keys())
+    signature = dimension_source_columns(columns, dimensions, plan.uw_dept)
+    for col in LIFECYCLE_COLUMNS + EXPOSURE_INPUT_COLUMNS.get(
+        (plan.uw_dept or "").lower(), []
+    ):
+        if col in columns and col not in signature:
+            signature.append(col)
+    return signature
+
+
+def signature_groups(
+    df: pd.DataFrame, plan: ProgramPlan
+) -> Tuple[np.ndarray, np.ndarray, MemoizationStats]:
+    """(signature par ligne, ligne représentative par signature, statistiques)."""
+    group_of_row, first = group_rows(df, signature_columns(df.columns, plan))
+    return group_of_row, first, MemoizationStats(len(df), len(first))
+
+
+def broadcast_results(
+    unique_results: pd.DataFrame,
+    group_of_row: np.ndarray,
+    df: pd.DataFrame,
+    per_row_columns: Dict[str, str],
+    stats: MemoizationStats,
+) -> pd.DataFrame:
+    """
+    Diffuse les résultats calculés par signature sur toutes les lignes de `df`.
+    per_row_columns: {colonne résultat: colonne source} recopiées ligne à ligne
+    (identité de la police, hors signature).
+    """
+    results = unique_results.iloc[group_of_row].set_axis(df.index)
+    for result_col, source_col in per_row_columns.items():
+        if result_col in results.columns and source_col in df.columns:
+            results[result_col] = df[source_col].to_numpy()
+    results.attrs["memoization"] = stats.as_dict()
+    return results
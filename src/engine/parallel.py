@@ -0,0 +1,112 @@
+"""
+Exécution d'un bordereau par tranches, éventuellement sur plusieurs processus.
+map_tasks répartit de même des tâches indépendantes (ex: un programme chacune).
+
+Les tranches sont découpées de façon déterministe (positions consécutives) et
+réassemblées dans l'ordre d'origine : le résultat ne dépend ni du nombre de
+workers ni de la taille des tranches. Le contexte (programme, plan compilé,
+options) est envoyé une seule fois à chaque worker via l'initializer du pool.
+"""
+
+from __future__ import annotations
+import math
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+ChunkFunction = Callable[[pd.DataFrame, Dict[str, Any]], pd.DataFrame]
+
+# Contexte du worker courant (renseigné par _init_worker)
+_WORKER_CONTEXT: Dict[str, Any] = {}
+
+
+def check_parallelism(workers: int, chunk_size: Optional[int]) -> None:
+    if not isinstance(workers, int) or workers < 1:
+        raise ValueError(f"workers must be a positive integer, got {workers!r}")
+    if chunk_size is not None and (not isinstance(chunk_size, int) or chunk_size < 1):
+        raise ValueError(f"chunk_size must be a positive integer, got {chunk_size!r}")
+
+
+def chunk_bounds(n_rows: int, chunk_size: int) -> List[Tuple[int, int]]:
+    """Bornes [start, stop) des tranches successives."""
+    return [
+        (start, min(start + chunk_size, n_rows))
+        for start in range(0, n_rows, chunk_size)
+    ]
+
+
+def default_chunk_size(n_rows: int, workers: int) -> int:
+    # Quelques tranches par worker pour lisser les écarts de durée
+    return max(1, math.ceil(n_rows / (workers * 4)))
+
+
+def _init_worker(context: Dict[str, Any]) -> None:
+    _WORKER_CONTEXT.clear()
+    _WORKER_CONTEXT.update(context)
+
+
+def _run_chunk(func: ChunkFunction, chunk: pd.DataFrame) -> pd.DataFrame:
+    return func(chunk, _WORKER_CONTEXT)
+
+
+def map_chunks(
+    df: pd.DataFrame,
+    func: ChunkFunction,
+    context: Dict[str, Any],
+    *,
+    workers: int = 1,
+    chunk_size: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Applique `func(chunk, context)` à chaque tranche de `df` et concatène les résultats.
+
+    `func` doit être une fonction de module (picklable) ; `context` est transmis
+    une fois par worker. Avec workers=1 tout s'exécute dans le processus courant.
+    """
+    check_parallelism(workers, chunk_size)
+    n_rows = len(df)
+    if chunk_size is None:
+        if workers == 1:
+            return func(df, context)
+        chunk_size = default_chunk_size(n_rows, workers)
+    bounds = chunk_bounds(n_rows, chunk_size)
+    if len(bounds) <= 1:
+        return func(df, context)
+
+    chunks = [df.iloc[start:stop] for start, stop in bounds]
+    if workers == 1:
+        results = [func(chunk, context) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(chunks)),
+            initializer=_init_worker,
+            initargs=(context,),
+        ) as pool:
+            # map conserve l'ordre de soumission
+            results = list(pool.map(_run_chunk, [func] * len(chunks), chunks))
+    return pd.concat(results)
+
+
+def map_tasks(
+    func: Callable[[Any, Dict[str, Any]], Any],
+    tasks: Sequence[Any],
+    context: Dict[str, Any],
+    *,
+    workers: int = 1,
+) -> List[Any]:
+    """
+    Applique `func(task, context)` à chaque tâche ; résultats dans l'ordre des tâches.
+
+    Même contrat que map_chunks : `func` est une fonction de module et
+    `context` (ex: colonnes du bordereau) n'est transmis qu'une fois par worker.
+    """
+    check_parallelism(workers, None)
+    if workers == 1 or len(tasks) <= 1:
+        return [func(task, context) for task in tasks]
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(tasks)),
+        initializer=_init_worker,
+        initargs=(context,),
+    ) as pool:
+        return list(pool.map(_run_chunk, [func] * len(tasks), tasks))
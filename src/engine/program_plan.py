@@ -0,0 +1,291 @@
+"""
+Plan d'exécution compilé une fois par programme.
+
+Tout ce qui ne dépend que du programme (ordre des structures, chaînage des
+prédécesseurs, produits, bornes de dates, conditions par défaut, termes en
+colonnes) est préparé ici, pour que le coût par police se limite au calcul.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.domain import PRODUCT, Condition, Program, Structure
+from src.domain.products import PRODUCT_REGISTRY, Product
+from .condition_index import ConditionIndex
+from .currency_validator import CurrencyIndex
+from .exclusion_matcher import CompiledExclusions
+
+DEFAULT_CONDITION = -1
+
+
+@dataclass
+class ProductKernel:
+    """Termes des conditions d'une structure en tableaux (défaut à l'indice -1)."""
+
+    type_of_participation: str
+    product: Optional[Product]
+    conditions: List[Optional[Condition]]
+    default_error: Optional[Exception]
+    cession_pct: np.ndarray
+    limit: np.ndarray
+    attachment: np.ndarray
+    signed_share: np.ndarray
+    includes_hull: np.ndarray
+    includes_liability: np.ndarray
+
+    @classmethod
+    def build(
+        cls,
+        type_of_participation: str,
+        conditions: List[Condition],
+        default: Optional[Condition],
+        default_error: Optional[Exception],
+    ) -> "ProductKernel":
+        all_conditions = list(conditions) + [default]
+
+        def _floats(attr: str) -> np.ndarray:
+            return np.array(
+                [
+                    (
+                        np.nan
+                        if c is None or pd.isna(getattr(c, attr))
+                        else float(getattr(c, attr))
+                    )
+                    for c in all_conditions
+                ],
+                dtype=float,
+            )
+
+        def _flags(attr: str) -> np.ndarray:
+            # Défaut (aucune condition matchée) → total hull + liability
+            return np.array(
+                [
+                    c is None or c is default or getattr(c, attr) is True
+                    for c in all_conditions
+                ],
+                dtype=bool,
+            )
+
+        return cls(
+            type_of_participation=type_of_participation,
+            product=PRODUCT_REGISTRY.get(type_of_participation),
+            conditions=all_conditions,
+            default_error=default_error,
+            cession_pct=_floats("cession_pct"),
+            limit=_floats("limit"),
+            attachment=_floats("attachment"),
+            signed_share=_floats("signed_share"),
+            includes_hull=_flags("includes_hull"),
+            includes_liability=_flags("includes_liability"),
+        )
+
+    def condition_at(self, index: int) -> Condition:
+        condition = self.conditions[index]
+        if condition is None:
+            raise self.default_error
+        return condition
+
+    def validate(self, used: np.ndarray) -> None:
+        """Valide le produit sur chaque condition effectivement appliquée."""
+        if self.product is None:
+            raise ValueError(f"Unknown product type: {self.type_of_participation}")
+        for index in np.unique(used):
+            self.product.apply(0.0, self.condition_at(int(index)))
+
+    def cede(self, exposure: np.ndarray, index: np.ndarray) -> np.ndarray:
+        """Cédé à la layer (100 %) par ligne, `index` : condition de chaque ligne."""
+        if self.type_of_participation == PRODUCT.QUOTA_SHARE:
+            ceded = exposure * self.cession_pct[index]
+            limit = self.limit[index]
+            return np.where(np.isnan(limit), ceded, np.minimum(ceded, limit))
+        attachment = self.attachment[index]
+        return np.where(
+            exposure <= attachment,
+            0.0,
+            np.minimum(exposure - attachment, self.limit[index]),
+        )
+
+
+@dataclass
+class StructurePlan:
+    structure: Structure
+    position: int  # rang dans ProgramPlan.structures
+    predecessor_index: Optional[int]
+    product: Optional[Product]
+    inception_date: pd.Timestamp
+    expiry_date: pd.Timestamp
+    default_condition: Optional[Condition]
+    default_error: Optional[Exception] = field(default=None, repr=False)
+    dimension_columns: List[str] = field(default_factory=list, repr=False)
+
+    @property
+    def name(self) -> str:
+        return self.structure.structure_name
+
+    @property
+    def type_of_participation(self) -> str:
+        return self.structure.type_of_participation
+
+    @property
+    def conditions(self) -> List[Condition]:
+        return self.structure.conditions
+
+    def resolve_default(self) -> Condition:
+        """Condition par défaut de la structure (erreur différée si les valeurs par défaut sont invalides)."""
+        if self.default_condition is None:
+            raise self.default_error
+        return self.default_condition
+
+    def is_equivalent_to_default(self, condition: Condition) -> bool:
+        """
+        Détermine si une condition est équivalente aux valeurs par défaut de la structure.
+        Une condition est considérée comme équivalente aux valeurs par défaut si :
+        1. Elle n'a aucune contrainte sur les dimensions (toutes les dimensions sont None)
+        2. ET elle a les mêmes valeurs que les valeurs par défaut de la structure
+        """
+        structure = self.structure
+        # Vérifier qu'aucune dimension n'est contrainte
+        for dimension in self.dimension_columns:
+            if condition.has_dimension(dimension):
+                return False  # Cette condition a des contraintes spécifiques
+
+        # Vérifier que les valeurs correspondent aux valeurs par défaut de la structure
+        if structure.type_of_participation == PRODUCT.QUOTA_SHARE:
+            # Pour quota share, comparer cession_pct et signed_share
+            if condition.cession_pct != structure.cession_pct:
+                return False
+            if condition.signed_share != structure.signed_share:
+                return False
+        elif structure.type_of_participation == PRODUCT.EXCESS_OF_LOSS:
+            # Pour excess of loss, comparer attachment et limit
+            if condition.attachment != structure.attachment:
+                return False
+            if condition.limit != structure.limit:
+                return False
+            if condition.signed_share != structure.signed_share:
+                return False
+
+        return True
+
+    @cached_property
+    def condition_index(self) -> ConditionIndex:
+        return ConditionIndex(self.conditions, self.dimension_columns)
+
+    @cached_property
+    def kernel(self) -> ProductKernel:
+        return ProductKernel.build(
+            self.type_of_participation,
+            self.conditions,
+            self.default_condition,
+            self.default_error,
+        )
+
+
+@dataclass
+class ProgramPlan:
+    program: Program
+    structures: Tuple[StructurePlan, ...]  # ordre logique (QS puis XOL par attachment)
+    topological_order: Tuple[int, ...]  # prédécesseurs avant successeurs
+    uw_dept: Optional[str]
+    dimension_columns: List[str]
+    by_name: Dict[str, int]
+    _exclusions: Dict[Optional[str], CompiledExclusions] = field(
+        default_factory=dict, repr=False
+    )
+
+    @property
+    def is_aviation(self) -> bool:
+        return (self.uw_dept or "").lower() == "aviation"
+
+    @cached_property
+    def currency_index(self) -> CurrencyIndex:
+        return CurrencyIndex.build(self.program)
+
+    def exclusions_for(self, calculation_date: Optional[str]) -> CompiledExclusions:
+        """Exclusions compilées pour une date de calcul (mises en cache)."""
+        compiled = self._exclusions.get(calculation_date)
+        if compiled is None:
+            compiled = CompiledExclusions.compile(self.program, calculation_date)
+            self._exclusions[calculation_date] = compiled
+        return compiled
+
+    def structure_named(self, name: Optional[str]) -> Optional[StructurePlan]:
+        position = self.by_name.get(name)
+        return self.structures[position] if position is not None else None
+
+    def predecessor_of(self, structure_plan: StructurePlan) -> Optional[StructurePlan]:
+        if structure_plan.predecessor_index is None:
+            return None
+        return self.structures[structure_plan.predecessor_index]
+
+
+def _topological_order(
+    structures: List[Structure], predecessor_index: List[Optional[int]]
+) -> Tuple[int, ...]:
+    order: List[int] = []
+    state: Dict[int, str] = {}
+
+    def visit(i: int, path: List[str]) -> None:
+        if state.get(i) == "done":
+            return
+        if state.get(i) == "visiting":
+            cycle = " -> ".join(path + [structures[i].structure_name])
+            raise ValueError(f"Cyclic predecessor chain between structures: {cycle}")
+        state[i] = "visiting"
+        pred = predecessor_index[i]
+        if pred is not None:
+            visit(pred, path + [structures[i].structure_name])
+        state[i] = "done"
+        order.append(i)
+
+    for i in range(len(structures)):
+        visit(i, [])
+    return tuple(order)
+
+
+def compile_program(program: Program) -> ProgramPlan:
+    """Compile un Program en ProgramPlan réutilisable pour toutes les polices."""
+    structures = program._sort_structures_logically()
+    dimension_columns = list(program.dimension_columns)
+    by_name: Dict[str, int] = {}
+    for i, structure in enumerate(structures):
+        by_name.setdefault(structure.structure_name, i)
+
+    predecessor_index = [
+        by_name.get(s.predecessor_title) if s.has_predecessor() else None
+        for s in structures
+    ]
+
+    plans = []
+    for i, structure in enumerate(structures):
+        try:
+            default, default_error = structure.create_default_condition(), None
+        except ValueError as e:
+            default, default_error = None, e
+        plans.append(
+            StructurePlan(
+                structure=structure,
+                position=i,
+                predecessor_index=predecessor_index[i],
+                product=PRODUCT_REGISTRY.get(structure.type_of_participation),
+                inception_date=structure.inception_date,
+                expiry_date=structure.expiry_date,
+                default_condition=default,
+                default_error=default_error,
+                dimension_columns=dimension_columns,
+            )
+        )
+
+    return ProgramPlan(
+        program=program,
+        structures=tuple(plans),
+        topological_order=_topological_order(structures, predecessor_index),
+        uw_dept=program.underwriting_department,
+        dimension_columns=dimension_columns,
+        by_name=by_name,
+    )
@@ -0,0 +1,339 @@
+"""
+Stockage colonnes des résultats d'un run (struct-of-arrays).
+
+Au lieu d'un ProgramRunResult (et de ses StructureRun, Conditions, termes,
+dicts...) par police, un ResultStore garde :
+  - par police : tableaux float64 contigus + codes catégoriels (statut, raison)
+  - par police couverte × structure : matrices float64 (entrée, cédé, retenu),
+    codes int8 (raison, scope) et l'id int32 de la condition appliquée
+Les formes historiques (to_rows / to_simple_rows / to_dict) sont produites à
+la demande par les vues, police par police.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .program_plan import StructurePlan
+from .results import DETAIL_LEVEL
+from .results_terms import (
+    create_empty_terms,
+    create_terms_from_condition,
+    terms_as_dict,
+)
+
+STATUS_CATEGORIES = ("included", "inactive", "currency_mismatch", "excluded")
+REASON_CATEGORIES = ("", "out_of_period", "already_processed")
+SCOPE_CATEGORIES = ("total", "hull", "liability", "hull;liability")
+
+# matched_condition_id d'une structure non appliquée (-1 = valeurs par défaut)
+NOT_APPLIED = -2
+
+
+def encode(values: np.ndarray, categories: Sequence[str]) -> np.ndarray:
+    """Codes int8 de `values` dans `categories` (None → catégorie 0)."""
+    codes = np.zeros(len(values), dtype=np.int8)
+    for code, category in enumerate(categories):
+        if code:
+            codes[values == category] = code
+    return codes
+
+
+def _as_float_matrix(columns: List[np.ndarray], rows: np.ndarray) -> np.ndarray:
+    if not columns:
+        return np.zeros((len(rows), 0))
+    return np.stack([np.asarray(c, dtype=float)[rows] for c in columns], axis=1)
+
+
+@dataclass
+class ResultStore:
+    index: pd.Index
+    structure_plans: Tuple[StructurePlan, ...]
+    detail_level: str
+
+    # ─── Par police (n) ───────────────────────────────────────────────────
+    status_codes: np.ndarray  # int8, STATUS_CATEGORIES
+    exclusion_reason_codes: np.ndarray  # int32, -1 = None
+    exclusion_reason_categories: Tuple[str, ...]
+    exposure: np.ndarray
+    effective_exposure: np.ndarray
+    ceded_to_layer_100pct: np.ndarray
+    ceded_to_reinsurer: np.ndarray
+    insured_name: np.ndarray
+    policy_inception_date: np.ndarray
+    policy_expiry_date: np.ndarray
+
+    # ─── Par police couverte (m) × structure (S) ──────────────────────────
+    covered: np.ndarray  # positions des polices couvertes
+    applied: np.ndarray  # bool (m, S)
+    reason_codes: np.ndarray  # int8 (m, S), REASON_CATEGORIES
+    scope_codes: np.ndarray  # int8 (m, S), SCOPE_CATEGORIES
+    matched_condition_id: np.ndarray  # int32 (m, S), NOT_APPLIED si non appliquée
+    input_exposure: np.ndarray
+    structure_ceded_to_layer_100pct: np.ndarray
+    structure_ceded_to_reinsurer: np.ndarray
+    retained_after: np.ndarray
+    hull_input: Optional[np.ndarray] = None
+    liability_input: Optional[np.ndarray] = None
+    matching_details: Optional[np.ndarray] = None  # object (m, S), detail_level "full"
+
+    @classmethod
+    def from_run(cls, run) -> "ResultStore":
+        """Construit le store depuis un VectorizedRunResult."""
+        covered = np.flatnonzero(run.exclusion_status == "included")
+        structures = run.structures
+        reason_codes, reason_categories = pd.factorize(
+            pd.Series(run.exclusion_reason, dtype=object)
+        )
+
+        def _matrix(attr: str) -> np.ndarray:
+            return _as_float_matrix([getattr(c, attr) for c in structures], covered)
+
+        shape = (len(covered), len(structures))
+        applied = np.zeros(shape, dtype=bool)
+        reason = np.zeros(shape, dtype=np.int8)
+        scope = np.zeros(shape, dtype=np.int8)
+        matched = np.full(shape, NOT_APPLIED, dtype=np.int32)
+        for j, cols in enumerate(structures):
+            applied[:, j] = cols.applied[covered]
+            reason[:, j] = encode(cols.reason[covered], REASON_CATEGORIES)
+            scope[:, j] = encode(cols.scope[covered], SCOPE_CATEGORIES)
+            matched[:, j] = np.where(
+                applied[:, j], cols.condition_index[covered], NOT_APPLIED
+            )
+
+        has_components = bool(structures) and structures[0].hull_input is not None
+        matching_details = None
+        if run.detail_level == DETAIL_LEVEL.FULL and any(
+            c.matching_details is not None for c in structures
+        ):
+            matching_details = np.full(shape, None, dtype=object)
+            for j, cols in enumerate(structures):
+                if cols.matching_details is not None:
+                    matching_details[:, j] = cols.matching_details[covered]
+
+        return cls(
+            index=run.index,
+            structure_plans=tuple(c.structure_plan for c in structures),
+            detail_level=run.detail_level,
+            status_codes=encode(run.exclusion_status, STATUS_CATEGORIES),
+            exclusion_reason_codes=reason_codes.astype(np.int32),
+            exclusion_reason_categories=tuple(reason_categories),
+            exposure=np.asarray(run.exposure, dtype=float),
+            effective_exposure=np.asarray(run.effective_exposure, dtype=float),
+            ceded_to_layer_100pct=np.asarray(run.ceded_to_layer_100pct, dtype=float),
+            ceded_to_reinsurer=np.asarray(run.ceded_to_reinsurer, dtype=float),
+            insured_name=run.insured_name,
+            policy_inception_date=run.policy_inception_date.to_numpy(),
+            policy_expiry_date=run.policy_expiry_date.to_numpy(),
+            covered=covered,
+            applied=applied,
+            reason_codes=reason,
+            scope_codes=scope,
+            matched_condition_id=matched,
+            input_exposure=_matrix("input_exposure"),
+            structure_ceded_to_layer_100pct=_matrix("ceded_to_layer_100pct"),
+            structure_ceded_to_reinsurer=_matrix("ceded_to_reinsurer"),
+            retained_after=_matrix("retained_after"),
+            hull_input=_matrix("hull_input") if has_components else None,
+            liability_input=_matrix("liability_input") if has_components else None,
+            matching_details=matching_details,
+        )
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def nbytes(self) -> int:
+        """Taille des tableaux numériques (hors colonnes objet d'identité)."""
+        return sum(
+            a.nbytes
+            for a in vars(self).values()
+            if isinstance(a, np.ndarray) and a.dtype != object
+        )
+
+    # ─── Décodage ─────────────────────────────────────────────────────────
+    @property
+    def exclusion_status(self) -> np.ndarray:
+        return np.asarray(STATUS_CATEGORIES, dtype=object)[self.status_codes]
+
+    @property
+    def exclusion_reason(self) -> np.ndarray:
+        categories = np.asarray(
+            self.exclusion_reason_categories + (None,), dtype=object
+        )
+        return categories[self.exclusion_reason_codes]
+
+    @property
+    def retained_by_cedant(self) -> np.ndarray:
+        return self.exposure - self.ceded_to_layer_100pct
+
+    # ─── Vues ─────────────────────────────────────────────────────────────
+    def simple_rows(self, position: int) -> List[Dict[str, Any]]:
+        """Équivalent de ProgramRunResult.to_simple_rows() pour une police."""
+        reason_code = self.exclusion_reason_codes[position]
+        return [
+            {
+                "insured_name": self.insured_name[position],
+                "exposure": float(self.exposure[position]),
+                "effective_exposure": float(self.effective_exposure[position]),
+                "ceded_to_layer_100pct": float(self.ceded_to_layer_100pct[position]),
+                "ceded_to_reinsurer": float(self.ceded_to_reinsurer[position]),
+                "retained_by_cedant": float(self.retained_by_cedant[position]),
+                "policy_inception_date": self.policy_inception_date[position],
+                "policy_expiry_date": self.policy_expiry_date[position],
+                "exclusion_status": STATUS_CATEGORIES[self.status_codes[position]],
+                "exclusion_reason": (
+                    self.exclusion_reason_categories[reason_code]
+                    if reason_code >= 0
+                    else None
+                ),
+            }
+        ]
+
+    def rows(self, position: int) -> List[Dict[str, Any]]:
+        """Équivalent de ProgramRunResult.to_rows() pour une police ([] si non couverte)."""
+        k = np.searchsorted(self.covered, position)
+        if k >= len(self.covered) or self.covered[k] != position:
+            return []
+        return self._covered_rows([k])[0]
+
+    def structures_detail(self) -> List[List[Dict[str, Any]]]:
+        """to_rows() de chaque police, dans l'ordre du bordereau."""
+        details: List[List[Dict[str, Any]]] = [[] for _ in range(len(self))]
+        if self.detail_level == DETAIL_LEVEL.TOTALS:
+            return details
+        for position, rows in zip(
+            self.covered.tolist(), self._covered_rows(range(len(self.covered)))
+        ):
+            details[position] = rows
+        return details
+
+    def to_simple_dataframe(self) -> pd.DataFrame:
+        """Mêmes colonnes que ProgramRunResult.to_simple_rows()."""
+        return pd.DataFrame(
+            {
+                "insured_name": self.insured_name,
+                "exposure": self.exposure,
+                "effective_exposure": self.effective_exposure,
+                "ceded_to_layer_100pct": self.ceded_to_layer_100pct,
+                "ceded_to_reinsurer": self.ceded_to_reinsurer,
+                "retained_by_cedant": self.retained_by_cedant,
+                "policy_inception_date": self.policy_inception_date,
+                "policy_expiry_date": self.policy_expiry_date,
+                "exclusion_status": self.exclusion_status,
+                "exclusion_reason": self.exclusion_reason,
+            },
+            index=self.index,
+        )
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Mêmes colonnes que ProgramRunResult.to_dict()."""
+        return pd.DataFrame(
+            {
+                "INSURED_NAME": self.insured_name,
+                "exposure": self.exposure,
+                "effective_exposure": self.effective_exposure,
+                "cession_to_layer_100pct": self.ceded_to_layer_100pct,
+                "cession_to_reinsurer": self.ceded_to_reinsurer,
+                "retained_by_cedant": self.retained_by_cedant,
+                "policy_inception_date": self.policy_inception_date,
+                "policy_expiry_date": self.policy_expiry_date,
+                "structures_detail": self.structures_detail(),
+                "exclusion_status": self.exclusion_status,
+                "exclusion_reason": self.exclusion_reason,
+            },
+            index=self.index,
+        )
+
+    # ─── Construction des lignes to_rows ──────────────────────────────────
+    def _covered_rows(self, ks) -> List[List[Dict[str, Any]]]:
+        ks = list(ks)
+        out: List[List[Dict[str, Any]]] = [[] for _ in ks]
+        full = self.detail_level == DETAIL_LEVEL.FULL
+        for j, structure_plan in enumerate(self.structure_plans):
+            structure = structure_plan.structure
+            kernel = structure_plan.kernel
+            identity = {
+                "structure_name": structure.structure_name,
+                "type_of_participation": structure.type_of_participation,
+                "predecessor_title": structure.predecessor_title or "",
+                "claim_basis": structure.claim_basis,
+                "period_start": str(structure.inception_date),
+                "period_end": str(structure.expiry_date),
+            }
+            empty_terms = terms_as_dict(
+                create_empty_terms(structure.type_of_participation)
+            )
+            terms_cache: Dict[int, Dict[str, Any]] = {}
+
+            applied = self.applied[ks, j].tolist()
+            reason = self.reason_codes[ks, j].tolist()
+            scope = self.scope_codes[ks, j].tolist()
+            matched = self.matched_condition_id[ks, j].tolist()
+            input_exposure = self.input_exposure[ks, j].tolist()
+            ceded_100 = self.structure_ceded_to_layer_100pct[ks, j].tolist()
+            ceded_re = self.structure_ceded_to_reinsurer[ks, j].tolist()
+            retained = self.retained_after[ks, j].tolist()
+            hull_input = (
+                self.hull_input[ks, j].tolist() if self.hull_input is not None else None
+            )
+            liab_input = (
+                self.liability_input[ks, j].tolist()
+                if self.liability_input is not None
+                else None
+            )
+            details = (
+                self.matching_details[ks, j].tolist()
+                if full and self.matching_details is not None
+                else None
+            )
+
+            for row, out_rows in enumerate(out):
+                matching_details = None
+                if applied[row]:
+                    if details is not None and details[row] is not None:
+                        matching_details = dict(details[row])
+                    condition_id = matched[row]
+                    terms = terms_cache.get(condition_id)
+                    if terms is None:
+                        terms = terms_as_dict(
+                            create_terms_from_condition(
+                                kernel.condition_at(condition_id),
+                                structure.type_of_participation,
+                            )
+                        )
+                        terms_cache[condition_id] = terms
+                    metrics = (
+                        {
+                            "hull_input": hull_input[row],
+                            "liability_input": liab_input[row],
+                        }
+                        if hull_input is not None
+                        else {}
+                    )
+                else:
+                    terms, metrics = empty_terms, {}
+                    if full and REASON_CATEGORIES[reason[row]] == "out_of_period":
+                        matching_details = {"claim_basis": structure.claim_basis}
+                out_rows.append(
+                    {
+                        **identity,
+                        "applied": applied[row],
+                        "reason": REASON_CATEGORIES[reason[row]],
+                        "scope": SCOPE_CATEGORIES[scope[row]],
+                        "input_exposure": input_exposure[row],
+                        "ceded_to_layer_100pct": ceded_100[row],
+                        "ceded_to_reinsurer": ceded_re[row],
+                        "retained_after": retained[row],
+                        "matched_condition_id": matched[row] if applied[row] else None,
+                        **terms,
+                        "reinsurer_signed_share": terms.get("signed_share"),
+                        "metrics": metrics,
+                        "matching_details": matching_details,
+                    }
+                )
+        return out
@@ -1,9 +1,28 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
+from types import SimpleNamespace
 from typing import Optional, List, Set, Dict, Any, Union
 from src.domain.condition import Condition
 from .results_terms import StructureTerms, terms_as_dict
 
+# Niveau de détail des résultats :
+# - totals     : totaux par police uniquement (pas de détail par structure)
+# - matched_id : détail par structure avec l'id de la condition retenue, sans matching_details
+# - full       : diagnostics complets (matching_details par structure)
+DETAIL_LEVEL = SimpleNamespace(
+    TOTALS="totals",
+    MATCHED_ID="matched_id",
+    FULL="full",
+)
+DETAIL_LEVEL_VALUES = (DETAIL_LEVEL.TOTALS, DETAIL_LEVEL.MATCHED_ID, DETAIL_LEVEL.FULL)
+
+
+def check_detail_level(detail_level: str) -> None:
+    if detail_level not in DETAIL_LEVEL_VALUES:
+        raise ValueError(
+            f"Unknown detail_level '{detail_level}'. Expected one of {DETAIL_LEVEL_VALUES}"
+        )
+
 
 @dataclass(frozen=True)
 class RescalingInfo:
@@ -47,6 +66,8 @@ class StructureRun:
     metrics: Dict[str, float] = field(
         default_factory=dict
     )  # ex: {"hull_input": 11.25e6, "liab_input": 37.5e6}
+    # position dans structure.conditions ; -1 = valeurs par défaut ; None si non appliquée
+    matched_condition_id: Optional[int] = None
 
 
 @dataclass
@@ -92,6 +113,7 @@ class ProgramRunResult:
                     "ceded_to_layer_100pct": r.ceded_to_layer_100pct,
                     "ceded_to_reinsurer": r.ceded_to_reinsurer,
                     "retained_after": r.retained_after,
+                    "matched_condition_id": r.matched_condition_id,
                     # Aplatissement des termes typés
                     **{k: v for k, v in terms_as_dict(r.terms).items()},
                     # compat: exposer la part signée via les termes (entrée), pas comme résultat
@@ -0,0 +1,431 @@
+"""
+Compile un programme en une seule requête SQL ensembliste sur une table de bordereau.
+
+La requête renvoie une ligne par ligne de bordereau avec les colonnes de
+ProgramRunResult.to_simple_rows() (précédées de colonnes clés recopiées), pour
+calculer tout un portefeuille dans la base. Même sémantique que le moteur
+colonne pour le chemin de cession simplifié :
+  - activité (EXPIRE_DT), validation de la devise, exclusions du programme
+  - par structure : fenêtre RA/LO, condition la plus spécifique (CASE dans
+    l'ordre des rangs), termes QS / XOL de la condition, chaînage prédécesseur
+  - totaux sur les structures appliquées
+
+Périmètre : programmes casualty et test (une colonne par dimension, exposition
+produit de colonnes). Les composantes hull/liability aviation ne sont pas
+compilées. Le SQL généré n'utilise que CTE, CASE, CAST, TRIM, UPPER, SUBSTR
+et || : il s'exécute sur Snowflake et SQLite. Les dates sont comparées à des
+littéraux ISO 'YYYY-MM-DD' (colonnes DATE / TIMESTAMP ou texte ISO). Une
+exposition NULL donne des montants NULL, comme les NaN du moteur.
+
+Différences avec les moteurs, qui lèvent une erreur là où le SQL ne peut pas :
+  - toutes les conditions sont validées à la compilation (pas seulement les matchées)
+  - les lignes retombant sur des valeurs par défaut invalides ont des montants NULL
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from src.domain import CLAIM_BASIS, PRODUCT, Program
+from .condition_matcher import _specificity_increment
+from .currency_validator import _mismatch_error, _no_currency_error
+from .exclusion_matcher import CompiledExclusionRule
+from .program_plan import DEFAULT_CONDITION, ProgramPlan, StructurePlan, compile_program
+from .grouping import dimension_source_columns
+
+# Colonnes de ProgramRunResult.to_simple_rows(), dans le même ordre
+SIMPLE_COLUMNS: Tuple[str, ...] = (
+    "insured_name",
+    "exposure",
+    "effective_exposure",
+    "ceded_to_layer_100pct",
+    "ceded_to_reinsurer",
+    "retained_by_cedant",
+    "policy_inception_date",
+    "policy_expiry_date",
+    "exclusion_status",
+    "exclusion_reason",
+)
+
+# Exposition par LOB : produit des colonnes (cf src.domain.exposure)
+_EXPOSURE_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "casualty": ("OCCURRENCE_LIMIT_100_ORIG", "CEDENT_SHARE"),
+    "test": ("exposure",),
+}
+
+_NULL = "NULL"
+_NEVER = "1 = 0"
+
+
+# ─── Littéraux et identifiants ──────────────────────────────────────────────
+def _ident(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _literal(value: Any) -> str:
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return _NULL
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return repr(float(value))
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _date_literal(value: Any) -> str:
+    ts = pd.to_datetime(value)
+    text = ts.strftime("%Y-%m-%d") if ts == ts.normalize() else ts.isoformat(sep=" ")
+    return _literal(text)
+
+
+def _case(expression: str, branches: List[Tuple[str, str]], default: str) -> str:
+    """CASE expression WHEN ... (simple CASE), réduit à `default` sans branche."""
+    if not branches:
+        return default
+    whens = " ".join(f"WHEN {key} THEN {value}" for key, value in branches)
+    return f"CASE {expression} {whens} ELSE {default} END"
+
+
+def _searched_case(branches: List[Tuple[str, str]], default: str) -> str:
+    if not branches:
+        return default
+    whens = " ".join(f"WHEN {predicate} THEN {value}" for predicate, value in branches)
+    return f"CASE {whens} ELSE {default} END"
+
+
+# ─── Compilateur ────────────────────────────────────────────────────────────
+class _ProgramSqlCompiler:
+    def __init__(self, plan: ProgramPlan, columns: Sequence[str]):
+        uw = (plan.uw_dept or "").lower()
+        if not uw:
+            raise ValueError("Program must have an underwriting_department")
+        if uw not in _EXPOSURE_COLUMNS:
+            raise NotImplementedError(
+                f"SQL compilation is not supported for underwriting department '{plan.uw_dept}'"
+            )
+        self.plan = plan
+        self.uw = uw
+        self.columns = list(columns)
+
+    # Colonnes sources
+    def column(self, name: str) -> Optional[str]:
+        return _ident(name) if name in self.columns else None
+
+    def dimension(self, dimension: str) -> Optional[str]:
+        """Colonne lue par Policy.get_dimension_value (None si absente)."""
+        sources = dimension_source_columns(self.columns, [dimension], self.plan.uw_dept)
+        if len(sources) > 1:
+            raise NotImplementedError(
+                f"Dimension '{dimension}' spans several columns {sources}"
+            )
+        return _ident(sources[0]) if sources else None
+
+    def values_in(self, dimension: str, values) -> str:
+        column = self.dimension(dimension)
+        if column is None:
+            return _NEVER
+        literals = ", ".join(
+            _literal(v) for v in sorted({str(v).strip() for v in values})
+        )
+        return f"TRIM({column}) IN ({literals})"
+
+    # Exposition, statut
+    def exposure(self) -> str:
+        factors = [self.column(c) for c in _EXPOSURE_COLUMNS[self.uw]]
+        if any(f is None for f in factors):
+            return "0.0"
+        # Valeur manquante => exposition NULL (NaN côté moteur), propagée aux montants
+        return " * ".join(f"CAST({f} AS DOUBLE)" for f in factors)
+
+    def inactive(self, calculation_date: str) -> Tuple[str, str]:
+        """(prédicat police expirée, raison) comme TemporalColumns.inactive_mask."""
+        expiry = self.column("EXPIRE_DT")
+        if expiry is None:
+            return _NEVER, _NULL
+        calc = pd.to_datetime(calculation_date)
+        predicate = f"{expiry} IS NOT NULL AND {expiry} <= {_date_literal(calc)}"
+        reason = (
+            f"'Policy expired on ' || SUBSTR(CAST({expiry} AS VARCHAR), 1, 10) || "
+            f"{_literal(f' (calculation date: {calc.date()})')}"
+        )
+        return predicate, reason
+
+    def currency_error(self) -> str:
+        """Même message que CurrencyIndex.validate (sans condition matchée)."""
+        program = self.plan.program
+        column = self.dimension("CURRENCY")
+        no_currency = _literal(_no_currency_error(program))
+        if column is None:
+            return no_currency
+        # Valeur lue sans espaces, comme read_dimension_values
+        value = f"TRIM({column})"
+        marker = "\x00"
+        prefix, suffix = _mismatch_error(program, {marker}).split(repr(marker))
+        allowed = ", ".join(
+            _literal(c) for c in sorted(self.plan.currency_index.allowed)
+        )
+        mismatch = (
+            f"{_literal(prefix + chr(39))} || {value} || {_literal(chr(39) + suffix)}"
+        )
+        return _searched_case(
+            [
+                (f"{value} IS NULL OR {value} = ''", no_currency),
+                (f"{value} IN ({allowed})", _NULL),
+            ],
+            mismatch,
+        )
+
+    def exclusion_reason(self, calculation_date: str) -> str:
+        rules: Tuple[CompiledExclusionRule, ...] = self.plan.exclusions_for(
+            calculation_date
+        ).rules
+        return _searched_case(
+            [
+                (
+                    " AND ".join(
+                        self.values_in(dim, values)
+                        for dim, values in rule.values_by_dimension
+                    ),
+                    _literal(rule.reason),
+                )
+                for rule in rules
+            ],
+            _NULL,
+        )
+
+    # Structures
+    def applicable(self, sp: StructurePlan, calculation_date: str) -> str:
+        """Fenêtre RA/LO comme temporal.applicability_matrix (1/0)."""
+        start, end = sp.inception_date, sp.expiry_date
+        if sp.structure.claim_basis == CLAIM_BASIS.LOSS_OCCURRING:
+            calc = pd.to_datetime(calculation_date)
+            return "1" if start <= calc < end else "0"
+        inception = self.column("INCEPTION_DT")
+        if inception is None:
+            return "0"
+        return (
+            f"CASE WHEN {inception} >= {_date_literal(start)} "
+            f"AND {inception} < {_date_literal(end)} THEN 1 ELSE 0 END"
+        )
+
+    def matched_condition(self, sp: StructurePlan) -> str:
+        """Position de la condition la plus spécifique (cf ConditionIndex), -1 sinon."""
+        ranked = []
+        for position, condition in enumerate(sp.conditions):
+            constraints, score = [], 0.0
+            for dimension in self.plan.dimension_columns:
+                values = condition.get_values(dimension)
+                if values is not None and len(values) > 0:
+                    constraints.append(self.values_in(dimension, values))
+                    score += _specificity_increment(values)
+            ranked.append((-score, position, " AND ".join(constraints) or "1 = 1"))
+        ranked.sort(key=lambda item: item[:2])
+        return _searched_case(
+            [(predicate, str(position)) for _, position, predicate in ranked],
+            str(DEFAULT_CONDITION),
+        )
+
+    def by_condition(self, sp: StructurePlan, term) -> str:
+        """CASE sur la condition retenue ; term(position) -> expression SQL."""
+        condition = _ident(f"_condition_{sp.position}")
+        return _case(
+            condition,
+            [(str(position), term(position)) for position in range(len(sp.conditions))],
+            term(DEFAULT_CONDITION),
+        )
+
+    def ceded(self, sp: StructurePlan, exposure: str) -> str:
+        """Cédé à la couche (100 %) comme ProductKernel.cede, termes en littéraux."""
+        kernel = sp.kernel
+        if kernel.product is None:
+            raise ValueError(f"Unknown product type: {kernel.type_of_participation}")
+        for condition in kernel.conditions[:DEFAULT_CONDITION]:
+            kernel.product.apply(0.0, condition)
+        try:
+            kernel.product.apply(0.0, kernel.condition_at(DEFAULT_CONDITION))
+            default_valid = True
+        except Exception:
+            default_valid = False  # erreur du moteur reportée en montants NULL
+
+        def term(position: int) -> str:
+            if position == DEFAULT_CONDITION and not default_valid:
+                return _NULL
+            limit = kernel.limit[position]
+            if kernel.type_of_participation == PRODUCT.QUOTA_SHARE:
+                ceded = f"{exposure} * {_literal(kernel.cession_pct[position])}"
+                if pd.isna(limit):
+                    return ceded
+                # Pas de ELSE : une exposition NULL donne un cédé NULL (NaN du moteur)
+                return (
+                    f"CASE WHEN {ceded} < {_literal(limit)} THEN {ceded} "
+                    f"WHEN {ceded} >= {_literal(limit)} THEN {_literal(limit)} END"
+                )
+            attachment = _literal(kernel.attachment[position])
+            excess = f"{exposure} - {attachment}"
+            return (
+                f"CASE WHEN {exposure} <= {attachment} THEN 0.0 "
+                f"WHEN {excess} < {_literal(limit)} THEN {excess} "
+                f"WHEN {excess} >= {_literal(limit)} THEN {_literal(limit)} END"
+            )
+
+        return self.by_condition(sp, term)
+
+    def signed_share(self, sp: StructurePlan) -> str:
+        return self.by_condition(
+            sp, lambda position: _literal(sp.kernel.signed_share[position])
+        )
+
+    # Requête
+    def compile(
+        self, calculation_date: str, relation: str, passthrough: Sequence[str]
+    ) -> str:
+        keys = [self.column(c) for c in passthrough]
+        missing = [c for c, k in zip(passthrough, keys) if k is None]
+        if missing:
+            raise ValueError(f"Unknown pass-through columns: {missing}")
+        for sp in self.plan.structures:
+            pred = sp.predecessor_index
+            if pred is not None and pred > sp.position:
+                raise NotImplementedError(
+                    f"Structure '{sp.name}' is processed before its predecessor "
+                    f"'{self.plan.structures[pred].name}'"
+                )
+
+        def optional(name: str) -> str:
+            return self.column(name) or _NULL
+
+        # 1) Colonnes lues dans le bordereau
+        inactive, inactive_reason = self.inactive(calculation_date)
+        insured = self.column("INSURED_NAME")
+        select = [f"{k} AS {k}" for k in keys] + [
+            # Bordereau met INSURED_NAME en majuscules (schema.COLUMNS)
+            f"{f'UPPER(CAST({insured} AS VARCHAR))' if insured else _NULL} AS {_ident('insured_name')}",
+            f"{optional('INCEPTION_DT')} AS {_ident('policy_inception_date')}",
+            f"{optional('EXPIRE_DT')} AS {_ident('policy_expiry_date')}",
+            f"{self.exposure()} AS {_ident('_exposure')}",
+            f"CASE WHEN {inactive} THEN 1 ELSE 0 END AS {_ident('_inactive')}",
+            f"{inactive_reason} AS {_ident('_inactive_reason')}",
+            f"{self.currency_error()} AS {_ident('_currency_error')}",
+            f"{self.exclusion_reason(calculation_date)} AS {_ident('_exclusion_reason')}",
+        ]
+        for sp in self.plan.structures:
+            select.append(
+                f"{self.applicable(sp, calculation_date)} AS {_ident(f'_applicable_{sp.position}')}"
+            )
+            select.append(
+                f"{self.matched_condition(sp)} AS {_ident(f'_condition_{sp.position}')}"
+            )
+        ctes = [("_policies", f"SELECT {', '.join(select)} FROM {relation}")]
+
+        # 2) Statut : inactive > currency_mismatch > excluded > included
+        status = _searched_case(
+            [
+                ('"_inactive" = 1', "'inactive'"),
+                ('"_currency_error" IS NOT NULL', "'currency_mismatch'"),
+                ('"_exclusion_reason" IS NOT NULL', "'excluded'"),
+            ],
+            "'included'",
+        )
+        reason = _searched_case(
+            [
+                ('"_inactive" = 1', '"_inactive_reason"'),
+                ('"_currency_error" IS NOT NULL', '"_currency_error"'),
+            ],
+            '"_exclusion_reason"',
+        )
+        ctes.append(
+            (
+                "_status",
+                f"SELECT *, {status} AS {_ident('exclusion_status')}, "
+                f"{reason} AS {_ident('exclusion_reason')} FROM _policies",
+            )
+        )
+
+        # 3) Une paire de CTE par structure, dans l'ordre du plan
+        previous = "_status"
+        ceded_100, ceded_re = [], []
+        for sp in self.plan.structures:
+            k = sp.position
+            applied, input_, ceded = (
+                _ident(f"_applied_{k}"),
+                _ident(f"_input_{k}"),
+                _ident(f"_ceded_{k}"),
+            )
+            pred = self.plan.predecessor_of(sp)
+            if pred is None:
+                input_expr = '"_exposure"'
+            else:
+                p = pred.position
+                input_expr = (
+                    f"CASE WHEN {_ident(f'_applied_{p}')} = 1 "
+                    f"THEN {_ident(f'_input_{p}')} - {_ident(f'_ceded_{p}')} "
+                    f'ELSE "_exposure" END'
+                )
+            ctes.append(
+                (
+                    f"_input_{k}",
+                    f"SELECT *, CASE WHEN \"exclusion_status\" = 'included' "
+                    f"AND {_ident(f'_applicable_{k}')} = 1 THEN 1 ELSE 0 END AS {applied}, "
+                    f"{input_expr} AS {input_}, "
+                    f"{self.signed_share(sp)} AS {_ident(f'_share_{k}')} FROM {previous}",
+                )
+            )
+            ctes.append(
+                (
+                    f"_ceded_{k}",
+                    f"SELECT *, CASE WHEN {applied} = 1 THEN {self.ceded(sp, input_)} "
+                    f"ELSE 0.0 END AS {ceded} FROM _input_{k}",
+                )
+            )
+            previous = f"_ceded_{k}"
+            ceded_100.append(ceded)
+            ceded_re.append(
+                f"CASE WHEN {applied} = 1 THEN {ceded} * {_ident(f'_share_{k}')} ELSE 0.0 END"
+            )
+
+        # 4) Totaux et colonnes de to_simple_rows
+        total_100 = " + ".join(ceded_100) or "0.0"
+        total_re = " + ".join(f"({c})" for c in ceded_re) or "0.0"
+        final = [f"{k} AS {k}" for k in keys] + [
+            f"{_ident('insured_name')} AS {_ident('insured_name')}",
+            f'"_exposure" AS {_ident("exposure")}',
+            f'CASE WHEN "exclusion_status" = \'included\' THEN "_exposure" ELSE 0.0 END '
+            f"AS {_ident('effective_exposure')}",
+            f"{total_100} AS {_ident('ceded_to_layer_100pct')}",
+            f"{total_re} AS {_ident('ceded_to_reinsurer')}",
+            f'"_exposure" - ({total_100}) AS {_ident("retained_by_cedant")}',
+            f"{_ident('policy_inception_date')} AS {_ident('policy_inception_date')}",
+            f"{_ident('policy_expiry_date')} AS {_ident('policy_expiry_date')}",
+            f"{_ident('exclusion_status')} AS {_ident('exclusion_status')}",
+            f"{_ident('exclusion_reason')} AS {_ident('exclusion_reason')}",
+        ]
+        with_clause = ",\n".join(f"{name} AS (\n  {body}\n)" for name, body in ctes)
+        return f"WITH {with_clause}\nSELECT {', '.join(final)} FROM {previous}"
+
+
+def compile_program_sql(
+    program: Program,
+    calculation_date: str,
+    relation: str,
+    columns: Sequence[str],
+    *,
+    plan: Optional[ProgramPlan] = None,
+    passthrough: Sequence[str] = (),
+) -> str:
+    """
+    Compile le programme en un seul SELECT sur `relation`.
+
+    Args:
+        program: Programme à appliquer (casualty / test)
+        calculation_date: Date de calcul (activité, fenêtres LO, exclusions)
+        relation: Relation SQL du bordereau ('"DB"."SCHEMA"."TABLE"' ou '(SELECT ...)')
+        columns: Colonnes de la relation (résolution dimension → colonne)
+        plan: Plan compilé du programme (compilé ici si absent)
+        passthrough: Colonnes du bordereau recopiées en tête du résultat (ex: POLICY_ID)
+
+    Returns:
+        Texte SQL ; ses lignes ont les colonnes passthrough puis SIMPLE_COLUMNS.
+    """
+    plan = plan or compile_program(program)
+    return _ProgramSqlCompiler(plan, columns).compile(
+        calculation_date, relation, passthrough
+    )
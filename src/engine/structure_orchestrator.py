@@ -1,14 +1,16 @@
 from typing import Dict, Any, Set, Optional
 from src.domain import PRODUCT, Structure, Condition, Program
 from src.domain.policy import Policy
-from .condition_matcher import match_condition, match_condition_with_details
 from .cession_calculator import apply_condition
 from .currency_validator import CurrencyValidator
+from .program_plan import ProgramPlan, StructurePlan, compile_program
 from src.engine.results import (
+    DETAIL_LEVEL,
     ProgramRunResult,
     RunTotals,
     StructureRun,
     RescalingInfo,
+    check_detail_level,
 )
 from src.engine.results_terms import create_terms_from_condition, create_empty_terms
 
@@ -22,17 +24,23 @@ class StructureProcessor:
         program: Program,
         *,
         calculation_date: Optional[str] = None,
+        plan: Optional[ProgramPlan] = None,
+        detail_level: str = DETAIL_LEVEL.FULL,
     ):
+        check_detail_level(detail_level)
         self.policy = policy
         self.program = program
-        # Utiliser l'ordre logique des structures (QS en premier, puis XOL par attachment croissant)
-        self.structures = program._sort_structures_logically()
-        self.dimension_columns = program.dimension_columns
+        # Plan compilé une fois par programme (ordre logique : QS puis XOL par attachment)
+        self.plan = plan or compile_program(program)
+        self.structures = [sp.structure for sp in self.plan.structures]
+        self.dimension_columns = self.plan.dimension_columns
         self.calculation_date = calculation_date
+        self.detail_level = detail_level
+        self._full_details = detail_level == DETAIL_LEVEL.FULL
 
-        if not program.underwriting_department:
+        if not self.plan.uw_dept:
             raise ValueError("Program must have an underwriting_department")
-        self.uw_dept = program.underwriting_department
+        self.uw_dept = self.plan.uw_dept
         self.base_bundle = policy.exposure_bundle(self.uw_dept)
 
         # Mémorise l'état utile pour le chaînage (retention, type, etc.)
@@ -43,31 +51,29 @@ class StructureProcessor:
     def process_structures(self) -> ProgramRunResult:
         run = ProgramRunResult()
 
-        for structure in self.structures:
+        for structure_plan in self.plan.structures:
+            structure = structure_plan.structure
             # Filtre multi-année (RA/LO) piloté par calculation_date
             if not structure.is_applicable(
                 self.policy,
                 evaluation_date=self.calculation_date,
             ):
-                run.structures.append(
-                    self._report_skipped(
-                        structure,
-                        reason="out_of_period",
-                        input_exposure=self.base_bundle.total,
-                        scope_components=set(),
-                        matching_details={"claim_basis": structure.claim_basis},
+                if self.detail_level != DETAIL_LEVEL.TOTALS:
+                    run.structures.append(
+                        self._report_out_of_period(structure)
                     )
-                )
                 continue
-            run_obj = self._process_one(structure)
-            run.structures.append(run_obj)
+            run_obj = self._process_one(structure_plan)
+            if self.detail_level != DETAIL_LEVEL.TOTALS:
+                run.structures.append(run_obj)
             if run_obj.applied:
                 run.totals.ceded_to_layer_100pct += run_obj.ceded_to_layer_100pct
                 run.totals.ceded_to_reinsurer += run_obj.ceded_to_reinsurer
         return run
 
     # ─── Détails par structure ────────────────────────────────────────────
-    def _process_one(self, structure: Structure) -> StructureRun:
+    def _process_one(self, structure_plan: StructurePlan) -> StructureRun:
+        structure = structure_plan.structure
         # 1) Sécurité idempotence
         if structure.structure_name in self._processed:
             return self._report_skipped(structure, reason="already_processed")
@@ -77,21 +83,20 @@ class StructureProcessor:
             self.policy,
             evaluation_date=self.calculation_date,
         ):
-            return self._report_skipped(
-                structure,
-                reason="out_of_period",
-                input_exposure=self.base_bundle.total,
-                scope_components=set(),
-                matching_details={"claim_basis": structure.claim_basis},
-            )
+            return self._report_out_of_period(structure)
 
         # 2) Garantit le prédécesseur (inuring) si nécessaire
-        self._process_predecessor_if_needed(structure)
+        self._process_predecessor_if_needed(structure_plan)
 
-        # 3) Matching condition le plus spécifique avec détails
-        matched, matching_details = match_condition_with_details(
-            self.policy, structure.conditions, self.dimension_columns
-        )
+        # 3) Matching condition le plus spécifique (détails seulement en mode "full")
+        condition_index = structure_plan.condition_index
+        if self._full_details:
+            matched, matching_details = condition_index.match_with_details(self.policy)
+            matched_id = condition_index.position_of(matched)
+        else:
+            matched_id = condition_index.match_position(self.policy)
+            matched = structure_plan.conditions[matched_id] if matched_id >= 0 else None
+            matching_details = None
 
         # 4) Calcul de l'exposition d'entrée et du scope (Hull/Liab)
         base_input = self._input_exposure(structure)
@@ -101,22 +106,22 @@ class StructureProcessor:
 
         # Si pas de condition → utiliser les valeurs par défaut de la structure
         if matched is None:
-            matched = structure.create_default_condition()
-            # Mettre à jour les détails de matching pour indiquer qu'on utilise les valeurs par défaut
-            matching_details["matched_condition"] = matched
-            matching_details["matching_score"] = 0.0
-            matching_details["using_default_values"] = True
-        else:
+            matched = structure_plan.resolve_default()
+            if matching_details is not None:
+                # Mettre à jour les détails de matching pour indiquer qu'on utilise les valeurs par défaut
+                matching_details["matched_condition"] = matched
+                matching_details["matching_score"] = 0.0
+                matching_details["using_default_values"] = True
+        elif matching_details is not None:
             # Vérifier si la condition matchée est équivalente aux valeurs par défaut
             # (pas de contraintes spécifiques sur les dimensions)
-            is_equivalent_to_default = self._is_condition_equivalent_to_default(matched, structure)
-            if is_equivalent_to_default:
+            if structure_plan.is_equivalent_to_default(matched):
                 matching_details["using_default_values"] = True
 
         # Validation de devise avec la condition matchée
         if matched:
             is_currency_valid, currency_error = CurrencyValidator.validate_policy_currency(
-                self.policy, self.program, matched
+                self.policy, self.program, matched, index=self.plan.currency_index
             )
             if not is_currency_valid:
                 return self._report_currency_mismatch(
@@ -142,7 +147,7 @@ class StructureProcessor:
 
         # optionnel: renseigner metrics pour plus de granularité (exposition par composante)
         metrics = {}
-        if self.uw_dept.lower() == "aviation":
+        if self.plan.is_aviation:
             # injecter les inputs Hull / Liability si disponible
             bundle_scaled = self.base_bundle.fraction_to(
                 self._input_exposure(structure)
@@ -180,20 +185,14 @@ class StructureProcessor:
             retained_after=retained,
             matching_details=matching_details,
             metrics=metrics,
+            matched_condition_id=matched_id,
         )
         return run_obj
 
     # ─── Sous-étapes explicites ───────────────────────────────────────────
-    def _process_predecessor_if_needed(self, structure: Structure) -> None:
-        if not structure.has_predecessor():
-            return
-        pred_name = structure.predecessor_title
-        if pred_name in self._processed:
-            return
-        predecessor = next(
-            (s for s in self.structures if s.structure_name == pred_name), None
-        )
-        if predecessor:
+    def _process_predecessor_if_needed(self, structure_plan: StructurePlan) -> None:
+        predecessor = self.plan.predecessor_of(structure_plan)
+        if predecessor and predecessor.name not in self._processed:
             self._process_one(predecessor)
 
     def _input_exposure(self, structure: Structure) -> float:
@@ -208,7 +207,7 @@ class StructureProcessor:
     def _components_set(self, matched: Optional[Condition]) -> Set[str]:
         """Scope d'exposition explicite pour Aviation ; vide = 'total'."""
         # Hors aviation : pas de composants
-        if self.uw_dept.lower() != "aviation":
+        if not self.plan.is_aviation:
             return set()
 
         # Si aucune condition ne matche, on applique sur le total (hull+liab)
@@ -249,6 +248,17 @@ class StructureProcessor:
         # return matched.copy(), None
 
     # ─── Rapports "skipped" homogènes ─────────────────────────────────────
+    def _report_out_of_period(self, structure: Structure) -> StructureRun:
+        return self._report_skipped(
+            structure,
+            reason="out_of_period",
+            input_exposure=self.base_bundle.total,
+            scope_components=set(),
+            matching_details=(
+                {"claim_basis": structure.claim_basis} if self._full_details else None
+            ),
+        )
+
     def _report_skipped(
         self,
         structure: Structure,
@@ -284,36 +294,6 @@ class StructureProcessor:
             metrics={},
         )
 
-    def _is_condition_equivalent_to_default(self, condition: Condition, structure: Structure) -> bool:
-        """
-        Détermine si une condition est équivalente aux valeurs par défaut de la structure.
-        Une condition est considérée comme équivalente aux valeurs par défaut si :
-        1. Elle n'a aucune contrainte sur les dimensions (toutes les dimensions sont None)
-        2. ET elle a les mêmes valeurs que les valeurs par défaut de la structure
-        """
-        # Vérifier qu'aucune dimension n'est contrainte
-        for dimension in self.dimension_columns:
-            if condition.has_dimension(dimension):
-                return False  # Cette condition a des contraintes spécifiques
-        
-        # Vérifier que les valeurs correspondent aux valeurs par défaut de la structure
-        if structure.type_of_participation == PRODUCT.QUOTA_SHARE:
-            # Pour quota share, comparer cession_pct et signed_share
-            if condition.cession_pct != structure.cession_pct:
-                return False
-            if condition.signed_share != structure.signed_share:
-                return False
-        elif structure.type_of_participation == PRODUCT.EXCESS_OF_LOSS:
-            # Pour excess of loss, comparer attachment et limit
-            if condition.attachment != structure.attachment:
-                return False
-            if condition.limit != structure.limit:
-                return False
-            if condition.signed_share != structure.signed_share:
-                return False
-        
-        return True
-
     def _report_currency_mismatch(
         self,
         structure: Structure,
@@ -0,0 +1,115 @@
+"""
+Masques temporels du moteur colonnes, calculés sur des entiers int64 (ns).
+
+Les dates sont converties une seule fois ; l'activité des polices et la
+matrice police × structure d'applicabilité RA/LO se réduisent ensuite à des
+comparaisons d'entiers. Mêmes règles que Policy.is_active et
+Structure.is_applicable :
+  - police expirée si EXPIRE_DT <= calculation_date (date absente → active)
+  - RA : INCEPTION_DT dans [inception_date ; expiry_date[ ; inception None →
+    non applicable, inception non interprétable (NaT) → applicable
+  - LO : calculation_date dans [inception_date ; expiry_date[
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.domain import CLAIM_BASIS
+from .program_plan import ProgramPlan
+
+NAT = np.iinfo(np.int64).min
+
+
+def date_ints(values: pd.Series) -> np.ndarray:
+    """Dates en nanosecondes int64 (NAT pour les valeurs manquantes)."""
+    return pd.to_datetime(values).to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+
+def timestamp_int(value) -> Optional[int]:
+    if value is None:
+        return None
+    ts = pd.to_datetime(value)
+    return None if pd.isna(ts) else ts.value
+
+
+@dataclass
+class TemporalColumns:
+    inception: np.ndarray  # int64 ns
+    inception_missing: np.ndarray  # cellule None (≠ NaT) : RA non applicable
+    expiry: np.ndarray  # int64 ns
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "TemporalColumns":
+        n = len(df)
+        if "INCEPTION_DT" in df.columns:
+            inception = date_ints(df["INCEPTION_DT"])
+            inception_missing = (
+                df["INCEPTION_DT"].to_numpy(dtype=object) == None
+            )  # noqa: E711
+        else:
+            inception = np.full(n, NAT, dtype=np.int64)
+            inception_missing = np.ones(n, dtype=bool)
+        expiry = (
+            date_ints(df["EXPIRE_DT"])
+            if "EXPIRE_DT" in df.columns
+            else np.full(n, NAT, dtype=np.int64)
+        )
+        return cls(
+            inception=inception, inception_missing=inception_missing, expiry=expiry
+        )
+
+    def __len__(self) -> int:
+        return len(self.expiry)
+
+    def inactive_mask(self, calculation_date: str) -> np.ndarray:
+        calc = timestamp_int(calculation_date)
+        if calc is None:
+            return np.zeros(len(self), dtype=bool)
+        return (self.expiry != NAT) & (self.expiry <= calc)
+
+
+def _in_window(values: np.ndarray, start: int, end: int) -> np.ndarray:
+    # NaT (NAT) n'est ni avant ni après la fenêtre, comme les comparaisons pandas
+    return (values == NAT) | ((values >= start) & (values < end))
+
+
+def applicability_matrix(
+    plan: ProgramPlan, temporal: TemporalColumns, calculation_date: Optional[str]
+) -> np.ndarray:
+    """Matrice booléenne (polices × structures du plan), colonnes contiguës."""
+    return with_loss_occurring(
+        risk_attaching_matrix(plan, temporal), plan, calculation_date
+    )
+
+
+def risk_attaching_matrix(plan: ProgramPlan, temporal: TemporalColumns) -> np.ndarray:
+    """Colonnes RA de la matrice (indépendantes de la date de calcul) ; colonnes LO à False."""
+    n = len(temporal)
+    matrix = np.zeros((n, len(plan.structures)), dtype=bool, order="F")
+    for sp in plan.structures:
+        if sp.structure.claim_basis != CLAIM_BASIS.LOSS_OCCURRING:
+            matrix[:, sp.position] = (
+                _in_window(
+                    temporal.inception, sp.inception_date.value, sp.expiry_date.value
+                )
+                & ~temporal.inception_missing
+            )
+    return matrix
+
+
+def with_loss_occurring(
+    risk_attaching: np.ndarray, plan: ProgramPlan, calculation_date: Optional[str]
+) -> np.ndarray:
+    """Copie de la matrice RA complétée des colonnes LO pour une date de calcul."""
+    matrix = risk_attaching.copy(order="F")
+    calc = timestamp_int(calculation_date)
+    for sp in plan.structures:
+        if sp.structure.claim_basis == CLAIM_BASIS.LOSS_OCCURRING:
+            start = sp.inception_date.value
+            end = sp.expiry_date.value
+            matrix[:, sp.position] = calc is not None and start <= calc < end
+    return matrix
@@ -0,0 +1,598 @@
+"""
+Moteur colonne : applique un programme à tout un bordereau avec des tableaux NumPy.
+
+Même sémantique que le moteur ligne (calculation_engine.apply_program), mais
+le travail par police est du calcul sur tableaux au lieu d'une Policy / d'un
+StructureProcessor / d'un ProgramRunResult par ligne. Ce qui ne dépend que des
+valeurs de dimensions (validation de devise, exclusions, matching des
+conditions) est évalué une fois par combinaison distincte de ces valeurs puis
+diffusé aux lignes (cf src.engine.grouping).
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.domain import Program, Structure
+from src.domain.exposure import ExposureCalculationError
+from src.domain.policy import Policy
+from .currency_validator import CurrencyValidator
+from .grouping import (
+    column_codes,
+    dimension_source_columns,
+    group_codes,
+    representative_policies,
+)
+from .program_plan import DEFAULT_CONDITION, ProgramPlan, StructurePlan, compile_program
+from .results import DETAIL_LEVEL, check_detail_level
+from .result_store import ResultStore
+from .temporal import TemporalColumns, risk_attaching_matrix, with_loss_occurring
+
+
+# ─── Regroupement des lignes par valeurs de dimensions ──────────────────────
+def plan_source_columns(columns, plan: ProgramPlan) -> List[str]:
+    """Colonnes de regroupement des lignes d'un run (dimensions, devise, exclusions)."""
+    dimensions = list(plan.dimension_columns) + ["CURRENCY"]
+    for rule in plan.program.exclusions:
+        dimensions.extend(rule.values_by_dimension.keys())
+    return dimension_source_columns(columns, dimensions, plan.uw_dept)
+
+
+# ─── Colonnes d'exposition ──────────────────────────────────────────────────
+def _none_mask(df: pd.DataFrame, col: str) -> np.ndarray:
+    """Lignes où le moteur ligne lit None (colonne absente ou cellule None)."""
+    if col not in df.columns:
+        return np.ones(len(df), dtype=bool)
+    return df[col].to_numpy(dtype=object) == None  # noqa: E711
+
+
+def _float_column(df: pd.DataFrame, col: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Valeurs en float64 et masque des lignes que le moteur ligne rejetterait."""
+    n = len(df)
+    if col not in df.columns:
+        return np.full(n, np.nan), np.ones(n, dtype=bool)
+    series = df[col]
+    numeric = pd.to_numeric(series, errors="coerce")
+    invalid = (numeric.isna() & series.notna()).to_numpy()
+    return numeric.to_numpy(dtype=float), _none_mask(df, col) | invalid
+
+
+@dataclass
+class ExposureColumns:
+    total: np.ndarray
+    hull: Optional[np.ndarray] = None
+    liability: Optional[np.ndarray] = None
+    errors: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=bool))
+
+    @property
+    def has_components(self) -> bool:
+        return self.hull is not None
+
+
+def compute_exposure_columns(
+    df: pd.DataFrame, uw_dept: Optional[str]
+) -> ExposureColumns:
+    """Équivalent tableau des calculateurs de src.domain.exposure."""
+    uw = (uw_dept or "").lower()
+    n = len(df)
+
+    if uw == "aviation":
+        parts = []
+        errors = np.zeros(n, dtype=bool)
+        for limit_col, share_col in (
+            ("HULL_LIMIT", "HULL_SHARE"),
+            ("LIAB_LIMIT", "LIAB_SHARE"),
+        ):
+            limit, limit_err = _float_column(df, limit_col)
+            share, share_err = _float_column(df, share_col)
+            present = ~_none_mask(df, limit_col)
+            errors |= present & (limit_err | share_err)
+            parts.append(np.where(present, limit * share, 0.0))
+        hull, liability = parts
+        return ExposureColumns(
+            total=hull + liability, hull=hull, liability=liability, errors=errors
+        )
+
+    if uw == "casualty":
+        limit, limit_err = _float_column(df, "OCCURRENCE_LIMIT_100_ORIG")
+        share, share_err = _float_column(df, "CEDENT_SHARE")
+        return ExposureColumns(total=limit * share, errors=limit_err | share_err)
+
+    if uw == "test":
+        exposure, errors = _float_column(df, "exposure")
+        return ExposureColumns(total=exposure, errors=errors)
+
+    return ExposureColumns(total=np.zeros(n), errors=np.ones(n, dtype=bool))
+
+
+# ─── Colonnes partagées entre runs ──────────────────────────────────────────
+@dataclass
+class BordereauColumns:
+    """
+    Tableaux d'un DataFrame moteur indépendants du programme, calculés une fois
+    et partagés par tous les runs sur ce DataFrame (plusieurs programmes,
+    plusieurs dates de calcul) : dates en int64, expositions par underwriting
+    department, codes des valeurs par colonne de dimension.
+    """
+
+    df: pd.DataFrame
+    temporal: TemporalColumns
+    _exposures: Dict[str, ExposureColumns] = field(default_factory=dict, repr=False)
+    _codes: Dict[str, np.ndarray] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "BordereauColumns":
+        return cls(df=df, temporal=TemporalColumns.from_dataframe(df))
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def exposures(self, uw_dept: Optional[str]) -> ExposureColumns:
+        key = (uw_dept or "").lower()
+        exposures = self._exposures.get(key)
+        if exposures is None:
+            exposures = self._exposures[key] = compute_exposure_columns(
+                self.df, uw_dept
+            )
+        return exposures
+
+    def group_rows(self, columns: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """grouping.group_rows(df, columns), chaque colonne factorisée une fois."""
+        codes = []
+        for col in columns:
+            if col not in self._codes:
+                self._codes[col] = column_codes(self.df, col)
+            codes.append(self._codes[col])
+        return group_codes(len(self.df), codes)
+
+    def prepare(self, plan: ProgramPlan) -> None:
+        """Calcule d'avance ce que lisent les runs de `plan` (ex: avant les workers)."""
+        self.exposures(plan.uw_dept)
+        self.group_rows(plan_source_columns(self.df.columns, plan))
+
+
+# ─── Résultats colonnes ─────────────────────────────────────────────────────
+@dataclass
+class StructureColumns:
+    """Résultat par ligne d'une structure (valable sur les lignes couvertes)."""
+
+    structure_plan: StructurePlan
+    applied: np.ndarray
+    reason: np.ndarray  # object: None | "out_of_period" | "already_processed"
+    condition_index: np.ndarray
+    scope: np.ndarray  # object: "total" | "hull" | "liability" | "hull;liability"
+    input_exposure: np.ndarray
+    ceded_to_layer_100pct: np.ndarray
+    ceded_to_reinsurer: np.ndarray
+    retained_after: np.ndarray
+    hull_input: Optional[np.ndarray] = None
+    liability_input: Optional[np.ndarray] = None
+    matching_details: Optional[np.ndarray] = (
+        None  # object, renseigné en detail_level "full"
+    )
+
+
+@dataclass
+class VectorizedRunResult:
+    index: pd.Index
+    exclusion_status: np.ndarray
+    exclusion_reason: np.ndarray
+    exposure: np.ndarray
+    effective_exposure: np.ndarray
+    ceded_to_layer_100pct: np.ndarray
+    ceded_to_reinsurer: np.ndarray
+    insured_name: np.ndarray
+    policy_inception_date: pd.Series
+    policy_expiry_date: pd.Series
+    structures: List[StructureColumns]
+    detail_level: str = DETAIL_LEVEL.FULL
+
+    @property
+    def retained_by_cedant(self) -> np.ndarray:
+        return self.exposure - self.ceded_to_layer_100pct
+
+    def to_simple_dataframe(self) -> pd.DataFrame:
+        """Mêmes colonnes que ProgramRunResult.to_simple_rows()."""
+        return pd.DataFrame(
+            {
+                "insured_name": self.insured_name,
+                "exposure": self.exposure,
+                "effective_exposure": self.effective_exposure,
+                "ceded_to_layer_100pct": self.ceded_to_layer_100pct,
+                "ceded_to_reinsurer": self.ceded_to_reinsurer,
+                "retained_by_cedant": self.retained_by_cedant,
+                "policy_inception_date": self.policy_inception_date.to_numpy(),
+                "policy_expiry_date": self.policy_expiry_date.to_numpy(),
+                "exclusion_status": self.exclusion_status,
+                "exclusion_reason": self.exclusion_reason,
+            },
+            index=self.index,
+        )
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Mêmes colonnes que ProgramRunResult.to_dict()."""
+        return self.to_store().to_dataframe()
+
+    def structures_detail(self) -> List[List[Dict[str, Any]]]:
+        """Lignes de ProgramRunResult.to_rows() par police ([] si non couverte)."""
+        return self.to_store().structures_detail()
+
+    def to_store(self) -> ResultStore:
+        """Copie colonne du run (cf src.engine.result_store)."""
+        return ResultStore.from_run(self)
+
+
+# ─── Moteur ─────────────────────────────────────────────────────────────────
+class VectorizedStructureProcessor:
+    """Équivalent tableau de StructureProcessor (une passe par structure)."""
+
+    def __init__(
+        self,
+        plan: ProgramPlan,
+        exposures: ExposureColumns,
+        applicable: np.ndarray,
+        condition_index: List[np.ndarray],
+    ):
+        if not plan.uw_dept:
+            raise ValueError("Program must have an underwriting_department")
+        self.plan = plan
+        self.exposures = exposures
+        self.applicable = applicable
+        self.condition_index = condition_index
+
+        # État de chaînage indexé par nom, comme StructureProcessor
+        n = len(exposures.total)
+        self._processed = {name: np.zeros(n, dtype=bool) for name in plan.by_name}
+        self._retained = {name: np.zeros(n) for name in plan.by_name}
+
+    def process_structures(
+        self, covered: np.ndarray
+    ) -> Tuple[List[StructureColumns], np.ndarray, np.ndarray]:
+        n = len(covered)
+        total_100 = np.zeros(n)
+        total_re = np.zeros(n)
+        reports = []
+
+        for structure_plan in self.plan.structures:
+            in_period = covered & self.applicable[:, structure_plan.position]
+            cols = self._process_one(structure_plan, in_period)
+
+            out = covered & ~in_period
+            cols.reason[out] = "out_of_period"
+            cols.scope[out] = "total"
+            cols.input_exposure[out] = self.exposures.total[out]
+            cols.retained_after[out] = self.exposures.total[out]
+            reports.append(cols)
+
+            total_100 += np.where(cols.applied, cols.ceded_to_layer_100pct, 0.0)
+            total_re += np.where(cols.applied, cols.ceded_to_reinsurer, 0.0)
+
+        return reports, total_100, total_re
+
+    def _process_one(
+        self, structure_plan: StructurePlan, mask: np.ndarray
+    ) -> StructureColumns:
+        structure = structure_plan.structure
+        name = structure_plan.name
+        n = len(mask)
+        already = mask & self._processed[name]
+        todo = (
+            mask & ~self._processed[name] & self.applicable[:, structure_plan.position]
+        )
+
+        predecessor = self.plan.predecessor_of(structure_plan)
+        if predecessor is not None:
+            self._process_one(predecessor, todo & ~self._processed[predecessor.name])
+
+        base_input = self._input_exposure(structure)
+        index = self.condition_index[structure_plan.position]
+        kernel = structure_plan.kernel
+
+        # Scope Hull/Liability (aviation uniquement) puis filtrage de l'exposition
+        exposures = self.exposures
+        scope = np.full(n, "total", dtype=object)
+        filtered = base_input.copy()
+        hull_input = liab_input = None
+        if exposures.has_components:
+            include_hull = kernel.includes_hull[index]
+            include_liab = kernel.includes_liability[index]
+            scope[include_hull & include_liab] = "hull;liability"
+            scope[include_hull & ~include_liab] = "hull"
+            scope[~include_hull & include_liab] = "liability"
+
+            unscaled = exposures.total <= 0.0
+            with np.errstate(divide="ignore", invalid="ignore"):
+                scale = base_input / exposures.total
+            hull_input = np.where(unscaled, 0.0, exposures.hull * scale)
+            liab_input = np.where(unscaled, 0.0, exposures.liability * scale)
+            selected = np.where(include_hull, hull_input, 0.0) + np.where(
+                include_liab, liab_input, 0.0
+            )
+            filtered = np.where(
+                unscaled | (~include_hull & ~include_liab), base_input, selected
+            )
+
+        if todo.any():
+            if (index[todo] == DEFAULT_CONDITION).any() and kernel.default_error:
+                raise kernel.default_error
+            kernel.validate(index[todo])
+
+        ceded = np.where(todo, kernel.cede(filtered, index), 0.0)
+        ceded_re = ceded * kernel.signed_share[index]
+        retained = filtered - ceded
+
+        self._retained[name] = np.where(todo, retained, self._retained[name])
+        self._processed[name] |= todo
+
+        reason = np.full(n, None, dtype=object)
+        reason[already] = "already_processed"
+        scope[already] = "total"
+        return StructureColumns(
+            structure_plan=structure_plan,
+            applied=todo,
+            reason=reason,
+            condition_index=index,
+            scope=scope,
+            input_exposure=np.where(todo, filtered, base_input),
+            ceded_to_layer_100pct=ceded,
+            ceded_to_reinsurer=np.where(todo, ceded_re, 0.0),
+            retained_after=np.where(todo, retained, base_input),
+            hull_input=hull_input,
+            liability_input=liab_input,
+        )
+
+    def _input_exposure(self, structure: Structure) -> np.ndarray:
+        pred_name = structure.predecessor_title if structure.has_predecessor() else None
+        if pred_name in self._processed:
+            return np.where(
+                self._processed[pred_name],
+                self._retained[pred_name],
+                self.exposures.total,
+            )
+        return self.exposures.total
+
+
+def _match_with_details(
+    structure_plan: StructurePlan, policy: Policy
+) -> Tuple[int, Dict[str, Any]]:
+    """Position matchée et matching_details, annotés comme dans StructureProcessor."""
+    condition_index = structure_plan.condition_index
+    matched, matching_details = condition_index.match_with_details(policy)
+    if matched is None:
+        matching_details["matched_condition"] = structure_plan.default_condition
+        matching_details["matching_score"] = 0.0
+        matching_details["using_default_values"] = True
+    elif structure_plan.is_equivalent_to_default(matched):
+        matching_details["using_default_values"] = True
+    return condition_index.position_of(matched), matching_details
+
+
+def apply_program_vectorized(
+    df: pd.DataFrame,
+    program: Program,
+    calculation_date: str,
+    *,
+    plan: Optional[ProgramPlan] = None,
+    detail_level: str = DETAIL_LEVEL.FULL,
+    columns: Optional[BordereauColumns] = None,
+) -> VectorizedRunResult:
+    """
+    Applique le programme à chaque ligne d'un DataFrame moteur
+    (cf Bordereau.to_engine_dataframe).
+
+    columns : tableaux déjà calculés pour `df` (BordereauColumns.from_dataframe(df)),
+    pour les partager entre plusieurs runs sur le même bordereau.
+    """
+    (result,) = apply_program_vectorized_dates(
+        df,
+        program,
+        [calculation_date],
+        plan=plan,
+        detail_level=detail_level,
+        columns=columns,
+    )
+    return result
+
+
+def apply_program_vectorized_dates(
+    df: pd.DataFrame,
+    program: Program,
+    calculation_dates: Sequence[str],
+    *,
+    plan: Optional[ProgramPlan] = None,
+    detail_level: str = DETAIL_LEVEL.FULL,
+    columns: Optional[BordereauColumns] = None,
+) -> List[VectorizedRunResult]:
+    """
+    apply_program_vectorized pour chaque date de calcul, en une passe.
+
+    Ce qui ne dépend pas de la date (exposition, validation de devise, matching
+    des conditions, fenêtres risk-attaching) est calculé une fois ; seuls le
+    masque d'activité, les fenêtres loss-occurring et les exclusions datées
+    sont évalués par date. Un résultat par date, dans l'ordre.
+    """
+    check_detail_level(detail_level)
+    full_details = detail_level == DETAIL_LEVEL.FULL
+    plan = plan or compile_program(program)
+    columns = columns if columns is not None else BordereauColumns.from_dataframe(df)
+    uw_dept = plan.uw_dept
+    n = len(df)
+
+    # 1) Devise, matching : une évaluation par combinaison de dimensions
+    source_columns = plan_source_columns(df.columns, plan)
+    group_of_row, first = columns.group_rows(source_columns)
+    policies = representative_policies(df, source_columns, first, uw_dept)
+
+    n_groups = len(policies)
+    currency_error = np.full(n_groups, None, dtype=object)
+    matched = [np.full(n_groups, DEFAULT_CONDITION) for _ in plan.structures]
+    group_details = (
+        [np.full(n_groups, None, dtype=object) for _ in plan.structures]
+        if full_details
+        else None
+    )
+    for g, policy in enumerate(policies):
+        ok, error = CurrencyValidator.validate_policy_currency(
+            policy, program, index=plan.currency_index
+        )
+        if not ok:
+            currency_error[g] = error
+            continue
+        for sp in plan.structures:
+            if full_details:
+                matched[sp.position][g], group_details[sp.position][g] = (
+                    _match_with_details(sp, policy)
+                )
+            else:
+                matched[sp.position][g] = sp.condition_index.match_position(policy)
+    row_currency_error = currency_error[group_of_row]
+
+    # 2) Exposition, fenêtres RA, colonnes recopiées
+    exposures = columns.exposures(uw_dept)
+    risk_attaching = risk_attaching_matrix(plan, columns.temporal)
+    constant = {
+        "insured_name": (
+            df["INSURED_NAME"].to_numpy(dtype=object)
+            if "INSURED_NAME" in df.columns
+            else np.full(n, None, dtype=object)
+        ),
+        "policy_inception_date": (
+            df["INCEPTION_DT"]
+            if "INCEPTION_DT" in df.columns
+            else pd.Series([None] * n, index=df.index)
+        ),
+        "policy_expiry_date": (
+            df["EXPIRE_DT"]
+            if "EXPIRE_DT" in df.columns
+            else pd.Series([None] * n, index=df.index)
+        ),
+    }
+
+    # 3) Par date : activité, exclusions datées, fenêtres LO
+    exclusions_by_rules: Dict[Tuple, np.ndarray] = {}
+    results = []
+    for calculation_date in calculation_dates:
+        exclusions = plan.exclusions_for(calculation_date)
+        exclusion_reason = exclusions_by_rules.get(exclusions.rules)
+        if exclusion_reason is None:
+            exclusion_reason = np.full(n_groups, None, dtype=object)
+            for g, policy in enumerate(policies):
+                if currency_error[g] is None:
+                    exclusion_reason[g] = exclusions.check(policy)[1]
+            exclusions_by_rules[exclusions.rules] = exclusion_reason
+        results.append(
+            _run_date(
+                df,
+                plan,
+                calculation_date,
+                detail_level,
+                columns=columns,
+                exposures=exposures,
+                applicable=with_loss_occurring(risk_attaching, plan, calculation_date),
+                group_of_row=group_of_row,
+                row_currency_error=row_currency_error,
+                group_excluded=exclusion_reason != None,  # noqa: E711
+                row_exclusion=exclusion_reason[group_of_row],
+                matched=matched,
+                group_details=group_details,
+                constant=constant,
+            )
+        )
+    return results
+
+
+def _run_date(
+    df: pd.DataFrame,
+    plan: ProgramPlan,
+    calculation_date: str,
+    detail_level: str,
+    *,
+    columns: BordereauColumns,
+    exposures: ExposureColumns,
+    applicable: np.ndarray,
+    group_of_row: np.ndarray,
+    row_currency_error: np.ndarray,
+    group_excluded: np.ndarray,
+    row_exclusion: np.ndarray,
+    matched: List[np.ndarray],
+    group_details: Optional[List[np.ndarray]],
+    constant: Dict[str, Any],
+) -> VectorizedRunResult:
+    """Partie d'un run dépendant de la date (cf apply_program_vectorized_dates)."""
+    uw_dept = plan.uw_dept
+    n = len(df)
+
+    # Activité (dates converties une fois en int64)
+    calc = pd.to_datetime(calculation_date)
+    temporal = columns.temporal
+    inactive = temporal.inactive_mask(calculation_date)
+
+    status = np.full(n, "included", dtype=object)
+    reasons = np.full(n, None, dtype=object)
+
+    mismatch = ~inactive & (row_currency_error != None)  # noqa: E711
+    status[mismatch] = "currency_mismatch"
+    reasons[mismatch] = row_currency_error[mismatch]
+
+    excluded = ~inactive & ~mismatch & (row_exclusion != None)  # noqa: E711
+    status[excluded] = "excluded"
+    reasons[excluded] = row_exclusion[excluded]
+
+    status[inactive] = "inactive"
+    if inactive.any():
+        expired_on = pd.to_datetime(temporal.expiry[inactive]).strftime("%Y-%m-%d")
+        reasons[inactive] = (
+            "Policy expired on " + expired_on + f" (calculation date: {calc.date()})"
+        ).to_numpy(dtype=object)
+
+    covered = status == "included"
+
+    # Exposition
+    if covered.any() and not uw_dept:
+        raise ValueError("Program must have an underwriting_department")
+    if (covered & exposures.errors).any():
+        row = int(np.flatnonzero(covered & exposures.errors)[0])
+        # Laisse le calculateur scalaire produire le message d'erreur d'origine
+        Policy(raw=df.iloc[row].to_dict(), uw_dept=uw_dept).exposure_bundle(uw_dept)
+        raise ExposureCalculationError(
+            f"Invalid exposure values for policy at position {row}"
+        )
+    exposure = np.where(exposures.errors, 0.0, exposures.total)
+
+    # Structures (groupes exclus à cette date : aucune condition retenue)
+    condition_index = [
+        np.where(group_excluded, DEFAULT_CONDITION, idx)[group_of_row]
+        for idx in matched
+    ]
+    if covered.any():
+        reports, ceded_100, ceded_re = VectorizedStructureProcessor(
+            plan, exposures, applicable, condition_index
+        ).process_structures(covered)
+        ceded_100 = np.where(covered, ceded_100, 0.0)
+        ceded_re = np.where(covered, ceded_re, 0.0)
+    else:
+        reports, ceded_100, ceded_re = [], np.zeros(n), np.zeros(n)
+    if group_details is not None:
+        for cols in reports:
+            details = group_details[cols.structure_plan.position]
+            cols.matching_details = np.where(group_excluded, None, details)[
+                group_of_row
+            ]
+
+    return VectorizedRunResult(
+        index=df.index,
+        exclusion_status=status,
+        exclusion_reason=reasons,
+        exposure=exposure,
+        effective_exposure=np.where(covered, exposure, 0.0),
+        ceded_to_layer_100pct=ceded_100,
+        ceded_to_reinsurer=ceded_re,
+        insured_name=constant["insured_name"],
+        policy_inception_date=constant["policy_inception_date"],
+        policy_expiry_date=constant["policy_expiry_date"],
+        structures=reports,
+        detail_level=detail_level,
+    )
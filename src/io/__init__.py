@@ -1,14 +1,18 @@
 # src/io/__init__.py
 from .program_snowflake_adapter import SnowflakeProgramIO
 from .bordereau_csv_adapter import CsvBordereauIO
+from .bordereau_parquet_adapter import ParquetBordereauIO
 from .bordereau_snowflake_adapter import SnowflakeBordereauIO
 from .run_csv_adapter import RunCsvIO
+from .run_parquet_adapter import RunParquetIO
 from .run_snowflake_adapter import RunSnowflakeIO
 
 __all__ = [
     "SnowflakeProgramIO",
     "CsvBordereauIO",
+    "ParquetBordereauIO",
     "SnowflakeBordereauIO",
     "RunCsvIO",
+    "RunParquetIO",
     "RunSnowflakeIO",
 ]
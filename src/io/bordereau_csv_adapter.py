@@ -1,6 +1,6 @@
 # src/io/bordereau_csv_adapter.py
 from __future__ import annotations
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator
 import pandas as pd
 
 
@@ -11,5 +11,16 @@ class CsvBordereauIO:
         read_csv_kwargs = read_csv_kwargs or {}
         return pd.read_csv(source, **read_csv_kwargs)
 
+    def iter_read(
+        self,
+        source: str,
+        batch_size: int,
+        read_csv_kwargs: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """Lit le CSV par lots de batch_size lignes (l'index reste global au fichier)."""
+        read_csv_kwargs = read_csv_kwargs or {}
+        with pd.read_csv(source, chunksize=batch_size, **read_csv_kwargs) as reader:
+            yield from reader
+
     def write(self, dest: str, df: pd.DataFrame, *, index: bool = False) -> None:
         df.to_csv(dest, index=index)
@@ -0,0 +1,125 @@
+# src/io/bordereau_parquet_adapter.py
+from __future__ import annotations
+from typing import Any, Iterable, Iterator, List, Optional
+
+import pandas as pd
+
+from src.domain.program import Program
+from src.domain.schema import COLUMNS
+from src.schema.bordereau_mapping import present_mapping
+
+# Colonnes d'identité / cycle de vie toujours lues (validation + résultats)
+META_COLUMNS = [
+    "policy_id",
+    "INSURED_NAME",
+    "INCEPTION_DT",
+    "EXPIRE_DT",
+    "line_of_business",
+]
+
+
+def program_columns(
+    available: Iterable[str], program: Program, uw_dept: Optional[str] = None
+) -> List[str]:
+    """
+    Colonnes du bordereau utiles au programme : identité et dates, colonnes
+    physiques de ses dimensions (+ devise, dimensions des exclusions) et
+    colonnes d'exposition de l'underwriting department.
+    """
+    available = list(available)
+    lob = (uw_dept or program.underwriting_department or "").lower()
+    dimensions = set(program.dimension_columns) | {"CURRENCY"}
+    for rule in program.exclusions:
+        dimensions.update(rule.values_by_dimension.keys())
+
+    wanted = list(META_COLUMNS)
+    for dim, cols in present_mapping(available, lob).items():
+        if dim in dimensions:
+            wanted.extend(cols)
+    wanted.extend(
+        name
+        for name, spec in COLUMNS.items()
+        if spec.kind == "exposure" and lob in spec.required_by_lob
+    )
+    return [c for c in dict.fromkeys(wanted) if c in available]
+
+
+class ParquetBordereauIO:
+    """
+    Lecture/écriture d'un bordereau Parquet (fichier ou dataset) via pyarrow :
+    projection de colonnes et filtres évalués au scan (les lignes filtrées
+    ne sont jamais matérialisées en pandas).
+    """
+
+    def columns(self, source: str) -> List[str]:
+        """Colonnes disponibles (lecture du schéma seul)."""
+        import pyarrow.dataset as ds
+
+        return list(ds.dataset(source).schema.names)
+
+    def active_filter(self, source: str, calculation_date: str):
+        """
+        Filtre des polices actives à la date de calcul (cf Policy.is_active) :
+        EXPIRE_DT > calculation_date ou EXPIRE_DT absente.
+
+        Seulement pour une colonne date / timestamp : une date stockée en texte
+        (vide, format non ISO...) n'est interprétée que par le moteur, qui
+        marque lui-même les polices expirées (statut "inactive") ; None sinon.
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.dataset as ds
+
+        schema = ds.dataset(source).schema
+        if "EXPIRE_DT" not in schema.names:
+            return None
+        field_type = schema.field("EXPIRE_DT").type
+        if not (pa.types.is_timestamp(field_type) or pa.types.is_date(field_type)):
+            return None
+        calc = pd.to_datetime(calculation_date)
+        bound = pa.scalar(calc.to_pydatetime()).cast(field_type)
+        expiry = pc.field("EXPIRE_DT")
+        return (expiry > bound) | expiry.is_null()
+
+    def read(
+        self,
+        source: str,
+        *,
+        columns: Optional[List[str]] = None,
+        filters: Any = None,
+    ) -> pd.DataFrame:
+        """filters : expression pyarrow.compute ou liste DNF [("col", "op", valeur), ...]."""
+        import pyarrow.parquet as pq
+
+        return pq.read_table(source, columns=columns, filters=filters).to_pandas()
+
+    def iter_read(
+        self,
+        source: str,
+        batch_size: int,
+        *,
+        columns: Optional[List[str]] = None,
+        filters: Any = None,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Lit le bordereau par lots d'au plus batch_size lignes (un lot ne
+        chevauche pas deux row groups). L'index reste global au fichier.
+        """
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+
+        if filters is not None and not isinstance(filters, ds.Expression):
+            filters = pq.filters_to_expression(filters)
+        offset = 0
+        for batch in ds.dataset(source).to_batches(
+            columns=columns, filter=filters, batch_size=batch_size
+        ):
+            if batch.num_rows == 0:
+                continue
+            df = batch.to_pandas()
+            df.index = pd.RangeIndex(offset, offset + len(df))
+            offset += len(df)
+            yield df
+
+    def write(self, dest: str, df: pd.DataFrame, *, index: bool = False) -> None:
+        df.to_parquet(dest, index=index, engine="pyarrow")
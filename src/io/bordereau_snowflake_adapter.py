@@ -1,47 +1,130 @@
 # src/io/bordereau_snowflake_adapter.py
 from __future__ import annotations
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator, List, Sequence, Tuple
 import pandas as pd
-from src.io.snowflake_db import parse_db_schema_table
+from src.io.snowflake_db import parse_db_schema_table, pooled_connection
 
 
 # Dépendances attendues (à installer côté projet):
 #   pip install snowflake-connector-python
 #   pip install snowflake-connector-python[pandas]
 
+# Filtre SQL : (prédicat avec paramètres %s, valeurs des paramètres)
+SqlFilter = Tuple[str, Sequence[Any]]
+
+# type_code de cursor.description (snowflake.connector.constants.FIELD_TYPES)
+_TEXT_TYPE_CODE = 2
+_DATE_TYPE_CODES = frozenset({3, 4, 6, 7, 8})  # DATE, TIMESTAMP(_LTZ/_TZ/_NTZ)
+
 
 class SnowflakeBordereauIO:
     """
     Lecture/écriture d'un bordereau en table Snowflake.
     - source "snowflake://DB.SCHEMA.TABLE" => SELECT * FROM DB.SCHEMA.TABLE
     - ou param `sql=...` pour requêtes custom
-    - `connection_params` : dict passé à snowflake.connector.connect(...)
+    - `columns` / `filters` : projection et filtre évalués côté Snowflake
+      (les colonnes et lignes écartées ne sont jamais transférées)
+    - `connection_params` : dict passé à snowflake.connector.connect(...) ;
+      les connexions sont réutilisées via le pool partagé de ces paramètres
     """
 
+    def columns(
+        self,
+        source: str,
+        *,
+        sql: Optional[str] = None,
+        connection_params: Optional[Dict[str, Any]] = None,
+    ) -> List[str]:
+        """Colonnes disponibles (requête LIMIT 0 : aucune ligne lue)."""
+        return [desc[0] for desc in self._describe(source, sql, connection_params)]
+
+    def active_filter(
+        self,
+        source: str,
+        calculation_date: str,
+        *,
+        sql: Optional[str] = None,
+        connection_params: Optional[Dict[str, Any]] = None,
+    ) -> Optional[SqlFilter]:
+        """
+        Filtre des polices actives à la date de calcul (cf Policy.is_active) :
+        EXPIRE_DT > calculation_date ou EXPIRE_DT absente.
+        - None si la relation n'a pas de colonne EXPIRE_DT
+        - colonne texte : comparaison sur TRY_TO_DATE (date illisible => ligne
+          lue, le moteur l'interprète), jamais sur l'ordre lexical
+        - autre type (VARIANT...) : pas de filtre
+        """
+        types = {
+            desc[0]: desc[1] for desc in self._describe(source, sql, connection_params)
+        }
+        if "EXPIRE_DT" not in types:
+            return None
+        if types["EXPIRE_DT"] in _DATE_TYPE_CODES:
+            expiry = '"EXPIRE_DT"'
+        elif types["EXPIRE_DT"] == _TEXT_TYPE_CODE:
+            expiry = 'TRY_TO_DATE("EXPIRE_DT")'
+        else:
+            return None
+        calc = pd.to_datetime(calculation_date).strftime("%Y-%m-%d")
+        return f"({expiry} > %s OR {expiry} IS NULL)", (calc,)
+
     def read(
         self,
         source: str,
         *,
         sql: Optional[str] = None,
+        columns: Optional[List[str]] = None,
+        filters: Optional[SqlFilter] = None,
         connection_params: Optional[Dict[str, Any]] = None,
     ) -> pd.DataFrame:
-        import snowflake.connector
-
-        connection_params = connection_params or {}
-        cnx = snowflake.connector.connect(**connection_params)
-        try:
-            if sql is None:
-                db, schema, table, _ = parse_db_schema_table(source)
-                sql = f'SELECT * FROM "{db}"."{schema}"."{table}"'
+        query, params = self._select(source, sql, columns, filters)
+        with pooled_connection(connection_params or {}) as cnx:
             cur = cnx.cursor()
             try:
-                cur.execute(sql)
+                cur.execute(query, params)
                 df = cur.fetch_pandas_all()
                 return df
             finally:
                 cur.close()
-        finally:
-            cnx.close()
+
+    def iter_read(
+        self,
+        source: str,
+        batch_size: int,
+        *,
+        sql: Optional[str] = None,
+        columns: Optional[List[str]] = None,
+        filters: Optional[SqlFilter] = None,
+        connection_params: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Lit le bordereau par lots de batch_size lignes (le dernier peut être
+        plus court) à partir des result batches du curseur : seuls un lot et
+        un result batch sont en mémoire à la fois. L'index reste global.
+        La connexion est rendue au pool à la fin (ou fermeture) de l'itération.
+        """
+        query, params = self._select(source, sql, columns, filters)
+        with pooled_connection(connection_params or {}) as cnx:
+            cur = cnx.cursor()
+            try:
+                cur.execute(query, params)
+                pending: List[pd.DataFrame] = []
+                pending_rows = offset = 0
+                for chunk in cur.fetch_pandas_batches():
+                    start = 0
+                    while start < len(chunk):
+                        take = min(batch_size - pending_rows, len(chunk) - start)
+                        pending.append(chunk.iloc[start : start + take])
+                        pending_rows += take
+                        start += take
+                        if pending_rows == batch_size:
+                            yield self._batch(pending, offset)
+                            offset += pending_rows
+                            pending, pending_rows = [], 0
+                if pending_rows:
+                    yield self._batch(pending, offset)
+            finally:
+                cur.close()
 
     def write(
         self,
@@ -52,29 +135,77 @@ class SnowflakeBordereauIO:
         connection_params: Optional[Dict[str, Any]] = None,
         chunk_size: int = 10_000,
     ) -> None:
-        import snowflake.connector
         from snowflake.connector.pandas_tools import write_pandas
 
         db, schema, table, _ = parse_db_schema_table(dest)
-        connection_params = connection_params or {}
-        cnx = snowflake.connector.connect(**connection_params)
-        try:
+        # Noms qualifiés plutôt que USE DATABASE/SCHEMA : la connexion du pool
+        # garde son contexte pour les appelants suivants
+        with pooled_connection(connection_params or {}) as cnx:
             cur = cnx.cursor()
             try:
-                cur.execute(f'USE DATABASE "{db}"')
-                cur.execute(f'USE SCHEMA "{schema}"')
                 if if_exists == "replace":
-                    cur.execute(f'DROP TABLE IF EXISTS "{table}"')
+                    cur.execute(f'DROP TABLE IF EXISTS "{db}"."{schema}"."{table}"')
                     # création automatique par write_pandas si absent
                 write_pandas(
                     cnx,
                     df,
                     table_name=table,
+                    database=db,
+                    schema=schema,
                     auto_create_table=True,
                     quote_identifiers=True,
                     chunk_size=chunk_size,
                 )
             finally:
                 cur.close()
-        finally:
-            cnx.close()
\ No newline at end of file
+
+    # ─── Helpers ──────────────────────────────────────────────────────────
+    def _describe(
+        self,
+        source: str,
+        sql: Optional[str],
+        connection_params: Optional[Dict[str, Any]],
+    ) -> List[Tuple[Any, ...]]:
+        """cursor.description de la relation (requête LIMIT 0 : aucune ligne lue)."""
+        query = f"SELECT * FROM {self._relation(source, sql)} LIMIT 0"
+        with pooled_connection(connection_params or {}) as cnx:
+            cur = cnx.cursor()
+            try:
+                cur.execute(query)
+                return list(cur.description)
+            finally:
+                cur.close()
+
+    @staticmethod
+    def _relation(source: str, sql: Optional[str]) -> str:
+        if sql is not None:
+            return f"({sql})"
+        db, schema, table, _ = parse_db_schema_table(source)
+        return f'"{db}"."{schema}"."{table}"'
+
+    def _select(
+        self,
+        source: str,
+        sql: Optional[str],
+        columns: Optional[List[str]],
+        filters: Optional[SqlFilter],
+    ) -> Tuple[str, Tuple[Any, ...]]:
+        if sql is not None and columns is None and filters is None:
+            return sql, ()
+        projection = (
+            ", ".join('"' + c.replace('"', '""') + '"' for c in columns)
+            if columns is not None
+            else "*"
+        )
+        query = f"SELECT {projection} FROM {self._relation(source, sql)}"
+        if filters is None:
+            return query, ()
+        predicate, params = filters
+        return f"{query} WHERE {predicate}", tuple(params)
+
+    @staticmethod
+    def _batch(parts: List[pd.DataFrame], offset: int) -> pd.DataFrame:
+        df = pd.concat(parts) if len(parts) > 1 else parts[0]
+        df = df.reset_index(drop=True)
+        df.index = pd.RangeIndex(offset, offset + len(df))
+        return df
@@ -4,10 +4,10 @@
 # Toute lecture/suppression de RP_CONDITIONS DOIT être scopée par REINSURANCE_PROGRAM_ID via un JOIN avec RP_STRUCTURES.
 # Ne jamais filtrer RP_CONDITIONS uniquement par INSPER_ID_PRE avec IN (...).
 from __future__ import annotations
-from typing import Tuple, Optional, Dict, Any, List
+from typing import Tuple, Optional, Dict, Any, List, Sequence
 import pandas as pd
 from src.serialization.program_frames import ProgramFrames, condition_dims_in
-from src.io.snowflake_db import parse_db_schema, connect as sf_connect, insert_df
+from src.io.snowflake_db import parse_db_schema, get_pool, insert_df
 
 
 class SnowflakeProgramIO:
@@ -38,29 +38,110 @@ class SnowflakeProgramIO:
         """
         if not program_id:
             raise ValueError("program_id is required for Snowflake program loading")
-            
+
+        program_id = int(program_id)
+        return self.read_many(source, connection_params, [program_id])[program_id]
+
+    def read_many(
+        self,
+        source: str,
+        connection_params: Dict[str, Any],
+        program_ids: Sequence[int],
+    ) -> Dict[int, Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]]:
+        """
+        Lit plusieurs programmes avec une requête ensembliste par table
+        (WHERE REINSURANCE_PROGRAM_ID IN (...)), puis découpe les DataFrames
+        en mémoire. Retourne {program_id: (program_df, structures_df,
+        conditions_df, exclusions_df, field_links_df)} dans l'ordre de program_ids.
+        """
+        ids = list(dict.fromkeys(int(i) for i in program_ids))
+        if not ids:
+            return {}
+
         db, schema, params = parse_db_schema(source)
-        cnx = sf_connect(connection_params)
+        pool = get_pool(connection_params)
+        cnx = pool.acquire()
         cur = cnx.cursor()
+        placeholders = ", ".join(["%s"] * len(ids))
         try:
-            # 1. Lire le programme par ID
-            cur.execute(
-                f'SELECT * FROM "{db}"."{schema}"."{self.PROGRAMS}" WHERE REINSURANCE_PROGRAM_ID=%s',
-                (program_id,),
+            tables = {
+                name: self._select(
+                    cur, sql.format(db=db, schema=schema, ids=placeholders), ids
+                )
+                for name, sql in self._read_queries().items()
+            }
+        finally:
+            cur.close()
+            pool.release(cnx)
+
+        missing = sorted(set(ids) - set(tables["program"]["REINSURANCE_PROGRAM_ID"].astype(int)))
+        if missing:
+            raise ValueError(
+                f"Program with ID {missing[0]} not found"
+                if len(missing) == 1
+                else f"Programs with IDs {missing} not found"
             )
 
-            program_rows = cur.fetchall()
-            if not program_rows:
-                raise ValueError(f"Program with ID {program_id} not found")
+        parts = {name: self._split_by_program(df) for name, df in tables.items()}
+        out = {}
+        for program_id in ids:
+            frames = []
+            for name in ("program", "structures", "conditions", "exclusions", "field_links"):
+                df = parts[name].get(program_id)
+                if df is None:
+                    df = tables[name].iloc[0:0]
+                if name == "field_links":
+                    # Colonne technique ajoutée pour le découpage uniquement
+                    df = df.drop(columns=[self._FIELD_LINK_PROGRAM])
+                frames.append(df.reset_index(drop=True))
+            out[program_id] = tuple(frames)
+        return out
 
-            program_df = pd.DataFrame(
-                program_rows, columns=[desc[0] for desc in cur.description]
-            )
+    def read_version(
+        self, source: str, connection_params: Dict[str, Any], program_id: int
+    ) -> str:
+        """
+        Jeton de fraîcheur du programme : HASH_AGG des lignes de ses 5 tables,
+        en une seule requête légère (aucune ligne rapatriée). Change dès qu'une
+        ligne du programme est ajoutée, modifiée ou supprimée.
+        """
+        db, schema, params = parse_db_schema(source)
+        t = lambda table: f'"{db}"."{schema}"."{table}"'
+        sql = f'''
+            SELECT
+                (SELECT HASH_AGG(*) FROM {t(self.PROGRAMS)} WHERE REINSURANCE_PROGRAM_ID = %s),
+                (SELECT HASH_AGG(*) FROM {t(self.STRUCTURES)} WHERE REINSURANCE_PROGRAM_ID = %s),
+                (SELECT HASH_AGG(*) FROM {t(self.CONDITIONS)} WHERE REINSURANCE_PROGRAM_ID = %s),
+                (SELECT HASH_AGG(fl.RP_STRUCTURE_FIELD_LINK_ID, fl.RP_CONDITION_ID,
+                                 fl.RP_STRUCTURE_ID, fl.FIELD_NAME, fl.NEW_VALUE)
+                   FROM {t("RP_STRUCTURE_FIELD_LINK")} fl
+                   JOIN {t(self.CONDITIONS)} c ON fl.RP_CONDITION_ID = c.RP_CONDITION_ID
+                  WHERE c.REINSURANCE_PROGRAM_ID = %s),
+                (SELECT HASH_AGG(*) FROM {t(self.EXCLUSIONS)} WHERE REINSURANCE_PROGRAM_ID = %s)
+        '''
+        with get_pool(connection_params).connection() as cnx:
+            cur = cnx.cursor()
+            try:
+                cur.execute(sql, (int(program_id),) * 5)
+                row = cur.fetchone()
+            finally:
+                cur.close()
+        return "-".join(str(v) for v in row)
+
+    # ---------------- lecture : requêtes ensemblistes
+    _FIELD_LINK_PROGRAM = "_REINSURANCE_PROGRAM_ID"
 
-            # 2. Lire les structures
-            program_id = int(program_df.iloc[0]["REINSURANCE_PROGRAM_ID"])
-            cur.execute(
-                f'''
+    def _read_queries(self) -> Dict[str, str]:
+        """Une requête par table, paramétrée par la liste d'IDs ({ids})."""
+        return {
+            # 1. Programmes
+            "program": (
+                f'SELECT * FROM "{{db}}"."{{schema}}"."{self.PROGRAMS}" '
+                f"WHERE REINSURANCE_PROGRAM_ID IN ({{ids}}) "
+                f"ORDER BY REINSURANCE_PROGRAM_ID"
+            ),
+            # 2. Structures
+            "structures": f'''
                 SELECT 
                     RP_STRUCTURE_ID,
                     REINSURANCE_PROGRAM_ID,
@@ -96,19 +177,12 @@ class SnowflakeProgramIO:
                     CAST(PML_DEFAULT_PCT AS FLOAT) AS PML_DEFAULT_PCT,
                     CAST(LIMIT_EVENT AS FLOAT) AS LIMIT_EVENT,
                     NO_OF_REINSTATEMENTS
-                FROM "{db}"."{schema}"."{self.STRUCTURES}" 
-                WHERE REINSURANCE_PROGRAM_ID=%s
+                FROM "{{db}}"."{{schema}}"."{self.STRUCTURES}"
+                WHERE REINSURANCE_PROGRAM_ID IN ({{ids}})
+                ORDER BY REINSURANCE_PROGRAM_ID, RP_STRUCTURE_ID
                 ''',
-                (program_id,),
-            )
-            structures_rows = cur.fetchall()
-            structures_df = pd.DataFrame(
-                structures_rows, columns=[desc[0] for desc in cur.description]
-            )
-
-            # 3. Lire les conditions (scopées par REINSURANCE_PROGRAM_ID)
-            cur.execute(
-                f'''
+            # 3. Conditions (scopées par REINSURANCE_PROGRAM_ID)
+            "conditions": f'''
                 SELECT 
                     c.RP_CONDITION_ID,
                     c.REINSURANCE_PROGRAM_ID,
@@ -120,20 +194,12 @@ class SnowflakeProgramIO:
                     c.CURRENCIES,
                     c.INCLUDES_HULL,
                     c.INCLUDES_LIABILITY
-                FROM "{db}"."{schema}"."{self.CONDITIONS}" c
-                WHERE c.REINSURANCE_PROGRAM_ID = %s
+                FROM "{{db}}"."{{schema}}"."{self.CONDITIONS}" c
+                WHERE c.REINSURANCE_PROGRAM_ID IN ({{ids}})
                 ORDER BY c.RP_CONDITION_ID
                 ''',
-                (program_id,),
-            )
-            conditions_rows = cur.fetchall()
-            conditions_df = pd.DataFrame(
-                conditions_rows, columns=[desc[0] for desc in cur.description]
-            )
-
-            # 4. Lire les RP_STRUCTURE_FIELD_LINK pour les overrides
-            cur.execute(
-                f'''
+            # 4. RP_STRUCTURE_FIELD_LINK pour les overrides
+            "field_links": f'''
                 SELECT 
                     fl.RP_STRUCTURE_FIELD_LINK_ID,
                     fl.RP_CONDITION_ID,
@@ -144,35 +210,36 @@ class SnowflakeProgramIO:
                         WHEN fl.FIELD_NAME IN ('CESSION_PCT', 'LIMIT_100', 'ATTACHMENT_POINT_100', 'SIGNED_SHARE_PCT') 
                         THEN CAST(fl.NEW_VALUE AS FLOAT)
                         ELSE fl.NEW_VALUE
-                    END AS NEW_VALUE
-                FROM "{db}"."{schema}"."RP_STRUCTURE_FIELD_LINK" fl
-                JOIN "{db}"."{schema}"."{self.CONDITIONS}" c
+                    END AS NEW_VALUE,
+                    c.REINSURANCE_PROGRAM_ID AS {self._FIELD_LINK_PROGRAM}
+                FROM "{{db}}"."{{schema}}"."RP_STRUCTURE_FIELD_LINK" fl
+                JOIN "{{db}}"."{{schema}}"."{self.CONDITIONS}" c
                   ON fl.RP_CONDITION_ID = c.RP_CONDITION_ID
-                WHERE c.REINSURANCE_PROGRAM_ID = %s
+                WHERE c.REINSURANCE_PROGRAM_ID IN ({{ids}})
                 ORDER BY fl.RP_STRUCTURE_FIELD_LINK_ID
                 ''',
-                (program_id,),
-            )
-            field_links_rows = cur.fetchall()
-            field_links_df = pd.DataFrame(
-                field_links_rows, columns=[desc[0] for desc in cur.description]
-            )
-
-            # 5. Lire les exclusions
-            cur.execute(
-                f'SELECT * FROM "{db}"."{schema}"."{self.EXCLUSIONS}" WHERE REINSURANCE_PROGRAM_ID=%s',
-                (program_id,),
-            )
-            exclusions_rows = cur.fetchall()
-            exclusions_df = pd.DataFrame(
-                exclusions_rows, columns=[desc[0] for desc in cur.description]
-            )
+            # 5. Exclusions
+            "exclusions": (
+                f'SELECT * FROM "{{db}}"."{{schema}}"."{self.EXCLUSIONS}" '
+                f"WHERE REINSURANCE_PROGRAM_ID IN ({{ids}})"
+            ),
+        }
 
-            return program_df, structures_df, conditions_df, exclusions_df, field_links_df
+    @staticmethod
+    def _select(cur, sql: str, params: List[int]) -> pd.DataFrame:
+        cur.execute(sql, tuple(params))
+        rows = cur.fetchall()
+        return pd.DataFrame(rows, columns=[desc[0] for desc in cur.description])
 
-        finally:
-            cur.close()
-            cnx.close()
+    def _split_by_program(self, df: pd.DataFrame) -> Dict[int, pd.DataFrame]:
+        key = (
+            self._FIELD_LINK_PROGRAM
+            if self._FIELD_LINK_PROGRAM in df.columns
+            else "REINSURANCE_PROGRAM_ID"
+        )
+        if df.empty or key not in df.columns:
+            return {}
+        return {int(k): part for k, part in df.groupby(df[key].astype(int), sort=False)}
 
     def write(
         self,
@@ -186,7 +253,8 @@ class SnowflakeProgramIO:
     ) -> None:
         db, schema, params = parse_db_schema(dest)
 
-        cnx = sf_connect(connection_params)
+        pool = get_pool(connection_params)
+        cnx = pool.acquire()
         try:
             cur = cnx.cursor()
             try:
@@ -324,4 +392,4 @@ class SnowflakeProgramIO:
             finally:
                 cur.close()
         finally:
-            cnx.close()
\ No newline at end of file
+            pool.release(cnx)
\ No newline at end of file
@@ -6,11 +6,25 @@ et les convertit en DataFrames pandas compatibles avec le ProgramSerializer exis
 """
 
 from __future__ import annotations
-from typing import Tuple, Optional, Dict, Any
+from typing import Tuple, Optional, Dict, Any, List
 import pandas as pd
 from snowflake.snowpark import Session
 from snowflake.snowpark.functions import col, lit
 
+# Lignes par INSERT multi-lignes (Snowflake accepte jusqu'à 16 384 lignes par VALUES)
+INSERT_BATCH_ROWS = 1000
+
+
+def _sql_literal(value: Any) -> str:
+    """Échappe une valeur pour un INSERT ... VALUES."""
+    if pd.isna(value) or value is None:
+        return "NULL"
+    if isinstance(value, str):
+        escaped_value = value.replace("'", "''")
+        return f"'{escaped_value}'"
+    if isinstance(value, pd.Timestamp):
+        return f"'{value.strftime('%Y-%m-%d %H:%M:%S')}'"
+    return str(value)
 
 
 class SnowparkProgramIO:
@@ -36,6 +50,8 @@ class SnowparkProgramIO:
             session: Session Snowpark active
         """
         self.session = session
+        # DESCRIBE TABLE mis en cache pour la durée de la session
+        self._table_structures: Dict[str, list] = {}
 
     def read(self, program_id: int) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
         """
@@ -71,6 +87,26 @@ class SnowparkProgramIO:
         except Exception as e:
             raise RuntimeError(f"Error reading program {program_id} from Snowflake: {e}")
 
+    def read_version(self, program_id: int) -> str:
+        """
+        Jeton de fraîcheur du programme : HASH_AGG des lignes de ses 5 tables,
+        en une seule requête légère (cf SnowflakeProgramIO.read_version).
+        """
+        program_id = int(program_id)
+        row = self.session.sql(f"""
+            SELECT
+                (SELECT HASH_AGG(*) FROM {self.PROGRAMS} WHERE REINSURANCE_PROGRAM_ID = {program_id}),
+                (SELECT HASH_AGG(*) FROM {self.STRUCTURES} WHERE REINSURANCE_PROGRAM_ID = {program_id}),
+                (SELECT HASH_AGG(*) FROM {self.CONDITIONS} WHERE REINSURANCE_PROGRAM_ID = {program_id}),
+                (SELECT HASH_AGG(fl.RP_STRUCTURE_FIELD_LINK_ID, fl.RP_CONDITION_ID,
+                                 fl.RP_STRUCTURE_ID, fl.FIELD_NAME, fl.NEW_VALUE)
+                   FROM {self.FIELD_LINKS} fl
+                   JOIN {self.CONDITIONS} c ON fl.RP_CONDITION_ID = c.RP_CONDITION_ID
+                  WHERE c.REINSURANCE_PROGRAM_ID = {program_id}),
+                (SELECT HASH_AGG(*) FROM {self.EXCLUSIONS} WHERE REINSURANCE_PROGRAM_ID = {program_id})
+        """).collect()[0]
+        return "-".join(str(v) for v in row)
+
     def _read_program(self, program_id: int) -> pd.DataFrame:
         """Lit les données du programme principal."""
         program_df = self.session.table(self.PROGRAMS).filter(
@@ -290,51 +326,36 @@ class SnowparkProgramIO:
             print(f"🔍 Colonnes requises ({len(required_columns)}): {required_columns}")
             print(f"🔍 Colonnes pour insertion ({len(insert_df.columns)}): {list(insert_df.columns)}")
             
-            # Insérer chaque ligne via SQL INSERT
-            for _, row in insert_df.iterrows():
-                self._insert_row_sql(row, table_name)
+            # INSERT multi-lignes : un aller-retour par lot de INSERT_BATCH_ROWS lignes
+            for insert_sql in self._insert_statements(insert_df, table_name):
+                self.session.sql(insert_sql).collect()
             
         except Exception as e:
             print(f"❌ Erreur lors de l'insertion dans {table_name}: {str(e)}")
             raise
     
-    def _insert_row_sql(self, row: pd.Series, table_name: str) -> None:
-        """Insère une ligne via SQL INSERT."""
-        try:
-            # Construire la requête INSERT
-            columns = list(row.index)
-            values = list(row.values)
-            
-            # Échapper les valeurs pour SQL
-            escaped_values = []
-            for value in values:
-                if pd.isna(value) or value is None:
-                    escaped_values.append("NULL")
-                elif isinstance(value, str):
-                    escaped_value = value.replace("'", "''")
-                    escaped_values.append(f"'{escaped_value}'")
-                elif isinstance(value, pd.Timestamp):
-                    escaped_values.append(f"'{value.strftime('%Y-%m-%d %H:%M:%S')}'")
-                else:
-                    escaped_values.append(str(value))
-            
-            columns_str = ", ".join([f'"{col}"' for col in columns])
-            values_str = ", ".join(escaped_values)
-            
-            insert_sql = f"INSERT INTO {table_name} ({columns_str}) VALUES ({values_str})"
-            
-            # Exécuter la requête
-            self.session.sql(insert_sql).collect()
-            
-        except Exception as e:
-            print(f"❌ Erreur lors de l'insertion de la ligne: {str(e)}")
-            raise
-    
+    def _insert_statements(self, df: pd.DataFrame, table_name: str) -> List[str]:
+        """Requêtes INSERT ... VALUES (...), (...) par lots de INSERT_BATCH_ROWS lignes."""
+        columns_str = ", ".join([f'"{col}"' for col in df.columns])
+        rows = [
+            "(" + ", ".join(_sql_literal(value) for value in row) + ")"
+            for row in df.itertuples(index=False, name=None)
+        ]
+        return [
+            f"INSERT INTO {table_name} ({columns_str}) VALUES "
+            + ", ".join(rows[start : start + INSERT_BATCH_ROWS])
+            for start in range(0, len(rows), INSERT_BATCH_ROWS)
+        ]
+
     def _get_table_structure(self, table_name: str) -> list:
-        """Obtient la structure d'une table Snowflake."""
+        """Obtient la structure d'une table Snowflake (une fois par table et par session)."""
+        if table_name in self._table_structures:
+            return self._table_structures[table_name]
         try:
             result = self.session.sql(f"DESCRIBE TABLE {table_name}").collect()
-            return [(row[0], row[1]) for row in result]
+            structure = [(row[0], row[1]) for row in result]
+            self._table_structures[table_name] = structure
+            return structure
         except Exception as e:
             print(f"❌ Erreur lors de la récupération de la structure de {table_name}: {str(e)}")
             raise
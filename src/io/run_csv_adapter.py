@@ -30,6 +30,37 @@ class RunCsvIO:
         run_policies_df.to_csv(p / self.POLICIES, index=False)
         run_policy_structures_df.to_csv(p / self.STRUCTURES, index=False)
 
+    def write_batch(
+        self,
+        dest_folder: str,
+        run_policies_df: pd.DataFrame,
+        run_policy_structures_df: pd.DataFrame,
+        *,
+        append: bool,
+    ) -> None:
+        """
+        Ajoute un lot de lignes aux tables policies/structures (mode streaming).
+        append=False repart de fichiers vides ; l'en-tête est écrit une seule fois.
+        """
+        p = Path(dest_folder)
+        p.mkdir(parents=True, exist_ok=True)
+        self._append(p / self.POLICIES, run_policies_df, append)
+        self._append(p / self.STRUCTURES, run_policy_structures_df, append)
+
+    def write_runs(self, dest_folder: str, runs_df: pd.DataFrame) -> None:
+        p = Path(dest_folder)
+        p.mkdir(parents=True, exist_ok=True)
+        runs_df.to_csv(p / self.RUNS, index=False)
+
+    @staticmethod
+    def _append(path: Path, df: pd.DataFrame, append: bool) -> None:
+        if not append and path.exists():
+            path.unlink()
+        if len(df.columns) == 0:
+            return  # lot sans ligne (ex: aucune structure) : rien à écrire
+        header = not path.exists() or path.stat().st_size == 0
+        df.to_csv(path, mode="a", header=header, index=False)
+
     def read(self, folder: str) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
         p = Path(folder)
         runs = pd.read_csv(p / self.RUNS)
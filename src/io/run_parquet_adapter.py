@@ -0,0 +1,232 @@
+# src/io/run_parquet_adapter.py
+from __future__ import annotations
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import unquote
+
+import pandas as pd
+
+# Colonnes typées des 3 tables (cf RunSerializer) : "string" | "float" | "int" | "bool" | "timestamp"
+RUNS_COLUMNS: Dict[str, str] = {
+    "run_id": "string",
+    "program_name": "string",
+    "uw_dept": "string",
+    "calculation_date": "string",
+    "source_program": "string",
+    "source_bordereau": "string",
+    "program_fingerprint": "string",
+    "started_at": "string",
+    "ended_at": "string",
+    "row_count": "int",
+    "notes": "string",
+}
+
+POLICIES_COLUMNS: Dict[str, str] = {
+    "policy_run_id": "string",
+    "run_id": "string",
+    "policy_id": "string",
+    "INSURED_NAME": "string",
+    "INCEPTION_DT": "timestamp",
+    "EXPIRE_DT": "timestamp",
+    "exclusion_status": "string",
+    "exclusion_reason": "string",
+    "exposure": "float",
+    "effective_exposure": "float",
+    "cession_to_layer_100pct": "float",
+    "cession_to_reinsurer": "float",
+    "retained_by_cedant": "float",
+    "raw_result_json": "string",
+}
+
+STRUCTURES_COLUMNS: Dict[str, str] = {
+    "structure_row_id": "string",
+    "policy_run_id": "string",
+    "run_id": "string",  # ajouté à l'écriture (partitionnement)
+    "structure_name": "string",
+    "type_of_participation": "string",
+    "predecessor_title": "string",
+    "claim_basis": "string",
+    "period_start": "string",
+    "period_end": "string",
+    "applied": "bool",
+    "reason": "string",
+    "scope": "string",
+    "input_exposure": "float",
+    "ceded_to_layer_100pct": "float",
+    "ceded_to_reinsurer": "float",
+    "retained_after": "float",
+    "terms_json": "string",
+    "matched_condition_json": "string",
+    "rescaling_json": "string",
+    "matching_details_json": "string",
+    "metrics_json": "string",
+}
+
+
+def _arrow_type(kind: str):
+    import pyarrow as pa
+
+    return {
+        "string": pa.string(),
+        "float": pa.float64(),
+        "int": pa.int64(),
+        "bool": pa.bool_(),
+        "timestamp": pa.timestamp("ns"),
+    }[kind]
+
+
+class RunParquetIO:
+    """
+    Écrit/Lit les 3 tables de run en datasets Parquet (partitionnement hive) :
+      - runs/                    partitionné par run_id
+      - run_policies/            partitionné par run_id
+      - run_policy_structures/   partitionné par run_id puis structure_name
+    Colonnes typées (pas de ré-interprétation à la lecture), lectures avec
+    projection de colonnes et filtres poussés au scan (pyarrow).
+    """
+
+    RUNS = "runs"
+    POLICIES = "run_policies"
+    STRUCTURES = "run_policy_structures"
+
+    TABLES: Dict[str, Tuple[Dict[str, str], List[str]]] = {
+        RUNS: (RUNS_COLUMNS, ["run_id"]),
+        POLICIES: (POLICIES_COLUMNS, ["run_id"]),
+        STRUCTURES: (STRUCTURES_COLUMNS, ["run_id", "structure_name"]),
+    }
+
+    def write(
+        self,
+        dest_folder: str,
+        runs_df: pd.DataFrame,
+        run_policies_df: pd.DataFrame,
+        run_policy_structures_df: pd.DataFrame,
+    ) -> None:
+        """Écrit un run complet (remplace les partitions existantes des mêmes run_id)."""
+        self.write_batch(
+            dest_folder, run_policies_df, run_policy_structures_df, append=False
+        )
+        self.write_runs(dest_folder, runs_df)
+
+    def write_batch(
+        self,
+        dest_folder: str,
+        run_policies_df: pd.DataFrame,
+        run_policy_structures_df: pd.DataFrame,
+        *,
+        append: bool,
+    ) -> None:
+        """
+        Ajoute un lot de lignes aux tables policies/structures (mode streaming).
+        append=False supprime d'abord les partitions des run_id du lot.
+        """
+        p = Path(dest_folder)
+        run_ids = self._run_ids(run_policies_df)
+        if not append:
+            for table in (self.POLICIES, self.STRUCTURES):
+                self._drop_runs(p / table, run_ids)
+        structures = run_policy_structures_df
+        if len(structures.columns) and "run_id" not in structures.columns:
+            run_of_policy = dict(
+                zip(run_policies_df["policy_run_id"], run_policies_df["run_id"])
+            )
+            structures = structures.assign(
+                run_id=structures["policy_run_id"].map(run_of_policy)
+            )
+        self._append(p, self.POLICIES, run_policies_df)
+        self._append(p, self.STRUCTURES, structures)
+
+    def write_runs(self, dest_folder: str, runs_df: pd.DataFrame) -> None:
+        p = Path(dest_folder)
+        self._drop_runs(p / self.RUNS, self._run_ids(runs_df))
+        self._append(p, self.RUNS, runs_df)
+
+    def read(
+        self, folder: str, *, run_ids: Optional[Sequence[str]] = None
+    ) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        runs = self.read_table(folder, self.RUNS, run_ids=run_ids)
+        pols = self.read_table(folder, self.POLICIES, run_ids=run_ids)
+        strs = self.read_table(folder, self.STRUCTURES, run_ids=run_ids)
+        return runs, pols, strs
+
+    def read_table(
+        self,
+        folder: str,
+        table: str,
+        *,
+        columns: Optional[Sequence[str]] = None,
+        filters: Optional[List[Tuple[str, str, Any]]] = None,
+        run_ids: Optional[Sequence[str]] = None,
+    ) -> pd.DataFrame:
+        """
+        Lit une table en ne matérialisant que `columns` et les lignes qui
+        satisfont `filters` (format pyarrow : [("col", "op", valeur), ...]).
+        Les filtres sur run_id / structure_name élaguent des partitions entières.
+        """
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+
+        spec, partition_cols = self.TABLES[table]
+        path = Path(folder) / table
+        names = list(columns) if columns is not None else list(spec)
+        if not path.exists():
+            return pd.DataFrame(columns=names)
+
+        filters = list(filters or [])
+        if run_ids is not None:
+            filters.append(("run_id", "in", list(run_ids)))
+        # Clés de partition toujours lues comme des chaînes (pas d'inférence de type)
+        partitioning = ds.partitioning(
+            pa.schema([(col, pa.string()) for col in partition_cols]), flavor="hive"
+        )
+        arrow_table = pq.read_table(
+            path, columns=names, filters=filters or None, partitioning=partitioning
+        )
+        df = arrow_table.to_pandas()
+        # Les colonnes de partition reviennent en catégories
+        for col in partition_cols:
+            if col in df.columns:
+                df[col] = df[col].astype(object)
+        return df[names]
+
+    # ─── Helpers ──────────────────────────────────────────────────────────
+    @staticmethod
+    def _run_ids(df: pd.DataFrame) -> List[str]:
+        if "run_id" not in df.columns:
+            return []
+        return [str(r) for r in pd.unique(df["run_id"])]
+
+    @staticmethod
+    def _drop_runs(table_path: Path, run_ids: Sequence[str]) -> None:
+        if not table_path.exists():
+            return
+        for child in table_path.glob("run_id=*"):
+            if unquote(child.name[len("run_id=") :]) in run_ids:
+                shutil.rmtree(child)
+
+    def _append(self, folder: Path, table: str, df: pd.DataFrame) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if len(df.columns) == 0 or len(df) == 0:
+            return  # lot sans ligne (ex: aucune structure) : rien à écrire
+        spec, partition_cols = self.TABLES[table]
+        df = df.reindex(columns=list(spec))
+        for col, kind in spec.items():
+            if kind == "timestamp":
+                df[col] = pd.to_datetime(df[col], errors="coerce")
+            elif kind == "string":
+                df[col] = [None if pd.isna(v) else str(v) for v in df[col]]
+        schema = pa.schema([(col, _arrow_type(kind)) for col, kind in spec.items()])
+        pq.write_to_dataset(
+            pa.Table.from_pandas(df, schema=schema, preserve_index=False),
+            root_path=str(folder / table),
+            partition_cols=partition_cols,
+            # Noms croissants : la relecture respecte l'ordre d'écriture des lots
+            basename_template=f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
@@ -2,13 +2,15 @@
 from __future__ import annotations
 from typing import Optional, Dict, Any, Tuple
 import pandas as pd
-from src.io.snowflake_db import parse_db_schema, connect as sf_connect
+from src.io.snowflake_db import parse_db_schema, get_pool
 
 
 class RunSnowflakeIO:
     """
     Persistance des 3 tables de run dans Snowflake (tables globales).
     DSN attendu: snowflake://DB.SCHEMA
+    Connexions empruntées au pool partagé ; la DDL n'est exécutée qu'une fois
+    par pool et par DB.SCHEMA.
     """
 
     RUNS = "RUNS"
@@ -78,6 +80,11 @@ class RunSnowflakeIO:
         finally:
             cur.close()
 
+    def _ensure_tables_once(self, pool, cnx, db: str, schema: str) -> None:
+        pool.ensure_once(
+            ("run_tables", db, schema), lambda: self._ensure_tables(cnx, db, schema)
+        )
+
     def write(
         self,
         dest_dsn: str,
@@ -91,9 +98,9 @@ class RunSnowflakeIO:
         from snowflake.connector.pandas_tools import write_pandas
 
         db, schema, _ = parse_db_schema(dest_dsn)
-        cnx = sf_connect(connection_params or {})
-        try:
-            self._ensure_tables(cnx, db, schema)
+        pool = get_pool(connection_params or {})
+        with pool.connection() as cnx:
+            self._ensure_tables_once(pool, cnx, db, schema)
 
             for name, df in [
                 (self.RUNS, runs_df),
@@ -110,8 +117,6 @@ class RunSnowflakeIO:
                         auto_create_table=False,
                         quote_identifiers=True,
                     )
-        finally:
-            cnx.close()
 
     def read(
         self,
@@ -121,9 +126,9 @@ class RunSnowflakeIO:
         **kwargs,
     ) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
         db, schema, _ = parse_db_schema(source_dsn)
-        cnx = sf_connect(connection_params or {})
-        try:
-            self._ensure_tables(cnx, db, schema)
+        pool = get_pool(connection_params or {})
+        with pool.connection() as cnx:
+            self._ensure_tables_once(pool, cnx, db, schema)
 
             runs = pd.read_sql(f'SELECT * FROM "{db}"."{schema}"."{self.RUNS}"', cnx)
             pols = pd.read_sql(
@@ -132,6 +137,4 @@ class RunSnowflakeIO:
             strs = pd.read_sql(
                 f'SELECT * FROM "{db}"."{schema}"."{self.STRUCTURES}"', cnx
             )
-            return runs, pols, strs
-        finally:
-            cnx.close()
\ No newline at end of file
+            return runs, pols, strs
\ No newline at end of file
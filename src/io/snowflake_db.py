@@ -1,7 +1,9 @@
 # src/io/snowflake_db.py
 from __future__ import annotations
+import threading
+from contextlib import contextmanager
 from urllib.parse import urlparse, parse_qsl
-from typing import Dict, Any, Tuple
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Set, Tuple
 import pandas as pd
 import snowflake.connector
 
@@ -53,6 +55,113 @@ def connect(params: Dict[str, Any]):
     return snowflake.connector.connect(**(params or {}))
 
 
+class ConnectionPool:
+    """
+    Connexions Snowflake réutilisables pour un jeu de paramètres.
+    Thread-safe : une connexion n'est prêtée qu'à un appelant à la fois ;
+    au plus `max_idle` connexions inactives sont conservées.
+    Garde aussi l'état "DDL déjà assurée" (ensure_once) pour ces paramètres.
+    """
+
+    def __init__(
+        self,
+        params: Dict[str, Any],
+        *,
+        max_idle: int = 4,
+        factory: Optional[Callable[[], Any]] = None,
+    ):
+        self.params = dict(params or {})
+        self.max_idle = max_idle
+        self._factory = factory or (lambda: connect(self.params))
+        self._idle: List[Any] = []
+        self._lock = threading.Lock()
+        self._ensure_lock = threading.Lock()
+        self._ensured: Set[Hashable] = set()
+        self.created = 0
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        cnx = self.acquire()
+        try:
+            yield cnx
+        finally:
+            self.release(cnx)
+
+    def ensure_once(self, key: Hashable, func: Callable[[], None]) -> None:
+        """Exécute func() une seule fois par clé pour ce pool (ex: CREATE ... IF NOT EXISTS)."""
+        if key in self._ensured:
+            return
+        with self._ensure_lock:
+            if key not in self._ensured:
+                func()
+                self._ensured.add(key)
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._ensured.clear()
+        for cnx in idle:
+            cnx.close()
+
+    def acquire(self):
+        """Emprunte une connexion (à rendre avec release, ou utiliser connection())."""
+        with self._lock:
+            while self._idle:
+                cnx = self._idle.pop()
+                if not _is_closed(cnx):
+                    return cnx
+            self.created += 1
+        return self._factory()
+
+    def release(self, cnx) -> None:
+        if _is_closed(cnx):
+            return
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(cnx)
+                return
+        cnx.close()
+
+
+def _is_closed(cnx) -> bool:
+    is_closed = getattr(cnx, "is_closed", None)
+    return bool(is_closed()) if callable(is_closed) else False
+
+
+_POOLS: Dict[Tuple, ConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def _pool_key(params: Dict[str, Any]) -> Tuple:
+    return tuple(sorted((k, repr(v)) for k, v in (params or {}).items()))
+
+
+def get_pool(params: Dict[str, Any]) -> ConnectionPool:
+    """Pool partagé du processus pour ces paramètres de connexion."""
+    key = _pool_key(params)
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = _POOLS[key] = ConnectionPool(params)
+        return pool
+
+
+@contextmanager
+def pooled_connection(params: Dict[str, Any]) -> Iterator[Any]:
+    """Connexion empruntée au pool partagé (rendue au pool en sortie de bloc)."""
+    with get_pool(params).connection() as cnx:
+        yield cnx
+
+
+def close_pools() -> None:
+    """Ferme toutes les connexions inactives des pools partagés."""
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.close()
+
+
 # ── Normalisation des cellules avant INSERT ──────────────────────────────────
 def _clean_cell(v):
     if v is None:
@@ -1,14 +1,17 @@
 # src/managers/bordereau_manager.py
 from __future__ import annotations
-from typing import Literal, Optional, Dict, Any
+from typing import Literal, Optional, Dict, Any, Iterator
 import pandas as pd
 from src.serialization.bordereau_serializer import BordereauSerializer
 from src.domain.bordereau import Bordereau
 from src.domain.program import Program
 from src.io.bordereau_csv_adapter import CsvBordereauIO
+from src.io.bordereau_parquet_adapter import ParquetBordereauIO, program_columns
 from src.io.bordereau_snowflake_adapter import SnowflakeBordereauIO
 
-Backend = Literal["csv", "snowflake"]  # AURE : maerge enle rogrm et le bordereau
+Backend = Literal[
+    "csv", "parquet", "snowflake"
+]  # AURE : maerge enle rogrm et le bordereau
 
 
 class BordereauManager:
@@ -26,11 +29,16 @@ class BordereauManager:
 
     @staticmethod
     def detect_backend(source: str) -> Backend:
-        return "snowflake" if source.lower().startswith("snowflake://") else "csv"
+        source = source.lower()
+        if source.startswith("snowflake://"):
+            return "snowflake"
+        return "parquet" if source.rstrip("/").endswith(".parquet") else "csv"
 
     def _make_io(self, backend: Backend):
         if backend == "csv":
             return CsvBordereauIO()
+        elif backend == "parquet":
+            return ParquetBordereauIO()
         elif backend == "snowflake":
             return SnowflakeBordereauIO()
         raise ValueError(f"Unknown backend: {backend}")
@@ -42,11 +50,20 @@ class BordereauManager:
         program: Optional[Program] = None,
         uw_dept: Optional[str] = None,
         validate: bool = True,
+        calculation_date: Optional[str] = None,
         io_kwargs: Optional[Dict[str, Any]] = None,
     ) -> Bordereau:
-        io_kwargs = io_kwargs or {}
-        df: pd.DataFrame = self.io.read(source, **io_kwargs)
+        """
+        calculation_date (backends parquet/snowflake) : les polices expirées à
+        cette date ne sont pas lues quand le backend sait filtrer EXPIRE_DT (cf
+        active_filter ; sinon le moteur les marque inactive) ; avec `program`,
+        seules ses colonnes sont lues.
+        """
         uw = uw_dept or (program.underwriting_department if program else None)
+        io_kwargs = self._pushdown_kwargs(
+            source, program, uw, calculation_date, io_kwargs
+        )
+        df: pd.DataFrame = self.io.read(source, **io_kwargs)
         b = self.serializer.dataframe_to_bordereau(
             df, uw_dept=uw, source=source, program=program, validate=validate
         )
@@ -54,6 +71,76 @@ class BordereauManager:
         self._source = source
         return b
 
+    def iter_batches(
+        self,
+        source: str,
+        *,
+        batch_size: int,
+        program: Optional[Program] = None,
+        uw_dept: Optional[str] = None,
+        validate: bool = True,
+        calculation_date: Optional[str] = None,
+        io_kwargs: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[Bordereau]:
+        """
+        Charge le bordereau par lots de `batch_size` lignes (mémoire bornée par le lot).
+        Les colonnes étant communes à tous les lots, la validation du schéma
+        est faite sur le premier lot.
+        """
+        if batch_size < 1:
+            raise ValueError(
+                f"batch_size must be a positive integer, got {batch_size!r}"
+            )
+        if not hasattr(self.io, "iter_read"):
+            raise NotImplementedError(
+                f"Streaming is not supported by the '{self.backend}' bordereau backend"
+            )
+        uw = uw_dept or (program.underwriting_department if program else None)
+        io_kwargs = self._pushdown_kwargs(
+            source, program, uw, calculation_date, io_kwargs
+        )
+        for i, df in enumerate(self.io.iter_read(source, batch_size, **io_kwargs)):
+            yield self.serializer.dataframe_to_bordereau(
+                df,
+                uw_dept=uw,
+                source=source,
+                program=program,
+                validate=validate and i == 0,
+            )
+        self._source = source
+
+    def _pushdown_kwargs(
+        self,
+        source: str,
+        program: Optional[Program],
+        uw_dept: Optional[str],
+        calculation_date: Optional[str],
+        io_kwargs: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """
+        Projection / filtre poussés au backend parquet ou snowflake (io_kwargs
+        explicites prioritaires).
+        """
+        io_kwargs = dict(io_kwargs or {})
+        if self.backend not in ("parquet", "snowflake"):
+            return io_kwargs
+        relation_kwargs = (
+            {
+                "sql": io_kwargs.get("sql"),
+                "connection_params": io_kwargs.get("connection_params"),
+            }
+            if self.backend == "snowflake"
+            else {}
+        )
+        if program is not None and "columns" not in io_kwargs:
+            available = self.io.columns(source, **relation_kwargs)
+            io_kwargs["columns"] = program_columns(available, program, uw_dept)
+        if calculation_date is not None and "filters" not in io_kwargs:
+            io_kwargs["filters"] = self.io.active_filter(
+                source, calculation_date, **relation_kwargs
+            )
+        return io_kwargs
+
     def save(
         self,
         bordereau: Bordereau,
@@ -0,0 +1,141 @@
+# src/managers/program_cache.py
+from __future__ import annotations
+import json
+import os
+import pickle
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+from src.domain.program import Program
+from src.engine.program_plan import ProgramPlan, compile_program
+
+# À incrémenter si le format picklé (Program / ProgramPlan) change
+CACHE_FORMAT = 1
+
+
+@dataclass
+class CachedProgram:
+    program_id: int
+    fingerprint: str
+    version: str
+    program: Program
+    plan: ProgramPlan
+
+
+class ProgramCache:
+    """
+    Cache disque des programmes compilés (Program + ProgramPlan picklés).
+
+    Une entrée par (program_id, empreinte du programme) :
+        <dir>/<program_id>-<fingerprint>-v<CACHE_FORMAT>.pkl
+    index.json associe program_id -> {fingerprint, version} où `version` est le
+    jeton de fraîcheur opaque renvoyé par l'adapter (read_version : une seule
+    requête légère). Une entrée n'est servie que si ce jeton est inchangé.
+    Éviction LRU au-delà de max_entries (date d'accès = mtime du fichier).
+    """
+
+    INDEX = "index.json"
+
+    def __init__(self, directory: str, *, max_entries: int = 32):
+        if not isinstance(max_entries, int) or max_entries < 1:
+            raise ValueError(
+                f"max_entries must be a positive integer, got {max_entries!r}"
+            )
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, program_id: int, version: Optional[str]) -> Optional[CachedProgram]:
+        """Entrée du programme si son jeton de fraîcheur vaut `version`, sinon None."""
+        with self._lock:
+            entry = self._read_index().get(str(program_id))
+            path = (
+                self._path(program_id, entry["fingerprint"])
+                if entry and version is not None and entry["version"] == version
+                else None
+            )
+            if path is None or not path.exists():
+                self.misses += 1
+                return None
+            try:
+                with open(path, "rb") as f:
+                    cached = pickle.load(f)
+            except Exception:
+                # Entrée illisible (écriture interrompue, format obsolète) : ignorée
+                path.unlink(missing_ok=True)
+                self.misses += 1
+                return None
+            os.utime(path)  # LRU : marque l'entrée comme récemment utilisée
+            self.hits += 1
+            return cached
+
+    def put(
+        self, program_id: int, program: Program, version: Optional[str]
+    ) -> CachedProgram:
+        """Compile et stocke le programme ; retourne l'entrée (non persistée si version=None)."""
+        cached = CachedProgram(
+            program_id=int(program_id),
+            fingerprint=program.fingerprint(),
+            version=version,
+            program=program,
+            plan=compile_program(program),
+        )
+        if version is None:
+            return cached  # fraîcheur invérifiable : rien à mettre en cache
+
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self._path(program_id, cached.fingerprint)
+            tmp = path.with_suffix(".tmp")
+            with open(tmp, "wb") as f:
+                pickle.dump(cached, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+
+            index = self._read_index()
+            previous = index.get(str(program_id))
+            if previous and previous["fingerprint"] != cached.fingerprint:
+                self._path(program_id, previous["fingerprint"]).unlink(missing_ok=True)
+            index[str(program_id)] = {
+                "fingerprint": cached.fingerprint,
+                "version": version,
+            }
+            self._evict(index)
+            self._write_index(index)
+        return cached
+
+    def clear(self) -> None:
+        with self._lock:
+            for path in self.directory.glob("*.pkl"):
+                path.unlink()
+            (self.directory / self.INDEX).unlink(missing_ok=True)
+
+    # ─── Helpers ──────────────────────────────────────────────────────────
+    def _path(self, program_id: int, fingerprint: str) -> Path:
+        return self.directory / f"{int(program_id)}-{fingerprint}-v{CACHE_FORMAT}.pkl"
+
+    def _read_index(self) -> Dict[str, Dict[str, str]]:
+        try:
+            return json.loads((self.directory / self.INDEX).read_text())
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write_index(self, index: Dict[str, Dict[str, str]]) -> None:
+        tmp = self.directory / (self.INDEX + ".tmp")
+        tmp.write_text(json.dumps(index, indent=2, sort_keys=True))
+        os.replace(tmp, self.directory / self.INDEX)
+
+    def _evict(self, index: Dict[str, Dict[str, str]]) -> None:
+        """Supprime les entrées les moins récemment utilisées au-delà de max_entries."""
+        entries = []
+        for program_id, entry in index.items():
+            path = self._path(int(program_id), entry["fingerprint"])
+            mtime = path.stat().st_mtime_ns if path.exists() else -1
+            entries.append((mtime, program_id, path))
+        entries.sort(reverse=True)
+        for _, program_id, path in entries[self.max_entries :]:
+            path.unlink(missing_ok=True)
+            del index[program_id]
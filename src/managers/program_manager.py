@@ -1,17 +1,25 @@
 # src/managers/program_manager.py
 import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import pandas as pd
-from typing import Literal, Optional
+from typing import Dict, Literal, Optional, Sequence
 from src.io.program_snowflake_adapter import SnowflakeProgramIO
 from src.serialization.program_serializer import ProgramSerializer
 from src.domain.program import Program
+from src.engine.program_plan import ProgramPlan
 from src.io.snowflake_db import parse_db_schema  # ⬅️ nouveau import
+from .program_cache import ProgramCache
 
 # Backends supportés par ProgramManager
 Backend = Literal["snowflake"]
 
 
+def _deserialize_program(frames) -> Program:
+    """Fonction de module (picklable) pour la désérialisation en parallèle."""
+    return ProgramSerializer().dataframes_to_program(*frames)
+
+
 class ProgramManager:
     """
     Unified Program Manager that handles import/export for Snowflake backend.
@@ -51,6 +59,7 @@ class ProgramManager:
         self.serializer = ProgramSerializer()
         self.io = self._make_io(backend)
         self._loaded_program: Optional[Program] = None
+        self._loaded_plan: Optional[ProgramPlan] = None
         self._loaded_source: Optional[str] = None
 
     def _make_io(self, backend: Backend):
@@ -60,13 +69,21 @@ class ProgramManager:
         else:
             raise ValueError(f"Unknown backend: {backend}")
 
-    def load(self, source: str, io_kwargs: Optional[dict] = None) -> Program:
+    def load(
+        self,
+        source: str,
+        io_kwargs: Optional[dict] = None,
+        cache: Optional[ProgramCache] = None,
+    ) -> Program:
         """
         Load a program from the specified source.
 
         Args:
             source: Source path/identifier for the program data
             io_kwargs: Additional parameters for the I/O adapter (e.g., connection_params for Snowflake)
+            cache: Optional on-disk cache of compiled programs. When the program's
+                freshness token (one light query) is unchanged, the cached program
+                and its compiled plan are returned without reading the tables.
 
         Returns:
             The loaded Program object
@@ -87,15 +104,77 @@ class ProgramManager:
         if program_id:
             # Retirer program_id des paramètres de connexion
             connection_params = {k: v for k, v in connection_params.items() if k != "program_id"}
+
+        version = None
+        if cache is not None and program_id:
+            version = self.io.read_version(source, connection_params, program_id)
+            cached = cache.get(program_id, version)
+            if cached is not None:
+                self._loaded_program, self._loaded_plan = cached.program, cached.plan
+                self._loaded_source = source
+                return self._loaded_program
+
         program_df, structures_df, conditions_df, exclusions_df, field_links_df = self.io.read(
             source, connection_params=connection_params, program_id=program_id
         )
         self._loaded_program = self.serializer.dataframes_to_program(
             program_df, structures_df, conditions_df, exclusions_df, field_links_df
         )
+        self._loaded_plan = (
+            cache.put(program_id, self._loaded_program, version).plan
+            if cache is not None and program_id
+            else None
+        )
         self._loaded_source = source
         return self._loaded_program
 
+    def get_loaded_plan(self) -> Optional[ProgramPlan]:
+        """Compiled plan of the last loaded program (only when loaded through a cache)."""
+        return self._loaded_plan
+
+    def load_many(
+        self,
+        source: str,
+        program_ids: Sequence[int],
+        io_kwargs: Optional[dict] = None,
+        *,
+        workers: int = 1,
+    ) -> Dict[int, Program]:
+        """
+        Load several programs at once.
+
+        The adapter issues one set-based query per table for all ids, the
+        frames are split in memory and the programs are deserialized
+        (on `workers` processes when workers > 1).
+
+        Args:
+            source: Snowflake DSN (snowflake://DB.SCHEMA), program_id ignored
+            program_ids: IDs of the programs to load
+            io_kwargs: Connection parameters for the I/O adapter
+            workers: Number of processes used for deserialization
+
+        Returns:
+            {program_id: Program}, in the order of program_ids
+        """
+        if not isinstance(workers, int) or workers < 1:
+            raise ValueError(f"workers must be a positive integer, got {workers!r}")
+        connection_params = {
+            k: v for k, v in (io_kwargs or {}).items() if k != "program_id"
+        }
+        frames_by_id = self.io.read_many(
+            source, connection_params=connection_params, program_ids=program_ids
+        )
+        ids = list(frames_by_id)
+        if workers == 1 or len(ids) <= 1:
+            programs = [_deserialize_program(frames_by_id[i]) for i in ids]
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(ids))) as pool:
+                # map conserve l'ordre de soumission
+                programs = list(
+                    pool.map(_deserialize_program, [frames_by_id[i] for i in ids])
+                )
+        return dict(zip(ids, programs))
+
     def save(
         self, program: Program, dest: str, io_kwargs: Optional[dict] = None
     ) -> None:
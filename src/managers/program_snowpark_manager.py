@@ -10,9 +10,11 @@ from typing import Optional
 from snowflake.snowpark import Session
 
 from .program_manager import ProgramManager
+from .program_cache import ProgramCache
 from src.io.program_snowpark_adapter import SnowparkProgramIO
 from src.serialization.program_serializer import ProgramSerializer
 from src.domain.program import Program
+from src.engine.program_plan import ProgramPlan
 
 
 class SnowparkProgramManager:
@@ -34,14 +36,18 @@ class SnowparkProgramManager:
         self.serializer = ProgramSerializer()
         self.io = SnowparkProgramIO(session)
         self._loaded_program: Optional[Program] = None
+        self._loaded_plan: Optional[ProgramPlan] = None
         self._loaded_program_id: Optional[int] = None
 
-    def load(self, program_id: int) -> Program:
+    def load(self, program_id: int, cache: Optional[ProgramCache] = None) -> Program:
         """
         Charge un programme depuis Snowflake en utilisant Snowpark.
         
         Args:
             program_id: ID du programme à charger
+            cache: Cache disque optionnel des programmes compilés ; si le jeton
+                de fraîcheur (une requête légère) est inchangé, le programme et
+                son plan compilé sont servis sans relire les tables
             
         Returns:
             Objet Program chargé en mémoire
@@ -50,6 +56,15 @@ class SnowparkProgramManager:
             RuntimeError: Si le chargement échoue
         """
         try:
+            version = None
+            if cache is not None:
+                version = self.io.read_version(program_id)
+                cached = cache.get(program_id, version)
+                if cached is not None:
+                    self._loaded_program, self._loaded_plan = cached.program, cached.plan
+                    self._loaded_program_id = program_id
+                    return cached.program
+
             # Lire les DataFrames depuis Snowflake via Snowpark
             program_df, structures_df, conditions_df, exclusions_df, field_links_df = self.io.read(program_id)
             
@@ -60,6 +75,9 @@ class SnowparkProgramManager:
             
             # Sauvegarder l'état
             self._loaded_program = program
+            self._loaded_plan = (
+                cache.put(program_id, program, version).plan if cache is not None else None
+            )
             self._loaded_program_id = program_id
             
             return program
@@ -128,6 +146,15 @@ class SnowparkProgramManager:
         """
         return self._loaded_program
 
+    def get_loaded_plan(self) -> Optional[ProgramPlan]:
+        """
+        Retourne le plan compilé du programme chargé (chargement via un cache).
+        
+        Returns:
+            ProgramPlan ou None
+        """
+        return self._loaded_plan
+
     def get_loaded_program_id(self) -> Optional[int]:
         """
         Retourne l'ID du programme actuellement chargé.
@@ -1,24 +1,29 @@
 # src/managers/run_manager.py
 from __future__ import annotations
-from typing import Literal, Optional, Dict, Any
+from typing import Literal, Optional, Dict, Any, Iterable, Tuple
 import pandas as pd
 from src.serialization.run_serializer import RunSerializer, RunMeta
 from src.io.run_csv_adapter import RunCsvIO
+from src.io.run_parquet_adapter import RunParquetIO
 from src.io.run_snowflake_adapter import RunSnowflakeIO
 
-Backend = Literal["csv", "snowflake"]
+Backend = Literal["csv", "parquet", "snowflake"]
 
 
 class RunManager:
     """
     Manager pour persister les résultats de run:
       - backend 'csv' (implémenté)
+      - backend 'parquet' (datasets partitionnés, pyarrow)
       - backend 'snowflake' (stub)
     """
 
     @staticmethod
     def detect_backend(dest: str) -> Backend:
-        return "snowflake" if dest.lower().startswith("snowflake://") else "csv"
+        dest = dest.lower()
+        if dest.startswith("snowflake://"):
+            return "snowflake"
+        return "parquet" if dest.rstrip("/").endswith(".parquet") else "csv"
 
     def __init__(self, backend: Backend = "csv"):
         self.backend = backend
@@ -28,6 +33,8 @@ class RunManager:
     def _make_io(self, backend: Backend):
         if backend == "csv":
             return RunCsvIO()
+        elif backend == "parquet":
+            return RunParquetIO()
         elif backend == "snowflake":
             return RunSnowflakeIO()
         raise ValueError(f"Unknown run backend: {backend}")
@@ -39,12 +46,15 @@ class RunManager:
         dest: str,
         *,
         source_policy_df: Optional[pd.DataFrame] = None,
+        include_json: bool = False,
         io_kwargs: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, pd.DataFrame]:
         io_kwargs = io_kwargs or {}
-        dfs = self.serializer.build_dataframes(run_meta, results_df, source_policy_df)
+        dfs = self.serializer.build_dataframes(
+            run_meta, results_df, source_policy_df, include_json=include_json
+        )
 
-        if self.backend == "csv":
+        if self.backend in ("csv", "parquet"):
             self.io.write(
                 dest, dfs["runs"], dfs["run_policies"], dfs["run_policy_structures"]
             )
@@ -58,3 +68,55 @@ class RunManager:
             )
 
         return dfs
+
+    def save_stream(
+        self,
+        run_meta: RunMeta,
+        batches: Iterable[Tuple[pd.DataFrame, Optional[pd.DataFrame]]],
+        dest: str,
+        *,
+        include_json: bool = False,
+        io_kwargs: Optional[Dict[str, Any]] = None,
+    ) -> int:
+        """
+        Persiste un run produit par lots : chaque (results_df, source_policy_df)
+        est écrit avant de consommer le suivant, la ligne `runs` en dernier.
+        Retourne le nombre de polices écrites.
+        """
+        io_kwargs = io_kwargs or {}
+        row_count = 0
+        for i, (results_df, source_policy_df) in enumerate(batches):
+            # Numérotation continue : mêmes identifiants qu'un run en mémoire
+            dfs = self.serializer.build_dataframes(
+                run_meta,
+                results_df,
+                source_policy_df,
+                include_json=include_json,
+                first_ordinal=row_count,
+            )
+            row_count += len(results_df)
+            if self.backend in ("csv", "parquet"):
+                self.io.write_batch(
+                    dest,
+                    dfs["run_policies"],
+                    dfs["run_policy_structures"],
+                    append=i > 0,
+                )
+            else:
+                # Tables globales : write ajoute les lignes (les DataFrames vides sont ignorés)
+                self.io.write(
+                    dest,
+                    pd.DataFrame(),
+                    dfs["run_policies"],
+                    dfs["run_policy_structures"],
+                    **io_kwargs,
+                )
+
+        runs_df = self.serializer.build_runs_dataframe(run_meta, row_count)
+        if self.backend in ("csv", "parquet"):
+            if row_count == 0:
+                self.io.write_batch(dest, pd.DataFrame(), pd.DataFrame(), append=False)
+            self.io.write_runs(dest, runs_df)
+        else:
+            self.io.write(dest, runs_df, pd.DataFrame(), pd.DataFrame(), **io_kwargs)
+        return row_count
@@ -1,14 +1,58 @@
 # src/serialization/run_serializer.py
 from __future__ import annotations
 from dataclasses import dataclass
+from itertools import chain
 from typing import Dict, Any, List, Optional
-import uuid
 import json
+import numpy as np
 import pandas as pd
 
-
-def _uuid() -> str:
-    return uuid.uuid4().hex
+# run_policies : colonne cible → clé de ProgramRunResult.to_dict()
+POLICY_COLUMNS: Dict[str, str] = {
+    "INSURED_NAME": "INSURED_NAME",
+    "INCEPTION_DT": "policy_inception_date",
+    "EXPIRE_DT": "policy_expiry_date",
+    "exclusion_status": "exclusion_status",
+    "exclusion_reason": "exclusion_reason",
+    "exposure": "exposure",
+    "effective_exposure": "effective_exposure",
+    "cession_to_layer_100pct": "cession_to_layer_100pct",
+    "cession_to_reinsurer": "cession_to_reinsurer",
+    "retained_by_cedant": "retained_by_cedant",
+}
+
+# run_policy_structures : clés de ProgramRunResult.to_rows() reprises telles quelles
+STRUCTURE_COLUMNS: List[str] = [
+    "structure_name",
+    "type_of_participation",
+    "predecessor_title",
+    "claim_basis",
+    "period_start",
+    "period_end",
+    "applied",
+    "reason",
+    "scope",
+    "input_exposure",
+    "ceded_to_layer_100pct",
+    "ceded_to_reinsurer",
+    "retained_after",
+]
+
+# `terms_as_dict` est déjà aplati dans chaque ligne (via results.to_rows())
+TERMS_COLUMNS: List[str] = [
+    "qshare_cession_pct",
+    "qshare_limit",
+    "xol_attachment",
+    "xol_limit",
+    "signed_share",
+]
+
+STRUCTURE_JSON_COLUMNS: Dict[str, str] = {
+    "matched_condition_json": "matched_condition",
+    "rescaling_json": "rescaling",
+    "matching_details_json": "matching_details",
+    "metrics_json": "metrics",
+}
 
 
 def _json_or_none(obj: Any) -> Optional[str]:
@@ -62,14 +106,9 @@ class RunSerializer:
     `results_df` doit contenir, par ligne: ProgramRunResult.to_dict()
     """
 
-    def build_dataframes(
-        self,
-        run_meta: RunMeta,
-        results_df: pd.DataFrame,
-        source_policy_df: Optional[pd.DataFrame] = None,
-    ) -> Dict[str, pd.DataFrame]:
-        # ---- Table runs (1 ligne) ----
-        runs_df = pd.DataFrame(
+    def build_runs_dataframe(self, run_meta: RunMeta, row_count: int) -> pd.DataFrame:
+        """Table runs (1 ligne)."""
+        return pd.DataFrame(
             [
                 {
                     "run_id": run_meta.run_id,
@@ -81,104 +120,124 @@ class RunSerializer:
                     "program_fingerprint": run_meta.program_fingerprint,
                     "started_at": run_meta.started_at,
                     "ended_at": run_meta.ended_at,
-                    "row_count": int(len(results_df) if results_df is not None else 0),
+                    "row_count": int(row_count),
                     "notes": run_meta.notes,
                 }
             ]
         )
 
-        # ---- Table run_policies & run_policy_structures ----
-        pol_rows: List[Dict[str, Any]] = []
-        stru_rows: List[Dict[str, Any]] = []
+    def build_dataframes(
+        self,
+        run_meta: RunMeta,
+        results_df: pd.DataFrame,
+        source_policy_df: Optional[pd.DataFrame] = None,
+        *,
+        include_json: bool = False,
+        first_ordinal: int = 0,
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Tables construites colonne par colonne (pas d'iterrows).
+        Identifiants déterministes : "<run_id>-<ordinal police>" et
+        "<policy_run_id>-<position structure>" ; first_ordinal décale la
+        numérotation (lots successifs d'un même run).
+        Les colonnes *_json sont toujours présentes, renseignées seulement
+        si include_json=True.
+        """
+        if results_df is None:
+            results_df = pd.DataFrame()
+        n = len(results_df)
+
+        # ---- Table runs (1 ligne) ----
+        runs_df = self.build_runs_dataframe(run_meta, n)
 
-        # Pour remonter un éventuel policy_id depuis le bordereau source
-        policy_ids_series = (
-            source_policy_df["policy_id"]
-            if (
-                source_policy_df is not None and "policy_id" in source_policy_df.columns
-            )
-            else None
+        # ---- Table run_policies ----
+        policy_run_ids = _ordinal_ids(
+            run_meta.run_id, np.arange(first_ordinal, first_ordinal + n)
         )
 
-        for idx, result in results_df.iterrows():
-            r = dict(result)  # to_dict()
-            policy_run_id = _uuid()
+        # Position (et non index) : les lots streamés gardent l'index global du fichier
+        policy_ids = (
+            source_policy_df["policy_id"].to_numpy()[:n]
+            if source_policy_df is not None and "policy_id" in source_policy_df.columns
+            else np.full(n, None, dtype=object)
+        )
 
-            # Champs top-level (cf ProgramRunResult.to_dict())
-            pol_rows.append(
-                {
-                    "policy_run_id": policy_run_id,
-                    "run_id": run_meta.run_id,
-                    "policy_id": (
-                        None
-                        if policy_ids_series is None
-                        else policy_ids_series.iloc[idx]
-                    ),
-                    "INSURED_NAME": r.get("INSURED_NAME"),
-                    "INCEPTION_DT": r.get("policy_inception_date"),
-                    "EXPIRE_DT": r.get("policy_expiry_date"),
-                    "exclusion_status": r.get("exclusion_status"),
-                    "exclusion_reason": r.get("exclusion_reason"),
-                    "exposure": r.get("exposure"),
-                    "effective_exposure": r.get("effective_exposure"),
-                    "cession_to_layer_100pct": r.get("cession_to_layer_100pct"),
-                    "cession_to_reinsurer": r.get("cession_to_reinsurer"),
-                    "retained_by_cedant": r.get("retained_by_cedant"),
-                    "raw_result_json": _json_or_none(r),
-                }
-            )
+        run_policies_df = pd.DataFrame(
+            {
+                "policy_run_id": policy_run_ids,
+                "run_id": run_meta.run_id,
+                "policy_id": policy_ids,
+                **{
+                    target: _column(results_df, source, n)
+                    for target, source in POLICY_COLUMNS.items()
+                },
+                "raw_result_json": (
+                    [_json_or_none(r) for r in results_df.to_dict("records")]
+                    if include_json
+                    else None
+                ),
+            }
+        )
 
-            # Structures à plat
-            structures_detail = r.get("structures_detail") or []
-            for sd in structures_detail:
-                stru_rows.append(
-                    {
-                        "structure_row_id": _uuid(),
-                        "policy_run_id": policy_run_id,
-                        "structure_name": sd.get("structure_name"),
-                        "type_of_participation": sd.get("type_of_participation"),
-                        "predecessor_title": sd.get("predecessor_title") or None,
-                        "claim_basis": sd.get("claim_basis"),
-                        "period_start": sd.get("period_start"),
-                        "period_end": sd.get("period_end"),
-                        "applied": bool(sd.get("applied")),
-                        "reason": sd.get("reason") or None,
-                        "scope": sd.get("scope"),
-                        "input_exposure": sd.get("input_exposure"),
-                        "ceded_to_layer_100pct": sd.get("ceded_to_layer_100pct"),
-                        "ceded_to_reinsurer": sd.get("ceded_to_reinsurer"),
-                        "retained_after": sd.get("retained_after"),
-                        "terms_json": _json_or_none(
-                            {
-                                # `terms_as_dict` est déjà aplati dans sd (via results.to_rows())
-                                k: v
-                                for k, v in sd.items()
-                                if k
-                                in {
-                                    "qshare_cession_pct",
-                                    "qshare_limit",
-                                    "xol_attachment",
-                                    "xol_limit",
-                                    "signed_share",
-                                }
-                            }
-                        ),
-                        "matched_condition_json": _json_or_none(
-                            sd.get("matched_condition")
-                        ),
-                        "rescaling_json": _json_or_none(sd.get("rescaling")),
-                        "matching_details_json": _json_or_none(
-                            sd.get("matching_details")
-                        ),
-                        "metrics_json": _json_or_none(sd.get("metrics")),
-                    }
-                )
-
-        run_policies_df = pd.DataFrame(pol_rows)
-        run_policy_structures_df = pd.DataFrame(stru_rows)
+        # ---- Table run_policy_structures (structures à plat) ----
+        details = (
+            results_df["structures_detail"].tolist()
+            if "structures_detail" in results_df.columns
+            else [None] * n
+        )
+        counts = np.fromiter((len(d or []) for d in details), dtype=np.int64, count=n)
+        flat: List[Dict[str, Any]] = list(chain.from_iterable(d or [] for d in details))
+        if not flat:
+            return {
+                "runs": runs_df,
+                "run_policies": run_policies_df,
+                "run_policy_structures": pd.DataFrame(),
+            }
+
+        owner = np.repeat(policy_run_ids, counts)
+        position_in_policy = np.arange(len(flat)) - np.repeat(
+            np.cumsum(counts) - counts, counts
+        )
+        structures: Dict[str, Any] = {
+            "structure_row_id": _ordinal_ids(owner, position_in_policy),
+            "policy_run_id": owner,
+        }
+        for col in STRUCTURE_COLUMNS:
+            structures[col] = [sd.get(col) for sd in flat]
+        # Chaînes vides → None
+        structures["predecessor_title"] = [
+            v or None for v in structures["predecessor_title"]
+        ]
+        structures["reason"] = [v or None for v in structures["reason"]]
+        structures["applied"] = [bool(v) for v in structures["applied"]]
+        structures["terms_json"] = (
+            [
+                _json_or_none({k: v for k, v in sd.items() if k in TERMS_COLUMNS})
+                for sd in flat
+            ]
+            if include_json
+            else None
+        )
+        for col, source in STRUCTURE_JSON_COLUMNS.items():
+            structures[col] = (
+                [_json_or_none(sd.get(source)) for sd in flat] if include_json else None
+            )
 
         return {
             "runs": runs_df,
             "run_policies": run_policies_df,
-            "run_policy_structures": run_policy_structures_df,
+            "run_policy_structures": pd.DataFrame(structures),
         }
+
+
+def _ordinal_ids(prefix, ordinals: np.ndarray) -> np.ndarray:
+    """Identifiants "<prefix>-<ordinal>" (prefix scalaire ou tableau)."""
+    prefixes = pd.Series(prefix, index=range(len(ordinals)), dtype=object)
+    return (prefixes + "-" + pd.Series(ordinals).astype(str)).to_numpy(dtype=object)
+
+
+def _column(df: pd.DataFrame, col: str, n: int) -> np.ndarray:
+    """Colonne de df (None si absente, comme dict.get())."""
+    if col not in df.columns:
+        return np.full(n, None, dtype=object)
+    return df[col].to_numpy()
@@ -6,6 +6,13 @@ import pandas as pd
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+from src.builders import build_quota_share, build_excess_of_loss, build_program
+from src.domain import ExclusionRule
+from src.domain.bordereau import Bordereau
+
+# Dimensions des programmes d'exemple du moteur (casualty, aviation)
+ENGINE_DIMENSIONS = ["REGION", "CURRENCY", "PRODUCT_TYPE_LEVEL_1"]
+
 
 @pytest.fixture
 def sample_bordereau_path():
@@ -27,3 +34,209 @@ def sample_valid_bordereau_data():
             "EXPIRE_DT": ["2024-12-31", "2025-01-31", "2025-02-28"],
         }
     )
+
+
+# ─── Programmes et bordereaux d'exemple du moteur ───────────────────────────
+def _casualty_structures():
+    """QS (conditions REGION / CURRENCY) + XOL chaînés RA et LO + XOL hors période."""
+    qs = build_quota_share(
+        name="QS_1",
+        cession_pct=0.30,
+        signed_share=0.5,
+        claim_basis="risk_attaching",
+        inception_date="2024-01-01",
+        expiry_date="2025-01-01",
+        special_conditions=[
+            {"REGION": ["Europe"], "CESSION_PCT": 0.40},
+            {
+                "REGION": ["Europe"],
+                "CURRENCY": ["EUR"],
+                "CESSION_PCT": 0.50,
+                "LIMIT_100": 4_000_000,
+            },
+        ],
+    )
+    xol_1 = build_excess_of_loss(
+        name="XOL_1",
+        attachment=1_000_000,
+        limit=3_000_000,
+        signed_share=0.25,
+        predecessor_title="QS_1",
+        claim_basis="risk_attaching",
+        inception_date="2024-01-01",
+        expiry_date="2025-01-01",
+        special_conditions=[
+            {"CURRENCY": ["USD", "GBP"], "ATTACHMENT_POINT_100": 2_000_000},
+        ],
+    )
+    xol_2 = build_excess_of_loss(
+        name="XOL_2",
+        attachment=4_000_000,
+        limit=10_000_000,
+        signed_share=0.1,
+        predecessor_title="QS_1",
+        claim_basis="loss_occurring",
+        inception_date="2024-01-01",
+        expiry_date="2025-01-01",
+    )
+    xol_old = build_excess_of_loss(
+        name="XOL_OLD",
+        attachment=500_000,
+        limit=1_000_000,
+        signed_share=1.0,
+        claim_basis="risk_attaching",
+        inception_date="2023-01-01",
+        expiry_date="2024-01-01",
+    )
+    return [qs, xol_1, xol_2, xol_old]
+
+
+def _casualty_program():
+    return build_program(
+        name="CASUALTY_VECTORIZED",
+        structures=_casualty_structures(),
+        main_currency="EUR",
+        dimension_columns=ENGINE_DIMENSIONS,
+        underwriting_department="casualty",
+        exclusions=[
+            ExclusionRule(values_by_dimension={"REGION": ["Antarctica"]}, name="POLAR")
+        ],
+    )
+
+
+@pytest.fixture
+def casualty_structures():
+    return _casualty_structures()
+
+
+@pytest.fixture
+def casualty_program():
+    return _casualty_program()
+
+
+@pytest.fixture
+def casualty_program_factory():
+    """Construit un nouveau programme casualty à chaque appel (copies modifiables)."""
+    return _casualty_program
+
+
+@pytest.fixture
+def casualty_bordereau():
+    """8 polices : devise JPY hors programme, région exclue, POL-007 expirée."""
+    df = pd.DataFrame(
+        {
+            "policy_id": [f"POL-{i:03d}" for i in range(8)],
+            "INSURED_NAME": ["a", "b", "c", "d", "e", "f", "g", "h"],
+            "REGION": [
+                "Europe",
+                "Europe",
+                "North America",
+                "Antarctica",
+                None,
+                "Europe",
+                "Asia",
+                "Europe",
+            ],
+            "ORIGINAL_CURRENCY": [
+                "EUR",
+                "USD",
+                "USD",
+                "EUR",
+                "EUR",
+                "JPY",
+                "GBP",
+                "EUR",
+            ],
+            "OCCURRENCE_LIMIT_100_ORIG": [10e6, 8e6, 25e6, 5e6, 3e6, 7e6, 12e6, 9e6],
+            "CEDENT_SHARE": [0.5, 0.75, 0.6, 1.0, 0.4, 0.5, 1.0, 0.8],
+            "INCEPTION_DT": [
+                "2024-01-01",
+                "2024-02-01",
+                "2023-06-01",
+                "2024-03-01",
+                "2024-04-01",
+                "2024-01-01",
+                "2024-05-01",
+                "2023-03-01",
+            ],
+            "EXPIRE_DT": [
+                "2024-12-31",
+                "2025-01-31",
+                "2025-05-31",
+                "2025-02-28",
+                "2025-03-31",
+                "2024-12-31",
+                "2025-04-30",
+                "2024-02-28",
+            ],
+        }
+    )
+    return Bordereau(df, uw_dept="casualty")
+
+
+@pytest.fixture
+def aviation_program():
+    qs = build_quota_share(
+        name="QS_ALL",
+        cession_pct=0.25,
+        signed_share=1.0,
+        claim_basis="risk_attaching",
+        inception_date="2024-01-01",
+        expiry_date="2025-01-01",
+    )
+    xol_hull = build_excess_of_loss(
+        name="XOL_HULL",
+        attachment=5_000_000,
+        limit=10_000_000,
+        signed_share=0.5,
+        predecessor_title="QS_ALL",
+        claim_basis="risk_attaching",
+        inception_date="2024-01-01",
+        expiry_date="2025-01-01",
+        special_conditions=[
+            {"CURRENCY": ["USD"], "INCLUDES_HULL": True, "INCLUDES_LIABILITY": False},
+        ],
+    )
+    xol_liab = build_excess_of_loss(
+        name="XOL_LIAB",
+        attachment=10_000_000,
+        limit=40_000_000,
+        signed_share=0.5,
+        predecessor_title="QS_ALL",
+        claim_basis="risk_attaching",
+        inception_date="2024-01-01",
+        expiry_date="2025-01-01",
+        special_conditions=[
+            {
+                "CURRENCY": ["USD", "EUR"],
+                "INCLUDES_HULL": False,
+                "INCLUDES_LIABILITY": True,
+            },
+        ],
+    )
+    return build_program(
+        name="AVIATION_VECTORIZED",
+        structures=[qs, xol_hull, xol_liab],
+        main_currency="USD",
+        dimension_columns=ENGINE_DIMENSIONS,
+        underwriting_department="aviation",
+    )
+
+
+@pytest.fixture
+def aviation_bordereau():
+    df = pd.DataFrame(
+        {
+            "policy_id": ["AVI-1", "AVI-2", "AVI-3", "AVI-4"],
+            "INSURED_NAME": ["AIR FRANCE", "LUFTHANSA", "EMIRATES", "QANTAS"],
+            "HULL_CURRENCY": ["USD", "EUR", "USD", "AUD"],
+            "LIAB_CURRENCY": ["USD", "EUR", "USD", "AUD"],
+            "HULL_LIMIT": [100e6, 30e6, 0.0, 40e6],
+            "LIAB_LIMIT": [500e6, 400e6, 750e6, 600e6],
+            "HULL_SHARE": [0.15, 0.12, 0.0, 0.1],
+            "LIAB_SHARE": [0.10, 0.08, 0.12, 0.1],
+            "INCEPTION_DT": ["2024-01-01", "2024-02-15", "2024-03-01", "2024-01-15"],
+            "EXPIRE_DT": ["2025-12-31", "2026-02-14", "2026-02-28", "2026-01-14"],
+        }
+    )
+    return Bordereau(df, uw_dept="aviation")
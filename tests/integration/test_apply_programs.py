@@ -0,0 +1,221 @@
+import pandas as pd
+import pytest
+from src.builders import build_quota_share, build_excess_of_loss, build_program
+from src.domain import ExclusionRule
+from src.domain.bordereau import Bordereau
+from src.engine import (
+    apply_program_to_bordereau,
+    apply_program_to_bordereau_simple,
+    apply_programs_to_bordereau,
+)
+from src.engine import vectorized_engine
+
+CALCULATION_DATE = "2024-06-30"
+
+
+def _bordereau():
+    df = pd.DataFrame(
+        {
+            "policy_id": [f"POL-{i:03d}" for i in range(8)],
+            "INSURED_NAME": ["a", "b", "c", "d", "e", "f", "g", "h"],
+            "COUNTRY": [
+                "France",
+                "Spain",
+                "United States",
+                "Germany",
+                "France",
+                "Japan",
+                "United Kingdom",
+                "Italy",
+            ],
+            "REGION": [
+                "Europe",
+                "Europe",
+                "North America",
+                "Europe",
+                None,
+                "Asia",
+                "Europe",
+                "Europe",
+            ],
+            "ORIGINAL_CURRENCY": [
+                "EUR",
+                "EUR",
+                "USD",
+                "EUR",
+                "EUR",
+                "JPY",
+                "GBP",
+                "EUR",
+            ],
+            "OCCURRENCE_LIMIT_100_ORIG": [10e6, 8e6, 25e6, 5e6, 3e6, 7e6, 12e6, 9e6],
+            "CEDENT_SHARE": [0.5, 0.75, 0.6, 1.0, 0.4, 0.5, 1.0, 0.8],
+            "INCEPTION_DT": [
+                "2024-01-01",
+                "2024-02-01",
+                "2023-06-01",
+                "2024-03-01",
+                "2024-04-01",
+                "2024-01-01",
+                "2024-05-01",
+                "2023-03-01",
+            ],
+            "EXPIRE_DT": [
+                "2024-12-31",
+                "2025-01-31",
+                "2025-05-31",
+                "2025-02-28",
+                "2025-03-31",
+                "2024-12-31",
+                "2025-04-30",
+                "2024-02-28",
+            ],
+        }
+    )
+    return Bordereau(df, uw_dept="casualty")
+
+
+def _candidates():
+    """Trois programmes candidats : dimensions, exclusions et structures différentes."""
+
+    def qs(cession_pct, conditions=()):
+        return build_quota_share(
+            name="QS",
+            cession_pct=cession_pct,
+            signed_share=0.5,
+            claim_basis="risk_attaching",
+            inception_date="2024-01-01",
+            expiry_date="2025-01-01",
+            special_conditions=list(conditions),
+        )
+
+    xol = build_excess_of_loss(
+        name="XOL",
+        attachment=1_000_000,
+        limit=3_000_000,
+        signed_share=0.25,
+        predecessor_title="QS",
+        claim_basis="loss_occurring",
+        inception_date="2024-01-01",
+        expiry_date="2025-01-01",
+        special_conditions=[
+            {"CURRENCY": ["USD", "GBP"], "ATTACHMENT_POINT_100": 2_000_000}
+        ],
+    )
+    return [
+        build_program(
+            name="QS_30",
+            structures=[qs(0.30, [{"REGION": ["Europe"], "CESSION_PCT": 0.40}])],
+            main_currency="EUR",
+            dimension_columns=["REGION"],
+            underwriting_department="casualty",
+        ),
+        build_program(
+            name="QS_20_XOL",
+            structures=[qs(0.20), xol],
+            main_currency="EUR",
+            dimension_columns=["REGION", "CURRENCY"],
+            underwriting_department="casualty",
+            exclusions=[
+                ExclusionRule(
+                    values_by_dimension={"COUNTRY": ["Germany"]}, name="GERMANY"
+                )
+            ],
+        ),
+        build_program(
+            name="XOL_ONLY",
+            structures=[
+                build_excess_of_loss(
+                    name="XOL",
+                    attachment=4_000_000,
+                    limit=10_000_000,
+                    signed_share=0.1,
+                    claim_basis="risk_attaching",
+                    inception_date="2024-01-01",
+                    expiry_date="2025-01-01",
+                )
+            ],
+            main_currency="EUR",
+            underwriting_department="casualty",
+        ),
+    ]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_each_program_matches_single_program_run(workers):
+    """
+    Trois programmes sur le même bordereau, en un appel : chaque résultat est
+    celui de apply_program_to_bordereau_simple pour ce programme seul,
+    avec ou sans processus parallèles. Clés = noms des programmes, dans l'ordre.
+    """
+    programs = _candidates()
+    results = apply_programs_to_bordereau(
+        _bordereau(), programs, CALCULATION_DATE, workers=workers
+    )
+
+    assert list(results) == ["QS_30", "QS_20_XOL", "XOL_ONLY"]
+    for program in programs:
+        expected = apply_program_to_bordereau_simple(
+            _bordereau(), program, CALCULATION_DATE, engine="vectorized"
+        )
+        pd.testing.assert_frame_equal(results[program.name], expected)
+        # le moteur ligne donne les mêmes montants
+        row = apply_program_to_bordereau_simple(_bordereau(), program, CALCULATION_DATE)
+        pd.testing.assert_series_equal(
+            results[program.name]["ceded_to_reinsurer"],
+            row["ceded_to_reinsurer"],
+            check_dtype=False,
+        )
+
+
+def test_detailed_results_and_mapping_keys():
+    """Avec simple=False et un mapping {clé: programme} : results_df de apply_program_to_bordereau."""
+    programs = dict(zip(["a", "b", "c"], _candidates()))
+    results = apply_programs_to_bordereau(
+        _bordereau(),
+        programs,
+        CALCULATION_DATE,
+        simple=False,
+        detail_level="matched_id",
+    )
+
+    assert list(results) == ["a", "b", "c"]
+    for key, program in programs.items():
+        _, expected = apply_program_to_bordereau(
+            _bordereau(),
+            program,
+            CALCULATION_DATE,
+            engine="vectorized",
+            detail_level="matched_id",
+        )
+        pd.testing.assert_frame_equal(results[key], expected)
+
+
+def test_exposure_and_dimension_codes_are_computed_once(monkeypatch):
+    """Les expositions (même LOB) et les codes de colonnes sont calculés une fois pour tous les programmes."""
+    calls = {"exposure": 0, "codes": []}
+    compute_exposure_columns = vectorized_engine.compute_exposure_columns
+    column_codes = vectorized_engine.column_codes
+
+    def counting_exposure(df, uw_dept):
+        calls["exposure"] += 1
+        return compute_exposure_columns(df, uw_dept)
+
+    def counting_codes(df, col):
+        calls["codes"].append(col)
+        return column_codes(df, col)
+
+    monkeypatch.setattr(
+        vectorized_engine, "compute_exposure_columns", counting_exposure
+    )
+    monkeypatch.setattr(vectorized_engine, "column_codes", counting_codes)
+    apply_programs_to_bordereau(_bordereau(), _candidates(), CALCULATION_DATE)
+
+    assert calls["exposure"] == 1
+    assert sorted(calls["codes"]) == sorted(set(calls["codes"]))
+
+
+def test_duplicate_program_names_are_rejected():
+    program = _candidates()[0]
+    with pytest.raises(ValueError, match="Duplicate program name"):
+        apply_programs_to_bordereau(_bordereau(), [program, program], CALCULATION_DATE)
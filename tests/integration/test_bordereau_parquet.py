@@ -0,0 +1,89 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+# src.io importe le connecteur Snowflake au chargement du package
+pytest.importorskip("snowflake.connector")
+
+from src.domain.bordereau import Bordereau
+from src.engine import apply_program_to_bordereau_simple
+from src.managers import BordereauManager
+
+CALCULATION_DATE = "2024-06-30"
+
+
+def _parquet_source(tmp_path, bordereau):
+    df = bordereau.df.assign(BROKER="X", PRODUCT_TYPE_LEVEL_3="Y")
+    source = str(tmp_path / "bordereau.parquet")
+    assert BordereauManager.detect_backend(source) == "parquet"
+    BordereauManager(backend="parquet").save(Bordereau(df, uw_dept="casualty"), source)
+    return source
+
+
+def test_parquet_bordereau_projection_and_pushdown(
+    tmp_path, casualty_program, casualty_bordereau
+):
+    """
+    Bordereau casualty écrit en Parquet puis relu pour le programme :
+    - seules les colonnes du programme sont lues (BROKER, PRODUCT_TYPE_LEVEL_3 ignorées)
+    - POL-007, expirée à la date de calcul, n'est pas lue
+    - les résultats des polices lues sont ceux du bordereau complet
+    """
+    source = _parquet_source(tmp_path, casualty_bordereau)
+    manager = BordereauManager(backend="parquet")
+
+    bordereau = manager.load(
+        source, program=casualty_program, calculation_date=CALCULATION_DATE
+    )
+
+    assert "BROKER" not in bordereau.columns
+    assert "PRODUCT_TYPE_LEVEL_3" not in bordereau.columns
+    assert {"REGION", "ORIGINAL_CURRENCY", "CEDENT_SHARE", "EXPIRE_DT"} <= set(
+        bordereau.columns
+    )
+    assert bordereau.df["policy_id"].tolist() == [f"POL-{i:03d}" for i in range(7)]
+
+    expected = apply_program_to_bordereau_simple(
+        casualty_bordereau, casualty_program, CALCULATION_DATE
+    ).iloc[:7]
+    results = apply_program_to_bordereau_simple(
+        bordereau, casualty_program, CALCULATION_DATE
+    )
+    pd.testing.assert_frame_equal(results, expected, check_dtype=False)
+
+    batches = list(
+        manager.iter_batches(
+            source,
+            batch_size=3,
+            program=casualty_program,
+            calculation_date=CALCULATION_DATE,
+        )
+    )
+    assert sum(len(b) for b in batches) == 7
+    assert all(len(b) <= 3 for b in batches)
+
+
+def test_text_expiry_dates_are_not_pushed_down(
+    tmp_path, casualty_program, casualty_bordereau
+):
+    """
+    EXPIRE_DT stockée en texte (vide, format non ISO) : pas de filtre en lecture,
+    sinon "" et "12/31/2025" seraient écartés par comparaison de chaînes ;
+    le moteur interprète ces dates et ne marque inactive que POL-002.
+    """
+    df = casualty_bordereau.df.iloc[:3].copy()
+    df["EXPIRE_DT"] = ["", "12/31/2025", "2024-01-31"]
+    source = str(tmp_path / "bordereau_text_dates.parquet")
+    df.to_parquet(source, index=False)
+    manager = BordereauManager(backend="parquet")
+
+    assert manager.io.active_filter(source, CALCULATION_DATE) is None
+    bordereau = manager.load(
+        source, program=casualty_program, calculation_date=CALCULATION_DATE
+    )
+
+    assert bordereau.df["policy_id"].tolist() == ["POL-000", "POL-001", "POL-002"]
+    results = apply_program_to_bordereau_simple(
+        bordereau, casualty_program, CALCULATION_DATE
+    )
+    assert results["exclusion_status"].tolist()[2] == "inactive"
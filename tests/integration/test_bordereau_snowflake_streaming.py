@@ -0,0 +1,172 @@
+import re
+import sqlite3
+from contextlib import contextmanager
+
+import pandas as pd
+import pytest
+
+# src.io importe le connecteur Snowflake au chargement du package
+pytest.importorskip("snowflake.connector")
+
+from src.engine import (
+    apply_program_to_bordereau_batches,
+    apply_program_to_bordereau_simple,
+)
+from src.io import bordereau_snowflake_adapter
+from src.managers import BordereauManager
+
+CALCULATION_DATE = "2024-06-30"
+
+SOURCE = "snowflake://DB.SCHEMA.BORDEREAU"
+
+
+TEXT, DATE = 2, 3  # type_code Snowflake de cursor.description
+
+
+def _try_to_date(value):
+    """TRY_TO_DATE simulé : date ISO, ou NULL si la valeur n'est pas lisible."""
+    parsed = pd.to_datetime(value, errors="coerce")
+    return None if pd.isna(parsed) else parsed.strftime("%Y-%m-%d")
+
+
+class _SqliteCursor:
+    """
+    Curseur du connecteur simulé sur SQLite : result batches de `chunk_rows`
+    lignes, type_code `types[col]` (TEXT par défaut) dans description.
+    """
+
+    def __init__(self, cnx, statements, chunk_rows, types):
+        self._cnx = cnx
+        self._statements = statements
+        self._chunk_rows = chunk_rows
+        self._types = types
+        self.description = None
+
+    def execute(self, sql, params=()):
+        self._statements.append(sql)
+        sql = re.sub(r'"DB"\."SCHEMA"\.', "", sql).replace("%s", "?")
+        self._cur = self._cnx.execute(sql, params)
+        self.description = [
+            (d[0], self._types.get(d[0], TEXT), *d[2:]) for d in self._cur.description
+        ]
+
+    def fetch_pandas_batches(self):
+        columns = [d[0] for d in self.description]
+        while rows := self._cur.fetchmany(self._chunk_rows):
+            yield pd.DataFrame(rows, columns=columns)
+
+    def fetch_pandas_all(self):
+        return pd.concat(list(self.fetch_pandas_batches()), ignore_index=True)
+
+    def close(self):
+        pass
+
+
+def _install_table(monkeypatch, df, types=None):
+    """Table BORDEREAU servie par le pool simulé ; renvoie la liste des requêtes."""
+    cnx = sqlite3.connect(":memory:")
+    cnx.create_function("TRY_TO_DATE", 1, _try_to_date)
+    df.to_sql("BORDEREAU", cnx, index=False)
+    statements = []
+
+    class Connection:
+        def cursor(self):
+            return _SqliteCursor(cnx, statements, chunk_rows=2, types=types or {})
+
+    @contextmanager
+    def pooled_connection(params):
+        yield Connection()
+
+    monkeypatch.setattr(
+        bordereau_snowflake_adapter, "pooled_connection", pooled_connection
+    )
+    return statements
+
+
+def _text_dates_table(bordereau):
+    df = bordereau.df.assign(BROKER="X")
+    for col in ("INCEPTION_DT", "EXPIRE_DT"):
+        df[col] = df[col].dt.strftime("%Y-%m-%d")
+    return df
+
+
+@pytest.fixture
+def statements(monkeypatch, casualty_bordereau):
+    return _install_table(
+        monkeypatch, _text_dates_table(casualty_bordereau), {"EXPIRE_DT": DATE}
+    )
+
+
+def test_snowflake_bordereau_streamed_with_projection_and_pushdown(
+    statements, casualty_program, casualty_bordereau
+):
+    """
+    Bordereau casualty en table Snowflake lu par lots de 3, result batches de 2 lignes :
+    - SELECT limité aux colonnes du programme (BROKER non transférée)
+    - POL-007, expirée à la date de calcul, filtrée côté SQL
+    - lots de 3, 3, 1 lignes, index global, résultats identiques au bordereau complet
+    """
+    manager = BordereauManager(backend=BordereauManager.detect_backend(SOURCE))
+    batches = list(
+        manager.iter_batches(
+            SOURCE,
+            batch_size=3,
+            program=casualty_program,
+            calculation_date=CALCULATION_DATE,
+        )
+    )
+
+    query = statements[-1]
+    assert '"REGION"' in query and "BROKER" not in query and "SELECT *" not in query
+    assert 'WHERE ("EXPIRE_DT" > %s OR "EXPIRE_DT" IS NULL)' in query
+    assert [len(b) for b in batches] == [3, 3, 1]
+    assert [b.df.index[0] for b in batches] == [0, 3, 6]
+    assert all("BROKER" not in b.columns for b in batches)
+
+    expected = apply_program_to_bordereau_simple(
+        casualty_bordereau, casualty_program, CALCULATION_DATE
+    ).iloc[:7]
+    streamed = pd.concat(
+        results["cession_to_reinsurer"]
+        for _, results in apply_program_to_bordereau_batches(
+            batches, casualty_program, CALCULATION_DATE
+        )
+    )
+    assert streamed.tolist() == pytest.approx(expected["ceded_to_reinsurer"].tolist())
+
+    full = manager.load(SOURCE, program=casualty_program)
+    assert len(full) == 8
+    assert "BROKER" not in full.columns
+
+
+def test_text_expiry_dates_are_filtered_after_parsing(
+    monkeypatch, casualty_program, casualty_bordereau
+):
+    """
+    EXPIRE_DT en texte : filtre sur TRY_TO_DATE, pas sur l'ordre lexical ;
+    "" et "12/31/2025" (actives au 2024-06-01) sont lues, POL-002 expirée ne l'est pas.
+    """
+    df = _text_dates_table(casualty_bordereau).iloc[:3].copy()
+    df["EXPIRE_DT"] = ["", "12/31/2025", "2024-01-31"]
+    statements = _install_table(monkeypatch, df)
+    manager = BordereauManager(backend="snowflake")
+
+    bordereau = manager.load(
+        SOURCE, program=casualty_program, calculation_date="2024-06-01"
+    )
+
+    assert 'TRY_TO_DATE("EXPIRE_DT") > %s' in statements[-1]
+    assert bordereau.df["policy_id"].tolist() == ["POL-000", "POL-001"]
+
+
+def test_no_filter_without_expiry_column(monkeypatch, casualty_bordereau):
+    """Relation sans EXPIRE_DT : aucun prédicat (sinon erreur SQL sur la colonne)."""
+    df = _text_dates_table(casualty_bordereau).drop(columns=["EXPIRE_DT"])
+    statements = _install_table(monkeypatch, df)
+    manager = BordereauManager(backend="snowflake")
+
+    assert manager.io.active_filter(SOURCE, CALCULATION_DATE) is None
+    bordereau = manager.load(SOURCE, calculation_date=CALCULATION_DATE, validate=False)
+
+    assert "WHERE" not in statements[-1]
+    assert len(bordereau) == 8
@@ -0,0 +1,79 @@
+import pandas as pd
+import pytest
+
+# src.io importe le connecteur Snowflake au chargement du package
+pytest.importorskip("snowflake.connector")
+
+from src.engine import apply_program_to_bordereau, apply_program_to_bordereau_batches
+from src.managers import BordereauManager, RunManager
+from src.serialization.run_serializer import RunMeta
+
+CALCULATION_DATE = "2024-06-30"
+
+
+def _run_meta():
+    return RunMeta(
+        run_id="RUN_STREAM",
+        program_name="CASUALTY_VECTORIZED",
+        uw_dept="casualty",
+        calculation_date=CALCULATION_DATE,
+        source_program="test",
+        source_bordereau="bordereau.csv",
+    )
+
+
+def _without_ids(df, *columns):
+    return df.drop(columns=list(columns)).reset_index(drop=True)
+
+
+def test_streamed_run_matches_in_memory_run(
+    tmp_path, casualty_program, casualty_bordereau
+):
+    """
+    Bordereau casualty de 8 polices lu par lots de 3 :
+    les tables de run écrites lot par lot sont identiques à celles du run en mémoire
+    (identifiants compris : numérotation continue d'un lot à l'autre).
+    """
+    source = tmp_path / "bordereau.csv"
+    casualty_bordereau.df.to_csv(source, index=False)
+    program = casualty_program
+    manager = BordereauManager()
+
+    full = manager.load(str(source), program=program)
+    _, results = apply_program_to_bordereau(full, program, CALCULATION_DATE)
+    RunManager().save(
+        _run_meta(), results, str(tmp_path / "memory"), source_policy_df=full.df
+    )
+
+    batches = manager.iter_batches(str(source), batch_size=3, program=program)
+    assert [
+        len(b) for b in manager.iter_batches(str(source), batch_size=3, program=program)
+    ] == [3, 3, 2]
+    count = RunManager().save_stream(
+        _run_meta(),
+        (
+            (results_df, with_net)
+            for with_net, results_df in apply_program_to_bordereau_batches(
+                batches, program, CALCULATION_DATE
+            )
+        ),
+        str(tmp_path / "stream"),
+    )
+    assert count == 8
+
+    memory = RunManager().io.read(str(tmp_path / "memory"))
+    stream = RunManager().io.read(str(tmp_path / "stream"))
+    pd.testing.assert_frame_equal(stream[0], memory[0])
+    pd.testing.assert_frame_equal(
+        _without_ids(stream[1], "policy_run_id"),
+        _without_ids(memory[1], "policy_run_id"),
+    )
+    pd.testing.assert_frame_equal(
+        _without_ids(stream[2], "structure_row_id", "policy_run_id"),
+        _without_ids(memory[2], "structure_row_id", "policy_run_id"),
+    )
+    assert stream[1]["policy_run_id"].tolist() == memory[1]["policy_run_id"].tolist()
+    assert (
+        stream[2]["structure_row_id"].tolist() == memory[2]["structure_row_id"].tolist()
+    )
+    assert stream[1]["policy_id"].tolist() == [f"POL-{i:03d}" for i in range(8)]
@@ -0,0 +1,178 @@
+import pandas as pd
+import pytest
+from src.builders import build_quota_share, build_excess_of_loss, build_program
+from src.domain import ExclusionRule
+from src.domain.bordereau import Bordereau
+from src.engine import (
+    apply_program_to_bordereau_dates,
+    apply_program_to_bordereau_simple,
+)
+from src.engine.currency_validator import CurrencyValidator
+
+MONTH_ENDS = [
+    "2024-03-31",
+    "2024-06-30",
+    "2024-09-30",
+    "2024-12-31",
+    "2025-01-31",
+    "2025-03-31",
+]
+
+
+def _program():
+    qs = build_quota_share(
+        name="QS_1",
+        cession_pct=0.30,
+        signed_share=0.5,
+        claim_basis="risk_attaching",
+        inception_date="2024-01-01",
+        expiry_date="2025-01-01",
+        special_conditions=[{"REGION": ["Europe"], "CESSION_PCT": 0.40}],
+    )
+    xol_lo = build_excess_of_loss(
+        name="XOL_LO",
+        attachment=1_000_000,
+        limit=3_000_000,
+        signed_share=0.25,
+        predecessor_title="QS_1",
+        claim_basis="loss_occurring",
+        inception_date="2024-04-01",
+        expiry_date="2024-12-01",
+        special_conditions=[{"CURRENCY": ["USD"], "ATTACHMENT_POINT_100": 2_000_000}],
+    )
+    return build_program(
+        name="RUN_OFF",
+        structures=[qs, xol_lo],
+        main_currency="EUR",
+        dimension_columns=["REGION", "CURRENCY"],
+        underwriting_department="casualty",
+        exclusions=[
+            ExclusionRule(
+                values_by_dimension={"COUNTRY": ["Spain"]},
+                name="SPAIN_H2",
+                effective_date=pd.Timestamp("2024-07-01"),
+            ),
+        ],
+    )
+
+
+def _bordereau():
+    df = pd.DataFrame(
+        {
+            "policy_id": [f"POL-{i:03d}" for i in range(7)],
+            "INSURED_NAME": ["a", "b", "c", "d", "e", "f", "g"],
+            "COUNTRY": [
+                "France",
+                "Spain",
+                "United States",
+                "France",
+                "Japan",
+                "Spain",
+                "France",
+            ],
+            "REGION": [
+                "Europe",
+                "Europe",
+                "North America",
+                None,
+                "Asia",
+                "Europe",
+                "Europe",
+            ],
+            "ORIGINAL_CURRENCY": ["EUR", "EUR", "USD", "EUR", "JPY", "EUR", "EUR"],
+            "OCCURRENCE_LIMIT_100_ORIG": [10e6, 8e6, 25e6, 3e6, 7e6, 12e6, 9e6],
+            "CEDENT_SHARE": [0.5, 0.75, 0.6, 0.4, 0.5, 1.0, 0.8],
+            "INCEPTION_DT": [
+                "2024-01-01",
+                "2024-02-01",
+                "2024-03-15",
+                "2024-04-01",
+                "2024-01-01",
+                "2024-05-01",
+                "2023-03-01",
+            ],
+            "EXPIRE_DT": [
+                "2024-12-31",
+                "2025-01-31",
+                "2025-03-14",
+                "2024-08-31",
+                "2024-12-31",
+                "2025-04-30",
+                "2024-02-28",
+            ],
+        }
+    )
+    return Bordereau(df, uw_dept="casualty")
+
+
+def test_long_frame_matches_one_run_per_date():
+    """
+    Vue run-off mensuelle : pour chaque date, la tranche du DataFrame long est
+    le résultat de apply_program_to_bordereau_simple à cette date (expirations,
+    fenêtre LO et exclusion datée évoluent avec la date).
+    """
+    program = _program()
+    long_df = apply_program_to_bordereau_dates(_bordereau(), program, MONTH_ENDS)
+
+    assert long_df.index.names[0] == "calculation_date"
+    assert list(long_df.index.get_level_values(0).unique()) == list(
+        pd.to_datetime(MONTH_ENDS)
+    )
+    for date in MONTH_ENDS:
+        expected = apply_program_to_bordereau_simple(
+            _bordereau(), program, date, engine="vectorized"
+        )
+        pd.testing.assert_frame_equal(long_df.loc[pd.Timestamp(date)], expected)
+        row = apply_program_to_bordereau_simple(_bordereau(), program, date)
+        pd.testing.assert_series_equal(
+            long_df.loc[pd.Timestamp(date)]["ceded_to_reinsurer"],
+            row["ceded_to_reinsurer"],
+            check_dtype=False,
+        )
+
+    status = long_df["exclusion_status"].unstack(0)
+    assert status.loc[1].tolist() == [
+        "included",
+        "included",
+        "excluded",
+        "excluded",
+        "inactive",
+        "inactive",
+    ]
+    assert status.loc[3].tolist() == [
+        "included",
+        "included",
+        "inactive",
+        "inactive",
+        "inactive",
+        "inactive",
+    ]
+
+
+def test_date_independent_work_is_done_once(monkeypatch):
+    """La validation de devise (et le matching) se fait une fois par groupe de polices, pas par date."""
+    calls = []
+    validate = CurrencyValidator.validate_policy_currency
+
+    def counting(policy, program, matched_condition=None, *, index=None):
+        calls.append(policy)
+        return validate(policy, program, matched_condition, index=index)
+
+    monkeypatch.setattr(
+        CurrencyValidator, "validate_policy_currency", staticmethod(counting)
+    )
+    apply_program_to_bordereau_dates(_bordereau(), _program(), MONTH_ENDS[:1])
+    single = len(calls)
+    calls.clear()
+    apply_program_to_bordereau_dates(_bordereau(), _program(), MONTH_ENDS)
+
+    assert len(calls) == single
+
+
+def test_invalid_dates_are_rejected():
+    with pytest.raises(ValueError, match="At least one"):
+        apply_program_to_bordereau_dates(_bordereau(), _program(), [])
+    with pytest.raises(ValueError, match="Duplicate"):
+        apply_program_to_bordereau_dates(
+            _bordereau(), _program(), ["2024-06-30", "2024-06-30"]
+        )
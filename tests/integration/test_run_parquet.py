@@ -0,0 +1,81 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+# src.io importe le connecteur Snowflake au chargement du package
+pytest.importorskip("snowflake.connector")
+
+from src.engine import apply_program_to_bordereau
+from src.managers import RunManager
+from src.serialization.run_serializer import RunMeta
+
+CALCULATION_DATE = "2024-06-30"
+
+
+def _run_meta(run_id):
+    return RunMeta(
+        run_id=run_id,
+        program_name="CASUALTY_VECTORIZED",
+        uw_dept="casualty",
+        calculation_date=CALCULATION_DATE,
+        source_program="test",
+        source_bordereau="bordereau.csv",
+    )
+
+
+def test_parquet_run_storage(tmp_path, casualty_program, casualty_bordereau):
+    """
+    Deux runs dans le même dataset Parquet :
+    - colonnes typées à la relecture (float, bool, dates)
+    - structures partitionnées par run_id / structure_name
+    - lectures projetées et filtrées, réécriture d'un run sans doublon
+    """
+    _, results = apply_program_to_bordereau(
+        casualty_bordereau, casualty_program, CALCULATION_DATE
+    )
+    dest = str(tmp_path / "runs.parquet")
+    assert RunManager.detect_backend(dest) == "parquet"
+
+    manager = RunManager(backend="parquet")
+    memory = manager.save(
+        _run_meta("RUN_A"), results, dest, source_policy_df=casualty_bordereau.df
+    )
+    manager.save(
+        _run_meta("RUN_B"), results, dest, source_policy_df=casualty_bordereau.df
+    )
+    manager.save(
+        _run_meta("RUN_A"), results, dest, source_policy_df=casualty_bordereau.df
+    )
+
+    assert (
+        tmp_path
+        / "runs.parquet"
+        / "run_policy_structures"
+        / "run_id=RUN_A"
+        / "structure_name=QS_1"
+    ).is_dir()
+
+    runs, policies, structures = manager.io.read(dest, run_ids=["RUN_A"])
+    assert runs["row_count"].tolist() == [8]
+    assert policies["exposure"].dtype == "float64"
+    assert pd.api.types.is_datetime64_any_dtype(policies["INCEPTION_DT"])
+    assert structures["applied"].dtype == bool
+    assert sorted(policies["policy_run_id"]) == sorted(
+        memory["run_policies"]["policy_run_id"]
+    )
+    assert len(structures) == len(memory["run_policy_structures"])
+
+    ceded = manager.io.read_table(
+        dest,
+        "run_policy_structures",
+        columns=["run_id", "ceded_to_reinsurer"],
+        filters=[("structure_name", "=", "QS_1"), ("applied", "=", True)],
+    )
+    assert ceded.columns.tolist() == ["run_id", "ceded_to_reinsurer"]
+    assert sorted(set(ceded["run_id"])) == ["RUN_A", "RUN_B"]
+    expected = memory["run_policy_structures"].query(
+        "structure_name == 'QS_1' and applied"
+    )
+    assert ceded["ceded_to_reinsurer"].sum() == pytest.approx(
+        2 * expected["ceded_to_reinsurer"].sum()
+    )
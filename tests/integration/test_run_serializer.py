@@ -0,0 +1,58 @@
+import json
+
+from src.engine import apply_program_to_bordereau
+from src.serialization.run_serializer import RunMeta, RunSerializer
+
+CALCULATION_DATE = "2024-06-30"
+
+
+def _run_meta():
+    return RunMeta(
+        run_id="RUN_1",
+        program_name="CASUALTY_VECTORIZED",
+        uw_dept="casualty",
+        calculation_date=CALCULATION_DATE,
+        source_program="test",
+        source_bordereau="bordereau.csv",
+    )
+
+
+def test_run_tables_ids_and_json_columns(casualty_program, casualty_bordereau):
+    """
+    - identifiants déterministes : run_id + ordinal de police, puis position de la structure
+    - colonnes *_json présentes mais vides par défaut, renseignées avec include_json=True
+    - une ligne de structure par entrée de structures_detail
+    """
+    _, results = apply_program_to_bordereau(
+        casualty_bordereau, casualty_program, CALCULATION_DATE
+    )
+    serializer = RunSerializer()
+
+    dfs = serializer.build_dataframes(_run_meta(), results, casualty_bordereau.df)
+    policies, structures = dfs["run_policies"], dfs["run_policy_structures"]
+
+    assert policies["policy_run_id"].tolist() == [f"RUN_1-{i}" for i in range(8)]
+    assert policies["policy_id"].tolist() == [f"POL-{i:03d}" for i in range(8)]
+    assert len(structures) == sum(len(d) for d in results["structures_detail"])
+    assert structures["structure_row_id"].iloc[:2].tolist() == [
+        "RUN_1-0-0",
+        "RUN_1-0-1",
+    ]
+    assert policies["raw_result_json"].isna().all()
+    assert structures["matching_details_json"].isna().all()
+
+    shifted = serializer.build_dataframes(
+        _run_meta(), results, casualty_bordereau.df, first_ordinal=8
+    )
+    assert shifted["run_policies"]["policy_run_id"].iloc[0] == "RUN_1-8"
+
+    with_json = serializer.build_dataframes(
+        _run_meta(), results, casualty_bordereau.df, include_json=True
+    )["run_policy_structures"]
+    assert with_json.columns.tolist() == structures.columns.tolist()
+    first = results["structures_detail"].iloc[0][0]
+    assert json.loads(with_json["metrics_json"].iloc[0]) == first["metrics"]
+    assert (
+        json.loads(with_json["terms_json"].iloc[0])["signed_share"]
+        == first["signed_share"]
+    )
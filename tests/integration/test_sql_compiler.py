@@ -0,0 +1,232 @@
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.builders import build_quota_share, build_program
+from src.domain import ExclusionRule
+from src.domain.bordereau import Bordereau
+from src.engine import (
+    SIMPLE_COLUMNS,
+    apply_program_to_bordereau_simple,
+    compile_program_sql,
+)
+
+BORDEREAUX = Path(__file__).resolve().parents[2] / "examples" / "bordereaux"
+AMOUNTS = [
+    "exposure",
+    "effective_exposure",
+    "ceded_to_layer_100pct",
+    "ceded_to_reinsurer",
+    "retained_by_cedant",
+]
+
+
+def _run_sql(df: pd.DataFrame, program, calculation_date: str) -> pd.DataFrame:
+    connection = sqlite3.connect(":memory:")
+    try:
+        df.to_sql("BORDEREAU", connection, index=False)
+        sql = compile_program_sql(
+            program,
+            calculation_date,
+            '"BORDEREAU"',
+            list(df.columns),
+            passthrough=["POLICY_ID"],
+        )
+        return pd.read_sql(sql, connection)
+    finally:
+        connection.close()
+
+
+def _assert_same_as_engine(
+    df: pd.DataFrame, program, calculation_date: str
+) -> pd.DataFrame:
+    expected = apply_program_to_bordereau_simple(
+        Bordereau(df, uw_dept=program.underwriting_department),
+        program,
+        calculation_date,
+    )
+    actual = _run_sql(df, program, calculation_date)
+
+    assert list(actual.columns) == ["POLICY_ID", *SIMPLE_COLUMNS]
+    assert actual["POLICY_ID"].tolist() == df["POLICY_ID"].tolist()
+    for col in AMOUNTS:
+        np.testing.assert_allclose(
+            actual[col].to_numpy(dtype=float),
+            expected[col].to_numpy(dtype=float),
+            rtol=1e-12,
+            err_msg=col,
+        )
+    for col in ["insured_name", "exclusion_status", "exclusion_reason"]:
+        assert actual[col].where(actual[col].notna(), None).tolist() == (
+            expected[col].where(expected[col].notna(), None).tolist()
+        ), col
+    for col in ["policy_inception_date", "policy_expiry_date"]:
+        assert (
+            pd.to_datetime(actual[col]).tolist()
+            == pd.to_datetime(expected[col]).tolist()
+        )
+    return actual
+
+
+@pytest.fixture
+def casualty_program(casualty_structures):
+    """Structures de conftest, exclusion pays (Germany) du bordereau d'exemple."""
+    return build_program(
+        name="CASUALTY_SQL",
+        structures=casualty_structures,
+        main_currency="EUR",
+        dimension_columns=["REGION", "CURRENCY", "PRODUCT_TYPE_LEVEL_1"],
+        underwriting_department="casualty",
+        exclusions=[
+            ExclusionRule(values_by_dimension={"COUNTRY": ["Germany"]}, name="GERMANY")
+        ],
+    )
+
+
+@pytest.mark.parametrize("calculation_date", ["2024-06-30", "2025-01-31", "2025-03-20"])
+def test_casualty_example_matches_engine(calculation_date, casualty_program):
+    """
+    Bordereau casualty d'exemple, programme QS (conditions REGION / CURRENCY)
+    + XOL chaînés RA et LO + XOL hors période + exclusion pays :
+    la requête SQL donne les mêmes lignes que le moteur, y compris les polices
+    expirées quand la date de calcul avance.
+    """
+    df = pd.read_csv(BORDEREAUX / "bordereau_casualty_exemple.csv")
+    actual = _assert_same_as_engine(df, casualty_program, calculation_date)
+    if calculation_date == "2024-06-30":
+        assert actual["exclusion_status"].tolist() == [
+            "included",
+            "included",
+            "included",
+            "excluded",
+            "included",
+        ]
+        assert actual.loc[
+            3, ["effective_exposure", "ceded_to_layer_100pct"]
+        ].tolist() == [0.0, 0.0]
+
+
+def test_quota_share_exclusions_example_matches_engine():
+    """Bordereau d'exemple des exclusions (Iran, Russie) avec le QS 25 % de l'exemple."""
+    program = build_program(
+        name="QS_EXCLUSIONS_SQL",
+        structures=[
+            build_quota_share(
+                name="QS Casualty 25%",
+                cession_pct=0.25,
+                signed_share=1.0,
+                claim_basis="risk_attaching",
+                inception_date="2024-01-01",
+                expiry_date="2024-12-31",
+            )
+        ],
+        main_currency="EUR",
+        underwriting_department="casualty",
+        exclusions=[
+            ExclusionRule(
+                values_by_dimension={"COUNTRY": ["Iran", "Russia"]},
+                name="Sanctions Countries",
+            ),
+        ],
+    )
+    df = pd.read_csv(BORDEREAUX / "bordereau_quota_share_exclusions_test.csv")
+    actual = _assert_same_as_engine(df, program, "2024-06-30")
+    # L'Iran (USD) est rejeté sur la devise avant les exclusions
+    assert actual["exclusion_status"].tolist() == [
+        "included",
+        "currency_mismatch",
+        "excluded",
+        "currency_mismatch",
+        "included",
+        "currency_mismatch",
+    ]
+
+
+def test_currency_mismatch_missing_dimension_and_default_condition(casualty_program):
+    """
+    Polices sans région, en devise non autorisée (JPY) ou sans devise (y compris
+    blanche), police dont aucune condition ne matche (conditions par défaut),
+    police sans limite (exposition NULL) et devise entourée d'espaces : mêmes
+    statuts, raisons et montants (NaN compris) que le moteur.
+    """
+    df = pd.DataFrame(
+        {
+            "POLICY_ID": [f"POL-{i:03d}" for i in range(9)],
+            "INSURED_NAME": ["a", "b", "c", "d", "e", "f", "g", "h", "i"],
+            "REGION": ["Europe", None, "Europe", "Asia"] + ["Europe"] * 5,
+            "ORIGINAL_CURRENCY": [
+                "EUR",
+                "EUR",
+                "JPY",
+                "GBP",
+                None,
+                "USD",
+                "EUR",
+                " EUR",
+                "  ",
+            ],
+            "OCCURRENCE_LIMIT_100_ORIG": [
+                10e6,
+                3e6,
+                7e6,
+                12e6,
+                5e6,
+                9e6,
+                None,
+                4e6,
+                6e6,
+            ],
+            "CEDENT_SHARE": [0.5, 0.4, 0.5, 1.0, 1.0, 0.8, 0.5, 0.5, 0.5],
+            "INCEPTION_DT": [
+                "2024-01-01",
+                "2024-04-01",
+                "2024-01-01",
+                "2024-05-01",
+                "2024-02-01",
+                "2024-03-01",
+                "2024-01-01",
+                "2024-01-01",
+                "2024-01-01",
+            ],
+            "EXPIRE_DT": [
+                "2024-12-31",
+                "2025-03-31",
+                "2024-12-31",
+                "2025-04-30",
+                "2025-01-31",
+                "2025-02-28",
+                "2024-12-31",
+                "2024-12-31",
+                "2024-12-31",
+            ],
+        }
+    )
+    actual = _assert_same_as_engine(df, casualty_program, "2024-06-30")
+    assert actual["exclusion_status"].tolist() == [
+        "included",
+        "included",
+        "currency_mismatch",
+        "included",
+        "currency_mismatch",
+        "included",
+        "included",
+        "included",
+        "currency_mismatch",
+    ]
+    assert actual.loc[6, ["exposure", "ceded_to_reinsurer"]].isna().all()
+    assert actual.loc[8, "exclusion_reason"] == actual.loc[4, "exclusion_reason"]
+
+
+def test_aviation_is_not_compiled():
+    program = build_program(
+        name="AVIATION_SQL",
+        structures=[build_quota_share(name="QS", cession_pct=0.25, signed_share=1.0)],
+        main_currency="USD",
+        underwriting_department="aviation",
+    )
+    with pytest.raises(NotImplementedError):
+        compile_program_sql(
+            program, "2024-06-30", '"BORDEREAU"', ["HULL_LIMIT", "HULL_SHARE"]
+        )
@@ -0,0 +1,318 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.domain.bordereau import Bordereau
+from src.engine import (
+    apply_program,
+    apply_program_to_bordereau,
+    apply_program_to_bordereau_simple,
+    apply_program_vectorized,
+    compile_program,
+)
+
+CALCULATION_DATE = "2024-06-30"
+
+
+@pytest.mark.parametrize("lob", ["casualty", "aviation"])
+def test_vectorized_engine_matches_row_engine(request, lob):
+    """
+    Le moteur vectorisé doit produire exactement les mêmes résultats que le moteur ligne à ligne :
+    - mêmes statuts (inactive / currency_mismatch / excluded / included) et raisons
+    - mêmes expositions et totaux de cession par police
+    - même détail par structure, matching_details compris
+    """
+    program = request.getfixturevalue(f"{lob}_program")
+    bordereau = request.getfixturevalue(f"{lob}_bordereau")
+    # Plan partagé : les conditions par défaut sont les mêmes objets des deux côtés
+    plan = compile_program(program)
+
+    row_net, row_results = apply_program_to_bordereau(
+        bordereau, program, CALCULATION_DATE, plan=plan
+    )
+    vec_net, vec_results = apply_program_to_bordereau(
+        bordereau, program, CALCULATION_DATE, engine="vectorized", plan=plan
+    )
+
+    scalar_columns = [c for c in row_results.columns if c != "structures_detail"]
+    pd.testing.assert_frame_equal(
+        vec_results[scalar_columns], row_results[scalar_columns], check_dtype=False
+    )
+    pd.testing.assert_frame_equal(vec_net, row_net, check_dtype=False)
+    for row_detail, vec_detail in zip(
+        row_results["structures_detail"], vec_results["structures_detail"]
+    ):
+        assert vec_detail == row_detail
+
+    row_simple = apply_program_to_bordereau_simple(bordereau, program, CALCULATION_DATE)
+    vec_simple = apply_program_to_bordereau_simple(
+        bordereau, program, CALCULATION_DATE, engine="vectorized"
+    )
+    pd.testing.assert_frame_equal(vec_simple, row_simple, check_dtype=False)
+
+
+def test_vectorized_engine_statuses(casualty_program, casualty_bordereau):
+    """
+    Bordereau casualty (programme en EUR, exclusion REGION=Antarctica) :
+    - POL-003 exclue, POL-005 (JPY) en currency_mismatch, POL-007 expirée
+    - les autres polices sont couvertes
+    """
+    results = apply_program_to_bordereau_simple(
+        casualty_bordereau, casualty_program, CALCULATION_DATE, engine="vectorized"
+    )
+
+    assert results["exclusion_status"].tolist() == [
+        "included",
+        "included",
+        "included",
+        "excluded",
+        "included",
+        "currency_mismatch",
+        "included",
+        "inactive",
+    ]
+    assert results.loc[3, "exclusion_reason"] == "POLAR"
+    assert results.loc[7, "effective_exposure"] == 0.0
+    assert results.loc[7, "ceded_to_layer_100pct"] == 0.0
+
+
+def test_unknown_engine_is_rejected(casualty_program, casualty_bordereau):
+    with pytest.raises(ValueError, match="Unknown engine"):
+        apply_program_to_bordereau(
+            casualty_bordereau, casualty_program, CALCULATION_DATE, engine="spark"
+        )
+
+
+@pytest.mark.parametrize("engine", ["row", "vectorized"])
+def test_detail_level(engine, casualty_program, casualty_bordereau):
+    """
+    - "totals" : structures_detail vide, totaux inchangés
+    - "matched_id" : détail par structure avec matched_condition_id, sans matching_details
+    - "full" : matching_details renseignés pour les structures appliquées
+    """
+    results = {
+        level: apply_program_to_bordereau(
+            casualty_bordereau,
+            casualty_program,
+            CALCULATION_DATE,
+            engine=engine,
+            detail_level=level,
+        )[1]
+        for level in ["totals", "matched_id", "full"]
+    }
+
+    totals_columns = ["cession_to_layer_100pct", "cession_to_reinsurer"]
+    for level in ["totals", "matched_id"]:
+        pd.testing.assert_frame_equal(
+            results[level][totals_columns], results["full"][totals_columns]
+        )
+    assert all(detail == [] for detail in results["totals"]["structures_detail"])
+
+    # POL-000 : Europe / EUR → condition 1 du QS, défaut (-1) pour XOL_1, XOL_OLD hors période
+    by_name = {
+        row["structure_name"]: row
+        for row in results["matched_id"].loc[0, "structures_detail"]
+    }
+    assert by_name["QS_1"]["matched_condition_id"] == 1
+    assert by_name["XOL_1"]["matched_condition_id"] == -1
+    assert by_name["XOL_OLD"]["matched_condition_id"] is None
+    assert all(row["matching_details"] is None for row in by_name.values())
+
+    full = {
+        row["structure_name"]: row
+        for row in results["full"].loc[0, "structures_detail"]
+    }
+    assert full["QS_1"]["matching_details"]["matching_score"] > 0
+    assert full["XOL_1"]["matching_details"]["using_default_values"] is True
+    assert full["XOL_OLD"]["matching_details"] == {"claim_basis": "risk_attaching"}
+
+
+def test_unknown_detail_level_is_rejected(casualty_program, casualty_bordereau):
+    with pytest.raises(ValueError, match="Unknown detail_level"):
+        apply_program_to_bordereau(
+            casualty_bordereau, casualty_program, CALCULATION_DATE, detail_level="all"
+        )
+
+
+@pytest.mark.parametrize("engine", ["row", "vectorized"])
+def test_parallel_chunks_do_not_change_results(
+    engine, casualty_program, casualty_bordereau
+):
+    """
+    Bordereau casualty découpé en tranches de 3 lignes sur 1 ou 2 processus :
+    résultats identiques à l'exécution en un bloc, dans l'ordre d'origine.
+    """
+    plan = compile_program(casualty_program)
+    reference_net, reference = apply_program_to_bordereau(
+        casualty_bordereau, casualty_program, CALCULATION_DATE, engine=engine, plan=plan
+    )
+
+    for workers in (1, 2):
+        net, results = apply_program_to_bordereau(
+            casualty_bordereau,
+            casualty_program,
+            CALCULATION_DATE,
+            engine=engine,
+            plan=plan,
+            workers=workers,
+            chunk_size=3,
+        )
+        scalar_columns = [c for c in reference.columns if c != "structures_detail"]
+        pd.testing.assert_frame_equal(
+            results[scalar_columns], reference[scalar_columns]
+        )
+        pd.testing.assert_frame_equal(net, reference_net)
+        assert results["structures_detail"].str.len().tolist() == (
+            reference["structures_detail"].str.len().tolist()
+        )
+
+        simple = apply_program_to_bordereau_simple(
+            casualty_bordereau,
+            casualty_program,
+            CALCULATION_DATE,
+            engine=engine,
+            workers=workers,
+            chunk_size=3,
+        )
+        pd.testing.assert_frame_equal(
+            simple,
+            apply_program_to_bordereau_simple(
+                casualty_bordereau, casualty_program, CALCULATION_DATE, engine=engine
+            ),
+        )
+
+
+def test_invalid_workers_is_rejected(casualty_program, casualty_bordereau):
+    with pytest.raises(ValueError, match="workers"):
+        apply_program_to_bordereau(
+            casualty_bordereau, casualty_program, CALCULATION_DATE, workers=0
+        )
+
+
+@pytest.mark.parametrize("engine", ["row", "vectorized"])
+def test_memoization_by_policy_signature(engine, casualty_program, casualty_bordereau):
+    """
+    Bordereau casualty répété 3 fois (policy_id et INSURED_NAME distincts) :
+    8 signatures pour 24 polices, résultats identiques au calcul ligne à ligne.
+    """
+    df = casualty_bordereau.df
+    repeated = pd.concat(
+        [
+            df.assign(
+                policy_id=df["policy_id"] + f"-{k}",
+                INSURED_NAME=df["INSURED_NAME"] + str(k),
+            )
+            for k in range(3)
+        ],
+        ignore_index=True,
+    )
+    plan = compile_program(casualty_program)
+
+    _, reference = apply_program_to_bordereau(
+        Bordereau(repeated, uw_dept="casualty"),
+        casualty_program,
+        CALCULATION_DATE,
+        engine=engine,
+        plan=plan,
+    )
+    _, memoized = apply_program_to_bordereau(
+        Bordereau(repeated, uw_dept="casualty"),
+        casualty_program,
+        CALCULATION_DATE,
+        engine=engine,
+        plan=plan,
+        memoize=True,
+    )
+
+    pd.testing.assert_frame_equal(memoized, reference)
+    assert memoized.attrs["memoization"] == {
+        "rows": 24,
+        "unique_signatures": 8,
+        "hits": 16,
+        "hit_rate": 16 / 24,
+    }
+
+    simple = apply_program_to_bordereau_simple(
+        Bordereau(repeated, uw_dept="casualty"),
+        casualty_program,
+        CALCULATION_DATE,
+        engine=engine,
+        memoize=True,
+    )
+    assert simple["insured_name"].tolist() == repeated["INSURED_NAME"].tolist()
+
+
+def test_result_store_views_match_row_engine(casualty_program, casualty_bordereau):
+    """
+    Le ResultStore garde des tableaux contigus (float64, codes int8, ids int32) ;
+    ses vues par police reproduisent to_rows() / to_simple_rows() du moteur ligne.
+    """
+    plan = compile_program(casualty_program)
+    store = apply_program_vectorized(
+        casualty_bordereau.to_engine_dataframe(),
+        casualty_program,
+        CALCULATION_DATE,
+        plan=plan,
+    ).to_store()
+
+    assert store.structure_ceded_to_reinsurer.dtype == np.float64
+    assert store.structure_ceded_to_reinsurer.flags.c_contiguous
+    assert store.reason_codes.dtype == np.int8
+    assert store.matched_condition_id.dtype == np.int32
+    assert store.structure_ceded_to_reinsurer.shape == (
+        len(store.covered),
+        len(plan.structures),
+    )
+
+    for i, policy in enumerate(casualty_bordereau):
+        row_result = apply_program(
+            policy, casualty_program, CALCULATION_DATE, plan=plan
+        )
+        assert store.rows(i) == row_result.to_rows()
+        assert store.simple_rows(i) == row_result.to_simple_rows()
+
+
+@pytest.mark.parametrize("engine", ["row", "vectorized"])
+def test_run_does_not_mutate_bordereau_or_input(
+    engine, casualty_program, casualty_bordereau
+):
+    """
+    Le run ajoute ses colonnes sur sa propre copie du bordereau :
+    - le DataFrame d'entrée et le bordereau restent inchangés
+    - l'original n'est conservé que sur demande (keep_raw)
+    """
+    source = casualty_bordereau.df.copy()
+    snapshot = source.copy()
+    bordereau = Bordereau(source, uw_dept="casualty")
+    assert bordereau.raw_df is None
+    assert Bordereau(source, uw_dept="casualty", keep_raw=True).raw_df.equals(snapshot)
+
+    bordereau_with_net, _ = apply_program_to_bordereau(
+        bordereau, casualty_program, CALCULATION_DATE, engine=engine
+    )
+
+    pd.testing.assert_frame_equal(source, snapshot)
+    assert "cession_to_reinsurer" not in bordereau.columns
+    assert "cession_to_reinsurer" in bordereau_with_net.columns
+
+
+def test_in_place_mutations_do_not_reach_bordereau(casualty_bordereau):
+    """
+    Modifier en place le DataFrame d'entrée, celui de to_engine_dataframe ou
+    bordereau.df (colonnes coercées ou non) ne modifie pas le bordereau.
+    """
+    source = casualty_bordereau.df.copy()
+    bordereau = Bordereau(source, uw_dept="casualty")
+    snapshot = bordereau.df.copy()
+
+    source.loc[1, "CEDENT_SHARE"] = 0.0
+    source.loc[1, "REGION"] = "Asia"
+    engine_df = bordereau.to_engine_dataframe()
+    engine_df.loc[1, "CEDENT_SHARE"] = 0.0
+    engine_df.loc[1, "REGION"] = "Asia"
+    view = bordereau.df
+    view.loc[0, "OCCURRENCE_LIMIT_100_ORIG"] = -1.0
+    view.loc[0, "REGION"] = "Asia"
+
+    assert view.loc[0, "OCCURRENCE_LIMIT_100_ORIG"] == -1.0
+    pd.testing.assert_frame_equal(bordereau.df, snapshot)
+    pd.testing.assert_frame_equal(bordereau.to_engine_dataframe(), snapshot)
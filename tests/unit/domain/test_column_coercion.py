@@ -0,0 +1,75 @@
+"""
+Tests unitaires : les coercions vectorisées du schéma donnent exactement
+le même résultat (valeurs, nuls, dtype) que Series.map de la version cellule.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.domain.bordereau import Bordereau
+from src.domain.schema import COLUMNS
+
+SAMPLES = {
+    "INSURED_NAME": [
+        ["acme", None, np.nan, 1, 1.5, "Ça va"],
+        [None, None],
+        [1.0, 2.5],
+    ],
+    "INCEPTION_DT": [
+        ["2024-01-01", None, ""],
+        ["2024-01-01", "garbage", None],
+        ["01/02/2024", "2024-03-01"],
+        ["2024-01-01 10:00", "2024-01-02", np.nan],
+        [pd.Timestamp("2024-01-01"), "2024-01-02"],
+        ["9999-12-31", "2024-01-02"],
+        [None, None],
+        ["garbage", "other"],
+        ["13/02/2024", "01/02/2024"],
+        ["2024-01-01T00:00:00+01:00", "2024-01-01T00:00:00+02:00"],
+        pd.date_range("2024-01-01", periods=3).tolist() + [pd.NaT],
+        pd.date_range("2024-01-01", periods=2, tz="Europe/Paris").tolist(),
+        [
+            pd.Timestamp("2024-01-01", tz="Europe/Paris"),
+            pd.Timestamp("2024-01-01", tz="America/New_York"),
+        ],
+        [None, np.nan, "2024-01-01"],
+    ],
+    "CEDENT_SHARE": [
+        [1, "2", None, "x", np.nan, "1e3", True, "", " 2 ", "1_000"],
+        [0.5, 0.75],
+        [1, 2],
+        ["x", "y"],
+        [None, None],
+    ],
+}
+
+
+@pytest.mark.parametrize(
+    "column, values",
+    [(column, values) for column, samples in SAMPLES.items() for values in samples],
+)
+def test_vectorized_coercion_matches_cell_coercion(column, values):
+    spec = COLUMNS[column]
+    series = pd.Series(values, dtype=object if any(v is None for v in values) else None)
+    pd.testing.assert_series_equal(spec.coerce_series(series), series.map(spec.coerce))
+
+
+def test_coercion_timings_are_reported():
+    df = pd.DataFrame(
+        {
+            "INSURED_NAME": ["a"],
+            "INCEPTION_DT": ["2024-01-01"],
+            "EXPIRE_DT": ["2025-01-01"],
+            "exposure": ["10"],
+            "REGION": ["Europe"],
+        }
+    )
+    bordereau = Bordereau(df, uw_dept="test")
+    assert set(bordereau.coercion_timings) == {
+        "INSURED_NAME",
+        "INCEPTION_DT",
+        "EXPIRE_DT",
+        "exposure",
+    }
+    assert all(t >= 0 for t in bordereau.coercion_timings.values())
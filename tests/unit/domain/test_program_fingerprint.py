@@ -0,0 +1,53 @@
+"""
+Tests unitaires : l'empreinte d'un programme est stable pour un même contenu
+et change dès qu'un terme, une condition ou une exclusion change.
+"""
+
+import numpy as np
+
+from src.domain import ExclusionRule
+from src.serialization.program_serializer import ProgramSerializer
+
+
+def _round_trip(program):
+    serializer = ProgramSerializer()
+    dfs = serializer.program_to_dataframes(program)
+    return serializer.dataframes_to_program(
+        dfs["program"],
+        dfs["structures"],
+        dfs["conditions"],
+        dfs["exclusions"],
+        dfs["field_links"],
+    )
+
+
+def test_fingerprint_is_stable_for_same_content(casualty_program_factory):
+    """Deux constructions et deux relectures successives -> même empreinte ; int et float confondus."""
+    assert (
+        casualty_program_factory().fingerprint()
+        == casualty_program_factory().fingerprint()
+    )
+
+    loaded = _round_trip(casualty_program_factory())
+    assert _round_trip(loaded).fingerprint() == loaded.fingerprint()
+
+    program = casualty_program_factory()
+    program.structures[1].limit = np.float64(program.structures[1].limit)
+    assert program.fingerprint() == casualty_program_factory().fingerprint()
+
+
+def test_fingerprint_changes_with_content(casualty_program_factory):
+    """Terme par défaut, condition résolue, exclusion : chaque modification change l'empreinte."""
+    reference = casualty_program_factory().fingerprint()
+
+    program = casualty_program_factory()
+    program.structures[1].attachment = 1_500_000
+    assert program.fingerprint() != reference
+
+    program = casualty_program_factory()
+    program.structures[0].conditions[0]["CESSION_PCT"] = 0.45
+    assert program.fingerprint() != reference
+
+    program = casualty_program_factory()
+    program.exclusions.append(ExclusionRule(values_by_dimension={"REGION": ["Asia"]}))
+    assert program.fingerprint() != reference
@@ -0,0 +1,82 @@
+"""
+Tests unitaires : point d'entrée par lot (UDF/UDTF vectorisée) — schéma de
+sortie fixe, mêmes montants que le moteur, plan compilé une fois par worker.
+"""
+
+import pickle
+
+import pandas as pd
+
+from src.engine import (
+    BATCH_OUTPUT_SCHEMA,
+    ProgramBatchHandler,
+    apply_program_to_batch,
+    apply_program_to_bordereau_simple,
+    compile_program,
+)
+from src.engine import batch_udf
+
+CALCULATION_DATE = "2024-06-30"
+
+
+def _raw_batch(bordereau):
+    """Lot tel que reçu de l'entrepôt : dates en texte ISO."""
+    df = bordereau.df
+    for col in ("INCEPTION_DT", "EXPIRE_DT"):
+        df[col] = df[col].dt.strftime("%Y-%m-%d")
+    return df
+
+
+def test_batch_output_has_fixed_schema_and_engine_amounts(
+    casualty_program, casualty_bordereau
+):
+    """
+    Bordereau casualty de 8 polices (dont inactive, exclue, hors devise) :
+    colonnes et dtypes de BATCH_OUTPUT_SCHEMA, montants identiques à
+    apply_program_to_bordereau_simple ; un lot vide garde le même schéma.
+    """
+    plan = compile_program(casualty_program)
+    out = apply_program_to_batch(_raw_batch(casualty_bordereau), plan, CALCULATION_DATE)
+
+    assert list(out.columns) == list(BATCH_OUTPUT_SCHEMA)
+    assert out["policy_id"].tolist() == [f"POL-{i:03d}" for i in range(8)]
+    expected = apply_program_to_bordereau_simple(
+        casualty_bordereau, casualty_program, CALCULATION_DATE
+    )
+    shared = [c for c in expected.columns if c != "insured_name"]
+    pd.testing.assert_frame_equal(out[shared], expected[shared], check_dtype=False)
+
+    empty = apply_program_to_batch(
+        _raw_batch(casualty_bordereau).iloc[0:0], plan, CALCULATION_DATE
+    )
+    assert list(empty.columns) == list(BATCH_OUTPUT_SCHEMA)
+    assert empty.dtypes.equals(out.dtypes)
+
+
+def test_handler_compiles_plan_once_per_worker(
+    monkeypatch, casualty_program, casualty_bordereau
+):
+    """
+    Handler picklé (comme à l'enregistrement de la UDTF), colonnes positionnelles :
+    deux instances du même programme et trois lots -> une seule compilation.
+    """
+    monkeypatch.setattr(batch_udf, "_WORKER_PLANS", {})
+    compiled = []
+    monkeypatch.setattr(
+        batch_udf, "compile_program", lambda p: compiled.append(p) or compile_program(p)
+    )
+    raw = _raw_batch(casualty_bordereau)
+    handler = ProgramBatchHandler(casualty_program, CALCULATION_DATE, list(raw.columns))
+    handler.plan  # plan local non transmis au worker
+    workers = [pickle.loads(pickle.dumps(handler)) for _ in range(2)]
+    assert all(w._plan is None for w in workers)
+
+    positional = raw.set_axis(range(raw.shape[1]), axis=1)
+    outputs = [
+        w.end_partition(positional.iloc[i : i + 3])
+        for i, w in zip((0, 3, 6), workers * 2)
+    ]
+
+    assert len(compiled) == 1
+    assert sum(len(o) for o in outputs) == 8
+    assert outputs[1].index.tolist() == [3, 4, 5]
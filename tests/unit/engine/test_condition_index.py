@@ -0,0 +1,95 @@
+"""
+Tests unitaires pour l'index inversé des conditions.
+"""
+
+import itertools
+import random
+
+from src.builders import build_condition
+from src.domain.policy import Policy
+from src.engine.condition_index import ConditionIndex
+from src.engine.condition_matcher import match_condition, match_condition_with_details
+
+DIMENSIONS = ["COUNTRY", "REGION", "PRODUCT_TYPE_LEVEL_1"]
+COUNTRIES = ["France", "Germany", "Spain", "Italy", "USA"]
+REGIONS = ["Europe", "North America"]
+PRODUCTS = ["Property", "Liability", "Marine"]
+
+
+def _conditions(seed: int, count: int):
+    rng = random.Random(seed)
+    conditions = []
+    for _ in range(count):
+        data = {}
+        if rng.random() < 0.7:
+            data["COUNTRY"] = rng.sample(COUNTRIES, rng.randint(1, 3))
+        if rng.random() < 0.4:
+            data["REGION"] = rng.sample(REGIONS, rng.randint(1, 2))
+        if rng.random() < 0.5:
+            data["PRODUCT_TYPE_LEVEL_1"] = rng.sample(PRODUCTS, rng.randint(1, 2))
+        conditions.append(build_condition(cession_pct=rng.random(), **data))
+    return conditions
+
+
+def _policies():
+    for country, region, product in itertools.product(
+        COUNTRIES + [None, " France "],
+        REGIONS + [None],
+        PRODUCTS + [None, float("nan")],
+    ):
+        yield Policy(
+            {"COUNTRY": country, "REGION": region, "PRODUCT_TYPE_LEVEL_1": product},
+            uw_dept="casualty",
+        )
+
+
+def test_index_matches_linear_matcher():
+    """
+    Pour 300 conditions aléatoires (avec nombreuses égalités de score),
+    l'index retourne exactement la même condition que match_condition, pour toutes les polices.
+    """
+    conditions = _conditions(seed=42, count=300)
+    index = ConditionIndex(conditions, DIMENSIONS)
+
+    for policy in _policies():
+        expected = match_condition(policy, conditions, DIMENSIONS)
+        assert index.match(policy) is expected
+        position = index.match_position(policy)
+        assert (conditions[position] if position >= 0 else None) is expected
+
+
+def test_index_details_match_linear_details():
+    conditions = _conditions(seed=7, count=40)
+    index = ConditionIndex(conditions, DIMENSIONS)
+
+    for policy in _policies():
+        expected, expected_details = match_condition_with_details(
+            policy, conditions, DIMENSIONS
+        )
+        matched, details = index.match_with_details(policy)
+        assert matched is expected
+        assert details == expected_details
+
+
+def test_ties_keep_original_order():
+    """
+    Deux conditions de même spécificité sur la même valeur : la première déclarée gagne.
+    """
+    first = build_condition(country_cd=["France"], cession_pct=0.1)
+    second = build_condition(country_cd=["France"], cession_pct=0.2)
+    generic = build_condition(cession_pct=0.3)
+    index = ConditionIndex([generic, first, second], ["COUNTRY"])
+
+    assert index.match(Policy({"COUNTRY": "France"})) is first
+    assert index.match(Policy({"COUNTRY": "Spain"})) is generic
+
+
+def test_aviation_list_values_match_any_element():
+    usd = build_condition(currency_cd=["USD"], cession_pct=0.1)
+    eur = build_condition(currency_cd=["EUR"], cession_pct=0.2)
+    index = ConditionIndex([usd, eur], ["CURRENCY"])
+
+    policy = Policy(
+        {"HULL_CURRENCY": "EUR", "LIAB_CURRENCY": "USD"}, uw_dept="aviation"
+    )
+    assert index.match(policy) is match_condition(policy, [usd, eur], ["CURRENCY"])
@@ -49,4 +49,38 @@ def test_currency_validation_comprehensive():
     )
     is_valid, error = CurrencyValidator.validate_policy_currency(policy_usd, program_usd)
     assert is_valid  # USD = USD
-    assert error is None
\ No newline at end of file
+    assert error is None
+
+def test_currency_index_matches_validator():
+    """
+    Programme EUR dont une structure autorise USD/GBP : l'index précalculé
+    donne les mêmes verdicts et messages que le parcours des conditions.
+    """
+    from src.builders import build_program, build_quota_share
+    from src.engine.currency_validator import CurrencyIndex
+
+    qs = build_quota_share(
+        name="QS_1",
+        cession_pct=0.3,
+        special_conditions=[{"CURRENCY": ["USD", "GBP"], "CESSION_PCT": 0.5}],
+    )
+    program = build_program(name="CUR", structures=[qs], main_currency="EUR")
+    index = CurrencyIndex.build(program)
+
+    assert index.allowed == {"EUR", "USD", "GBP"}
+    assert index.by_structure == {"QS_1": {"USD", "GBP"}}
+    assert index.conditions_by_currency["USD"] == (("QS_1", 0),)
+
+    outside = build_condition(currency_cd=["JPY"])
+    policies = [
+        Policy({"ORIGINAL_CURRENCY": currency}, uw_dept="casualty")
+        for currency in ["EUR", "USD", "JPY", None, ""]
+    ] + [
+        Policy({"HULL_CURRENCY": "JPY", "LIAB_CURRENCY": "CHF"}, uw_dept="aviation"),
+        Policy({"HULL_CURRENCY": "JPY", "LIAB_CURRENCY": "GBP"}, uw_dept="aviation"),
+    ]
+    for policy in policies:
+        for matched in (None, outside):
+            assert index.validate(policy, matched) == CurrencyValidator.validate_policy_currency(
+                policy, program, matched
+            )
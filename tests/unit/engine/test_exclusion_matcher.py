@@ -0,0 +1,69 @@
+"""
+Tests unitaires pour les exclusions compilées (lookup pré-normalisé + masque bordereau).
+"""
+
+import itertools
+
+import numpy as np
+import pandas as pd
+from src.builders import build_program, build_quota_share
+from src.domain.exclusion import ExclusionRule
+from src.domain.policy import Policy
+from src.engine.exclusion_matcher import CompiledExclusions, check_program_exclusions
+
+
+def _program():
+    program = build_program(
+        name="EXCL",
+        structures=[build_quota_share(name="QS", cession_pct=0.2)],
+        main_currency="EUR",
+        dimension_columns=["COUNTRY", "REGION"],
+    )
+    program.exclusions = [
+        ExclusionRule(values_by_dimension={}, name="EMPTY"),
+        ExclusionRule(
+            values_by_dimension={"COUNTRY": [" Iran ", "Russia"]}, name="SANCTIONS"
+        ),
+        ExclusionRule(
+            values_by_dimension={"COUNTRY": ["France"], "REGION": ["Europe"]},
+            effective_date=pd.Timestamp("2024-01-01"),
+            expiry_date=pd.Timestamp("2025-01-01"),
+        ),
+    ]
+    return program
+
+
+def test_compiled_exclusions_match_rule_by_rule_check():
+    """
+    Règle vide écartée, valeurs normalisées (strip), règle datée active en 2024 seulement :
+    même verdict et même raison que check_program_exclusions.
+    """
+    program = _program()
+    for calculation_date in ["2024-06-30", "2025-06-30", None]:
+        compiled = CompiledExclusions.compile(program, calculation_date)
+        for country, region in itertools.product(
+            ["Iran", " Russia ", "France", "Spain", None, 3.0], ["Europe", None]
+        ):
+            policy = Policy({"COUNTRY": country, "REGION": region}, uw_dept="test")
+            assert compiled.check(policy) == check_program_exclusions(
+                policy, program, calculation_date=calculation_date
+            )
+
+    assert len(CompiledExclusions.compile(program, "2024-06-30").rules) == 2
+    assert len(CompiledExclusions.compile(program, None).rules) == 1
+
+
+def test_exclusion_mask_for_whole_bordereau():
+    df = pd.DataFrame(
+        {
+            "COUNTRY": ["Iran", "France", "France", "Spain", "Russia"],
+            "REGION": ["Asia", "Europe", "Asia", "Europe", None],
+        }
+    )
+    codes, categories = CompiledExclusions.compile(_program(), "2024-06-30").mask(
+        df, "test"
+    )
+
+    assert codes.dtype == np.int32
+    assert categories == ("SANCTIONS", "Matched exclusion rule")
+    assert codes.tolist() == [0, 1, -1, -1, 0]
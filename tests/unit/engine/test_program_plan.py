@@ -0,0 +1,94 @@
+"""
+Tests unitaires pour le ProgramPlan (compilation unique d'un programme).
+"""
+
+import pytest
+from src.builders import build_quota_share, build_excess_of_loss, build_program
+from src.domain.policy import Policy
+from src.engine import apply_program
+from src.engine.program_plan import compile_program
+
+
+def _program():
+    qs = build_quota_share(
+        name="QS_1",
+        cession_pct=0.25,
+        signed_share=1.0,
+        special_conditions=[{"CURRENCY": ["USD"], "CESSION_PCT": 0.5}],
+    )
+    xol_high = build_excess_of_loss(
+        name="XOL_HIGH",
+        attachment=5_000_000,
+        limit=10_000_000,
+        signed_share=0.5,
+        predecessor_title="QS_1",
+    )
+    xol_low = build_excess_of_loss(
+        name="XOL_LOW",
+        attachment=1_000_000,
+        limit=4_000_000,
+        signed_share=0.5,
+        predecessor_title="QS_1",
+    )
+    return build_program(
+        name="PLAN",
+        structures=[xol_high, qs, xol_low],
+        main_currency="EUR",
+        dimension_columns=["CURRENCY"],
+    )
+
+
+def test_plan_orders_structures_and_links_predecessors():
+    """
+    Ordre logique : QS d'abord, puis XOL par attachment croissant.
+    Les prédécesseurs sont résolus en indices une fois pour toutes.
+    """
+    plan = compile_program(_program())
+
+    assert [sp.name for sp in plan.structures] == ["QS_1", "XOL_LOW", "XOL_HIGH"]
+    assert [sp.predecessor_index for sp in plan.structures] == [None, 0, 0]
+    assert plan.predecessor_of(plan.structures[2]).name == "QS_1"
+    assert plan.topological_order.index(0) < plan.topological_order.index(1)
+    assert plan.uw_dept == "test"
+    assert plan.dimension_columns == ["CURRENCY"]
+
+
+def test_plan_precomputes_default_conditions_and_kernels():
+    plan = compile_program(_program())
+    qs_plan = plan.structure_named("QS_1")
+
+    assert qs_plan.resolve_default().cession_pct == 0.25
+    assert list(qs_plan.kernel.cession_pct) == [0.5, 0.25]
+    assert qs_plan.kernel.condition_at(-1) is qs_plan.resolve_default()
+
+
+def test_cyclic_predecessors_are_rejected():
+    qs_a = build_quota_share(name="A", cession_pct=0.1, predecessor_title="B")
+    qs_b = build_quota_share(name="B", cession_pct=0.1, predecessor_title="A")
+    program = build_program(name="CYCLE", structures=[qs_a, qs_b], main_currency="EUR")
+
+    with pytest.raises(ValueError, match="Cyclic predecessor chain"):
+        compile_program(program)
+
+
+def test_apply_program_with_plan_matches_without_plan():
+    """
+    Police EUR de 10M : même résultat que le plan soit fourni ou compilé à la volée.
+    """
+    program = _program()
+    plan = compile_program(program)
+    raw = {
+        "exposure": 10_000_000,
+        "ORIGINAL_CURRENCY": "EUR",
+        "INCEPTION_DT": "2024-03-01",
+        "EXPIRE_DT": "2025-03-01",
+    }
+
+    with_plan = apply_program(
+        Policy(raw, uw_dept="test"), program, "2024-06-01", plan=plan
+    )
+    without_plan = apply_program(Policy(raw, uw_dept="test"), program, "2024-06-01")
+
+    assert with_plan.to_simple_rows() == without_plan.to_simple_rows()
+    # QS 25% → 7.5M retenus ; XOL_LOW 4M xs 1M → 4M ; XOL_HIGH 10M xs 5M → 2.5M
+    assert with_plan.totals.ceded_to_layer_100pct == 2_500_000 + 4_000_000 + 2_500_000
@@ -0,0 +1,70 @@
+"""
+Tests unitaires pour les masques temporels int64 (activité + applicabilité RA/LO).
+"""
+
+import pandas as pd
+from src.builders import build_excess_of_loss, build_program, build_quota_share
+from src.domain.policy import Policy
+from src.engine.program_plan import compile_program
+from src.engine.temporal import TemporalColumns, applicability_matrix
+
+
+def _program():
+    qs_ra = build_quota_share(
+        name="QS_RA",
+        cession_pct=0.3,
+        claim_basis="risk_attaching",
+        inception_date="2024-01-01",
+        expiry_date="2025-01-01",
+    )
+    xol_lo = build_excess_of_loss(
+        name="XOL_LO",
+        attachment=1_000_000,
+        limit=2_000_000,
+        claim_basis="loss_occurring",
+        inception_date="2024-01-01",
+        expiry_date="2024-06-30",
+    )
+    return build_program(
+        name="TEMPORAL", structures=[qs_ra, xol_lo], main_currency="EUR"
+    )
+
+
+def test_matrix_matches_row_checks():
+    """
+    Bornes [inception ; expiry[ incluses/exclues, inception None (non applicable)
+    et vide (NaT, applicable), structure LO évaluée à la date de calcul.
+    """
+    df = pd.DataFrame(
+        {
+            "INCEPTION_DT": [
+                "2023-12-31",
+                "2024-01-01",
+                "2024-12-31",
+                "2025-01-01",
+                None,
+                "",
+            ],
+            "EXPIRE_DT": [
+                "2024-06-30",
+                "2024-07-01",
+                None,
+                "2026-01-01",
+                "2024-01-01",
+                "2025-06-30",
+            ],
+        }
+    )
+    plan = compile_program(_program())
+    temporal = TemporalColumns.from_dataframe(df)
+
+    for calculation_date in ["2024-06-29", "2024-06-30"]:
+        matrix = applicability_matrix(plan, temporal, calculation_date)
+        inactive = temporal.inactive_mask(calculation_date)
+        for i, raw in enumerate(df.to_dict("records")):
+            policy = Policy(raw, uw_dept="test")
+            assert inactive[i] == (not policy.is_active(calculation_date)[0])
+            for sp in plan.structures:
+                assert matrix[i, sp.position] == sp.structure.is_applicable(
+                    policy, evaluation_date=calculation_date
+                )
@@ -0,0 +1,203 @@
+"""
+Tests unitaires : lecture ensembliste de plusieurs programmes par
+SnowflakeProgramIO.read_many, contre une base SQLite qui tient lieu de
+connexion Snowflake (cursor().execute / fetchall / description).
+"""
+
+import copy
+import re
+import sqlite3
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("snowflake.connector")
+
+from src.engine import apply_program_to_bordereau
+from src.io import program_snowflake_adapter
+from src.io.snowflake_db import ConnectionPool
+from src.managers import ProgramManager
+from src.serialization.program_serializer import ProgramSerializer
+
+CALCULATION_DATE = "2024-06-30"
+
+SOURCE = "snowflake://DB.SCHEMA"
+
+STRUCTURE_COLUMNS = [
+    "RP_STRUCTURE_ID",
+    "REINSURANCE_PROGRAM_ID",
+    "RP_STRUCTURE_NAME",
+    "TYPE_OF_PARTICIPATION",
+    "CLAIMS_BASIS",
+    "EFFECTIVE_DATE",
+    "EXPIRY_DATE",
+    "RP_STRUCTURE_ID_PREDECESSOR",
+    "T_NUMBER",
+    "LAYER_NUMBER",
+    "INSURED_PERIOD_TYPE",
+    "CLASS_OF_BUSINESS",
+    "MAIN_CURRENCY",
+    "UW_YEAR",
+    "COMMENT",
+    "LIMIT_100",
+    "ATTACHMENT_POINT_100",
+    "CESSION_PCT",
+    "RETENTION_PCT",
+    "SUPI_100",
+    "BUSCL_PREMIUM_CURRENCY_CD",
+    "BUSCL_PREMIUM_GROSS_NET_CD",
+    "PREMIUM_RATE_PCT",
+    "PREMIUM_DEPOSIT_100",
+    "PREMIUM_MIN_100",
+    "BUSCL_LIABILITY_1_LINE_100",
+    "MAX_COVER_PCT",
+    "MIN_EXCESS_PCT",
+    "SIGNED_SHARE_PCT",
+    "AVERAGE_LINE_SLAV_CED",
+    "PML_DEFAULT_PCT",
+    "LIMIT_EVENT",
+    "NO_OF_REINSTATEMENTS",
+]
+CONDITION_COLUMNS = [
+    "RP_CONDITION_ID",
+    "REINSURANCE_PROGRAM_ID",
+    "COUNTRIES",
+    "REGIONS",
+    "PRODUCT_TYPE_LEVEL_1",
+    "PRODUCT_TYPE_LEVEL_2",
+    "PRODUCT_TYPE_LEVEL_3",
+    "CURRENCIES",
+    "INCLUDES_HULL",
+    "INCLUDES_LIABILITY",
+]
+
+
+class _SqliteCursor:
+    """Traduit le SQL Snowflake du connecteur (%s, "DB"."SCHEMA".) pour SQLite."""
+
+    def __init__(self, cnx, statements):
+        self._cur = cnx.cursor()
+        self._statements = statements
+
+    @property
+    def description(self):
+        return self._cur.description
+
+    def execute(self, sql, params=()):
+        self._statements.append(sql)
+        sql = re.sub(r'"DB"\."SCHEMA"\.', "", sql).replace("%s", "?")
+        self._cur.execute(sql, params)
+
+    def fetchall(self):
+        return self._cur.fetchall()
+
+    def close(self):
+        self._cur.close()
+
+
+class SqliteConnection:
+    def __init__(self, cnx):
+        self.cnx = cnx
+        self.statements = []
+
+    def cursor(self):
+        return _SqliteCursor(self.cnx, self.statements)
+
+    def is_closed(self):
+        return False
+
+
+def _sql_value(v):
+    if isinstance(v, pd.Timestamp):
+        return v.strftime("%Y-%m-%d")
+    return None if pd.isna(v) else v
+
+
+def _insert(cnx, table, df, columns=None):
+    df = df.reindex(columns=columns or list(df.columns)).astype(object)
+    df.map(_sql_value).to_sql(table, cnx, if_exists="append", index=False)
+
+
+@pytest.fixture
+def connection(monkeypatch, casualty_program):
+    cnx = sqlite3.connect(":memory:")
+    cnx.execute(
+        f"CREATE TABLE REINSURANCE_PROGRAM (REINSURANCE_PROGRAM_ID INTEGER, TITLE TEXT, "
+        "REF_REF_ID TEXT, MAIN_CURRENCY_ID TEXT, ACTIVE_IND INTEGER)"
+    )
+    cnx.execute(f"CREATE TABLE RP_STRUCTURES ({', '.join(STRUCTURE_COLUMNS)})")
+    cnx.execute(f"CREATE TABLE RP_CONDITIONS ({', '.join(CONDITION_COLUMNS)})")
+    cnx.execute(
+        "CREATE TABLE RP_STRUCTURE_FIELD_LINK (RP_STRUCTURE_FIELD_LINK_ID INTEGER PRIMARY KEY "
+        "AUTOINCREMENT, RP_CONDITION_ID, RP_STRUCTURE_ID, FIELD_NAME, NEW_VALUE)"
+    )
+
+    serializer = ProgramSerializer()
+    program = copy.copy(casualty_program)  # le nom est modifié par programme
+    for program_id, condition_offset in ((1, 0), (2, 100)):
+        program.name = f"CASUALTY_{program_id}"
+        dfs = serializer.program_to_dataframes(program)
+        dfs["program"]["REINSURANCE_PROGRAM_ID"] = program_id
+        for name in ("structures", "conditions", "exclusions"):
+            dfs[name]["REINSURANCE_PROGRAM_ID"] = program_id
+        dfs["conditions"]["RP_CONDITION_ID"] += condition_offset
+        dfs["field_links"]["RP_CONDITION_ID"] += condition_offset
+        if program_id == 2:
+            dfs["exclusions"] = dfs["exclusions"].iloc[0:0]
+        _insert(cnx, "REINSURANCE_PROGRAM", dfs["program"])
+        _insert(cnx, "RP_STRUCTURES", dfs["structures"], STRUCTURE_COLUMNS)
+        _insert(cnx, "RP_CONDITIONS", dfs["conditions"], CONDITION_COLUMNS)
+        _insert(cnx, "RP_GLOBAL_EXCLUSION", dfs["exclusions"])
+        _insert(cnx, "RP_STRUCTURE_FIELD_LINK", dfs["field_links"])
+
+    connection = SqliteConnection(cnx)
+    pool = ConnectionPool({}, factory=lambda: connection)
+    monkeypatch.setattr(program_snowflake_adapter, "get_pool", lambda params: pool)
+    return connection
+
+
+def test_load_many_issues_one_query_per_table(
+    connection, casualty_program, casualty_bordereau
+):
+    """
+    2 programmes chargés ensemble : 5 requêtes au total (une par table, IN (...)),
+    chaque programme ne reçoit que ses structures/conditions/exclusions,
+    et donne les mêmes résultats que le programme d'origine.
+    """
+    programs = ProgramManager().load_many(SOURCE, [2, 1])
+
+    assert len(connection.statements) == 5
+    assert all("IN (%s, %s)" in sql for sql in connection.statements)
+    assert list(programs) == [2, 1]
+    assert [programs[i].name for i in (1, 2)] == ["CASUALTY_1", "CASUALTY_2"]
+    assert [len(programs[i].structures) for i in (1, 2)] == [4, 4]
+    assert [len(programs[i].exclusions) for i in (1, 2)] == [1, 0]
+
+    _, expected = apply_program_to_bordereau(
+        casualty_bordereau, casualty_program, CALCULATION_DATE
+    )
+    _, actual = apply_program_to_bordereau(
+        casualty_bordereau, programs[1], CALCULATION_DATE
+    )
+    # structures_detail contient des objets Condition (comparés par identité)
+    pd.testing.assert_frame_equal(
+        actual.drop(columns=["structures_detail"]),
+        expected.drop(columns=["structures_detail"]),
+    )
+
+
+def test_read_many_matches_single_reads(connection):
+    """read(program_id) et read_many([...]) renvoient les mêmes DataFrames ; ID inconnu -> erreur."""
+    io = program_snowflake_adapter.SnowflakeProgramIO()
+    many = io.read_many(SOURCE, {}, [1, 2])
+    for program_id in (1, 2):
+        for single_df, many_df in zip(
+            io.read(SOURCE, {}, program_id), many[program_id]
+        ):
+            # Table vide : le type des colonnes dépend du reste du résultat ensembliste
+            pd.testing.assert_frame_equal(
+                single_df, many_df, check_dtype=not single_df.empty
+            )
+
+    with pytest.raises(ValueError, match="Program with ID 3 not found"):
+        io.read_many(SOURCE, {}, [1, 3])
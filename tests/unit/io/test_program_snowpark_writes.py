@@ -0,0 +1,95 @@
+"""
+Tests unitaires : écritures bulk de SnowparkProgramIO contre une base SQLite
+qui tient lieu de session Snowpark (session.sql(...).collect()).
+"""
+
+import sqlite3
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("snowflake.connector")
+pytest.importorskip("snowflake.snowpark")
+
+from src.io import program_snowpark_adapter
+from src.io.program_snowpark_adapter import SnowparkProgramIO
+
+
+class _SqliteResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def collect(self):
+        return self._rows
+
+
+class SqliteSession:
+    """Stand-in minimal d'une session Snowpark : compte les requêtes envoyées."""
+
+    def __init__(self):
+        self.cnx = sqlite3.connect(":memory:")
+        self.statements = []
+
+    def sql(self, query: str) -> _SqliteResult:
+        self.statements.append(query)
+        if query.startswith("DESCRIBE TABLE "):
+            table = query.split()[-1]
+            info = self.cnx.execute(f"PRAGMA table_info({table})").fetchall()
+            return _SqliteResult([(row[1], row[2]) for row in info])
+        return _SqliteResult(self.cnx.execute(query).fetchall())
+
+
+@pytest.fixture
+def session():
+    s = SqliteSession()
+    s.cnx.execute(
+        'CREATE TABLE RP_CONDITIONS ("RP_CONDITION_ID" INTEGER PRIMARY KEY AUTOINCREMENT, '
+        '"REINSURANCE_PROGRAM_ID" INTEGER, "INSPER_ID_PRE" INTEGER, "REGION" TEXT, '
+        '"CESSION_PCT" REAL, "CREATED_BY" TEXT)'
+    )
+    s.cnx.execute(
+        'CREATE TABLE RP_GLOBAL_EXCLUSION ("RP_GLOBAL_EXCLUSION_ID" INTEGER PRIMARY KEY AUTOINCREMENT, '
+        '"REINSURANCE_PROGRAM_ID" INTEGER, "REGION" TEXT)'
+    )
+    return s
+
+
+def test_inserts_are_batched_and_tables_described_once(session, monkeypatch):
+    """
+    2 500 conditions avec INSERT_BATCH_ROWS=1000 : 1 DESCRIBE + 3 INSERT multi-lignes ;
+    une seconde écriture dans la même table ne refait pas le DESCRIBE.
+    Valeurs NULL et apostrophes conservées.
+    """
+    monkeypatch.setattr(program_snowpark_adapter, "INSERT_BATCH_ROWS", 1000)
+    io = SnowparkProgramIO(session)
+    conditions = pd.DataFrame(
+        {
+            "REINSURANCE_PROGRAM_ID": 7,
+            "INSPER_ID_PRE": range(2500),
+            "REGION": ["Côte d'Ivoire", None] * 1250,
+            "CESSION_PCT": [0.25] * 2500,
+        }
+    )
+
+    io._insert_dataframe_snowpark(conditions, io.CONDITIONS)
+    assert len(session.statements) == 4
+    assert sum(s.startswith("DESCRIBE") for s in session.statements) == 1
+
+    io._insert_dataframe_snowpark(conditions.head(10), io.CONDITIONS)
+    io._insert_dataframe_snowpark(
+        pd.DataFrame({"REGION": ["Antarctica"]}), io.EXCLUSIONS
+    )
+    assert sum(s.startswith("DESCRIBE") for s in session.statements) == 2
+    assert len(session.statements) == 7
+
+    rows = session.cnx.execute(
+        'SELECT "INSPER_ID_PRE", "REGION", "CESSION_PCT", "CREATED_BY" FROM RP_CONDITIONS '
+        'ORDER BY "RP_CONDITION_ID" LIMIT 2'
+    ).fetchall()
+    assert rows == [
+        (0, "Côte d'Ivoire", 0.25, "SNOWPARK_ADAPTER"),
+        (1, None, 0.25, "SNOWPARK_ADAPTER"),
+    ]
+    assert session.cnx.execute("SELECT COUNT(*) FROM RP_CONDITIONS").fetchone() == (
+        2510,
+    )
@@ -0,0 +1,95 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("snowflake.connector")
+
+from src.io.snowflake_db import ConnectionPool, close_pools, get_pool
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def is_closed(self):
+        return self.closed
+
+    def close(self):
+        self.closed = True
+
+
+def test_pool_reuses_connection_between_calls():
+    """
+    Trois utilisations successives du pool : une seule connexion ouverte,
+    la même instance est prêtée à chaque fois.
+    """
+    pool = ConnectionPool({}, factory=FakeConnection)
+    seen = []
+    for _ in range(3):
+        with pool.connection() as cnx:
+            seen.append(cnx)
+    assert pool.created == 1
+    assert seen[0] is seen[1] is seen[2]
+
+
+def test_pool_lends_distinct_connections_to_concurrent_callers():
+    """
+    4 threads tiennent une connexion simultanément : chacun a la sienne,
+    puis le pool garde au plus max_idle=2 connexions et ferme les autres.
+    """
+    pool = ConnectionPool({}, max_idle=2, factory=FakeConnection)
+    barrier = threading.Barrier(4)
+
+    def use():
+        with pool.connection() as cnx:
+            barrier.wait(timeout=5)
+            return cnx
+
+    with ThreadPoolExecutor(max_workers=4) as ex:
+        lent = list(ex.map(lambda _: use(), range(4)))
+
+    assert len({id(c) for c in lent}) == 4
+    assert pool.created == 4
+    assert sum(c.closed for c in lent) == 2
+
+
+def test_pool_discards_closed_connections():
+    """Connexion fermée côté serveur pendant son retour au pool : une nouvelle est ouverte."""
+    pool = ConnectionPool({}, factory=FakeConnection)
+    with pool.connection() as first:
+        pass
+    first.close()
+    with pool.connection() as second:
+        assert second is not first
+    assert pool.created == 2
+
+
+def test_ensure_once_runs_ddl_a_single_time_across_threads():
+    """8 threads demandent la même DDL : elle n'est exécutée qu'une fois."""
+    pool = ConnectionPool({}, factory=FakeConnection)
+    calls = []
+
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        list(
+            ex.map(
+                lambda _: pool.ensure_once(
+                    ("run_tables", "DB", "S"), lambda: calls.append(1)
+                ),
+                range(8),
+            )
+        )
+
+    assert calls == [1]
+
+
+def test_get_pool_is_shared_for_identical_params():
+    """Mêmes paramètres de connexion (ordre indifférent) -> même pool partagé."""
+    try:
+        a = get_pool({"account": "acme", "user": "u"})
+        b = get_pool({"user": "u", "account": "acme"})
+        c = get_pool({"account": "other", "user": "u"})
+        assert a is b
+        assert a is not c
+    finally:
+        close_pools()
@@ -0,0 +1,74 @@
+"""
+Tests unitaires : cache disque des programmes compilés (clé program_id +
+empreinte, jeton de fraîcheur, éviction LRU).
+"""
+
+import os
+
+import pytest
+
+# src.managers importe le connecteur Snowflake au chargement du package
+pytest.importorskip("snowflake.connector")
+
+from src.engine import ProgramPlan
+from src.managers.program_cache import ProgramCache
+
+
+def test_cache_serves_compiled_program_while_version_unchanged(
+    tmp_path, casualty_program
+):
+    """
+    Put puis get avec le même jeton : programme et plan relus du disque.
+    Jeton différent (programme modifié côté Snowflake) -> miss.
+    """
+    cache = ProgramCache(str(tmp_path))
+    cache.put(1, casualty_program, "v1")
+
+    cached = ProgramCache(str(tmp_path)).get(1, "v1")
+    assert cached is not None
+    assert cached.fingerprint == casualty_program.fingerprint()
+    assert cached.program.fingerprint() == casualty_program.fingerprint()
+    assert isinstance(cached.plan, ProgramPlan)
+
+    assert cache.get(1, "v2") is None
+    assert cache.get(2, "v1") is None
+    assert cache.get(1, None) is None
+
+
+def test_new_fingerprint_replaces_previous_entry(tmp_path, casualty_program_factory):
+    """Programme modifié sous le même ID : l'ancienne entrée est supprimée."""
+    cache = ProgramCache(str(tmp_path))
+    cache.put(1, casualty_program_factory(), "v1")
+    changed = casualty_program_factory()
+    changed.structures[1].attachment = 1_500_000
+    cache.put(1, changed, "v2")
+
+    assert len(list(tmp_path.glob("*.pkl"))) == 1
+    assert cache.get(1, "v2").fingerprint == changed.fingerprint()
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path, casualty_program):
+    """max_entries=2 : après lecture du programme 1, l'ajout du 3 évince le 2."""
+    cache = ProgramCache(str(tmp_path), max_entries=2)
+    cache.put(1, casualty_program, "a")
+    cache.put(2, casualty_program, "b")
+    for i, path in enumerate(sorted(tmp_path.glob("*.pkl"))):
+        os.utime(path, ns=(i * 10**9, i * 10**9))  # 1 plus ancien que 2
+    assert cache.get(1, "a") is not None
+
+    cache.put(3, casualty_program, "c")
+    assert cache.get(2, "b") is None
+    assert cache.get(1, "a") is not None
+    assert cache.get(3, "c") is not None
+    assert len(list(tmp_path.glob("*.pkl"))) == 2
+
+
+def test_unreadable_entry_is_a_miss(tmp_path, casualty_program):
+    """Fichier d'entrée corrompu : ignoré et supprimé, pas d'exception."""
+    cache = ProgramCache(str(tmp_path))
+    cache.put(1, casualty_program, "v1")
+    (entry,) = tmp_path.glob("*.pkl")
+    entry.write_bytes(b"not a pickle")
+
+    assert cache.get(1, "v1") is None
+    assert not entry.exists()